@@ -14,15 +14,18 @@ class SemanticCache:
 
         self._entries: List[Dict] = []
 
-    def lookup(self, query: str) -> Optional[Dict]:
+    def lookup(self, query: str, embeddings=None) -> Optional[Dict]:
         """
         Повертає кешований результат або None.
+
+        embeddings — EmbeddingContext запиту (вектор питання
+        перевикористовується далі в pipeline).
         """
 
         if not self._entries:
             return None
 
-        query_emb = self.embedder.embed(query)
+        query_emb = (embeddings or self.embedder).embed_array(query)
 
         best_match = None
         best_score = 0.0
@@ -39,21 +42,19 @@ class SemanticCache:
 
         return None
 
-    def store(self, query: str, result: Dict) -> None:
+    def store(self, query: str, result: Dict, embeddings=None) -> None:
         """
         Зберігає новий результат у кеш.
         """
 
         self._entries.append({
             "query": query,
-            "embedding": self.embedder.embed(query),
+            "embedding": (embeddings or self.embedder).embed_array(query),
             "result": result,
             "timestamp": time.time(),
             "valid": True
         })
 
     @staticmethod
-    def _cosine_similarity(a: List[float], b: List[float]) -> float:
-        a = np.array(a)
-        b = np.array(b)
+    def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
         return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
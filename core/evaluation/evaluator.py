@@ -38,15 +38,21 @@ class Evaluator:
         question: str,
         answer: str,
         chunks: List[Dict],
-        index_ids: List[str]
+        index_ids: List[str],
+        embeddings=None
     ) -> Dict:
         """
         Формує evaluation у форматі,
         сумісному з learning та мультиіндексацією.
+
+        embeddings — EmbeddingContext запиту: питання і чанки
+        вже ембедились у retrieval / rerank.
         """
 
         # --------- Chunk-level ---------
-        chunk_evals = self._evaluate_chunks(question, answer, chunks)
+        chunk_evals = self._evaluate_chunks(
+            question, answer, chunks, embeddings or self.embedder
+        )
 
         # --------- Document-level ---------
         document_evals = self._aggregate_documents(chunk_evals)
@@ -74,7 +80,8 @@ class Evaluator:
         self,
         question: str,
         answer: str,
-        chunks: List[Dict]
+        chunks: List[Dict],
+        embedder
     ) -> List[Dict]:
         """
         Оцінка чанків:
@@ -82,13 +89,14 @@ class Evaluator:
         - groundedness: близькість чанка до відповіді
         """
 
-        q_emb = np.array(self.embedder.embed(question))
-        a_emb = np.array(self.embedder.embed(answer))
+        embeddings = embedder.embed_batch_array(
+            [question, answer] + [chunk["content"] for chunk in chunks]
+        )
+        q_emb, a_emb = embeddings[0], embeddings[1]
 
         results = []
 
-        for chunk in chunks:
-            c_emb = np.array(self.embedder.embed(chunk["content"]))
+        for chunk, c_emb in zip(chunks, embeddings[2:]):
 
             relevance = self._cosine(q_emb, c_emb)
             groundedness = self._cosine(a_emb, c_emb)
@@ -27,11 +27,13 @@ class GroundednessEvaluator:
         if not chunks:
             return 0.0
 
-        answer_emb = self.embedder.embed(answer)
+        embeddings = self.embedder.embed_batch_array(
+            [answer] + [chunk["content"] for chunk in chunks]
+        )
+        answer_emb = embeddings[0]
         max_similarity = 0.0
 
-        for chunk in chunks:
-            chunk_emb = self.embedder.embed(chunk["content"])
+        for chunk_emb in embeddings[1:]:
             similarity = float(
                 np.dot(answer_emb, chunk_emb) /
                 (np.linalg.norm(answer_emb) * np.linalg.norm(chunk_emb))
@@ -23,8 +23,7 @@ class RelevanceEvaluator:
         if answer.strip() == self.FALLBACK_ANSWER:
             return 1.0
 
-        q_emb = self.embedder.embed(question)
-        a_emb = self.embedder.embed(answer)
+        q_emb, a_emb = self.embedder.embed_batch_array([question, answer])
 
         similarity = float(
             np.dot(q_emb, a_emb) /
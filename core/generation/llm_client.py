@@ -1,6 +1,8 @@
 # core/generation/llm_client.py
 
-from transformers import pipeline
+import threading
+
+from core.system.model_artifacts import ModelArtifacts
 from config.settings import settings
 
 
@@ -8,11 +10,17 @@ class LLMClient:
     """
     Config-driven LLM client.
 
+    Backend (transformers pipeline / Ollama) створюється при першому
+    generate() або warm_up(): конструктор не імпортує transformers,
+    torch чи langchain.
+
     НЕ:
     - не приймає model_name напряму
     - не має hardcoded моделей
     """
 
+    SUPPORTED_BACKENDS = ("hf", "ollama")
+
     def __init__(self, mode: str):
         """
         mode: "local" | "colab"
@@ -25,19 +33,44 @@ class LLMClient:
         self.temperature = cfg.get("temperature", 0.0)
         self.max_tokens = cfg.get("max_tokens", 256)
 
-        if self.backend == "hf":
-            self._init_hf(cfg)
-        elif self.backend == "ollama":
-            self._init_ollama(cfg)
-        else:
+        if self.backend not in self.SUPPORTED_BACKENDS:
             raise ValueError(f"Unsupported LLM backend: {self.backend}")
 
+        self._cfg = cfg
+        self._ready = False
+        self._init_lock = threading.Lock()
+
     # --------------------------------------------------
     # BACKENDS
     # --------------------------------------------------
 
+    @property
+    def is_loaded(self) -> bool:
+        return self._ready
+
+    def warm_up(self) -> None:
+        self._ensure_backend()
+
+    def _ensure_backend(self) -> None:
+        if self._ready:
+            return
+
+        with self._init_lock:
+            if self._ready:
+                return
+
+            if self.backend == "hf":
+                self._init_hf(self._cfg)
+            else:
+                self._init_ollama(self._cfg)
+
+            self._ready = True
+
     def _init_hf(self, cfg: dict):
-        model_name = cfg["model"]
+        # локальний артефакт (models.yaml → artifacts) або ім'я в hub
+        model_name = ModelArtifacts().resolve(cfg["model"])
+
+        from transformers import pipeline
 
         self.pipeline = pipeline(
             task="text2text-generation",
@@ -61,6 +94,8 @@ class LLMClient:
     # --------------------------------------------------
 
     def generate(self, prompt: str) -> str:
+        self._ensure_backend()
+
         if self.backend == "hf":
             out = self.pipeline(prompt)[0]["generated_text"]
             return out.strip()
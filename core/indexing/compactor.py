@@ -0,0 +1,230 @@
+"""
+IndexCompactor
+==============
+
+Ущільнення індексів.
+
+Відповідає за:
+- злиття дрібних індексів однієї index_role у великі шарди
+- перебудову окремого індексу, що переріс свій тренувальний корпус
+  (IndexManager.needs_rebuild / rebuild_index)
+- переписування chunk_ids шардів та index_ids у metadata чанків
+- атомарну підміну індексів в IndexManager (запити не зупиняються,
+  ingestion чекає на завершення злиття)
+
+НЕ:
+- не ембедить чанки заново (вектори відновлюються з FAISS)
+- не змінює learning state
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.indexing.index_manager import IndexManager
+from core.indexing.postings import VectorPostings
+from core.knowledge.chunk_store import ChunkStore
+from config.settings import settings
+
+
+class IndexCompactor:
+    """
+    Merge small per-document indexes into role shards.
+    """
+
+    def __init__(
+        self,
+        index_manager: IndexManager,
+        chunk_store: ChunkStore,
+        shard_max_vectors: Optional[int] = None,
+        min_indexes: Optional[int] = None
+    ):
+        cfg = settings.system.get("compaction", {})
+
+        self.index_manager = index_manager
+        self.chunk_store = chunk_store
+
+        # індекси, більші за шард, вважаються вже ущільненими
+        self.shard_max_vectors: int = int(
+            shard_max_vectors or cfg.get("shard_max_vectors", 500000)
+        )
+        # роль ущільнюється, коли дрібних індексів щонайменше стільки
+        self.min_indexes: int = int(min_indexes or cfg.get("min_indexes", 2))
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --------------------------------------------------
+    # PUBLIC API
+    # --------------------------------------------------
+
+    def compact(self, index_role: Optional[str] = None) -> List[Dict]:
+        """
+        Ущільнює одну роль або всі. Повертає metadata нових шардів
+        і перебудованих індексів.
+        """
+        if index_role:
+            roles = [index_role]
+        else:
+            roles = sorted({
+                self.index_manager.get_metadata(index_id).get("index_role", "general")
+                for index_id in self.index_manager.list_indexes()
+            })
+
+        created: List[Dict] = []
+        for role in roles:
+            created.extend(self._compact_role(role))
+
+        return created
+
+    def start(self, interval_seconds: float) -> None:
+        """
+        Запускає періодичну компакцію у фоновому потоці.
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(interval_seconds,),
+            name="index-compactor",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _run(self, interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            try:
+                self.compact()
+            except Exception:
+                # фоновий процес НІКОЛИ не валить сервіс;
+                # незавершена компакція відкочується при старті IndexManager
+                continue
+
+    def _compact_role(self, role: str) -> List[Dict]:
+        # зливаються лише індекси з тією ж embedding-моделлю
+        # і в тому ж просторі (проєкції)
+        groups: Dict[Tuple[str, str], List[str]] = {}
+
+        for index_id in self.index_manager.get_indexes_by_role(role):
+            meta = self.index_manager.get_metadata(index_id)
+            live = self.index_manager.get_id_map(index_id).live_count()
+
+            if live < self.shard_max_vectors:
+                key = (
+                    meta.get("embedding_model", ""),
+                    meta.get("projection", {}).get("fingerprint", ""),
+                )
+                groups.setdefault(key, []).append(index_id)
+
+        created: List[Dict] = []
+        merged = set()
+        for source_ids in groups.values():
+            if len(source_ids) >= self.min_indexes:
+                # ingestion не пише в індекси, що зливаються;
+                # запити тим часом працюють зі старими індексами
+                with self.index_manager.exclusive():
+                    created.extend(self._merge(role, source_ids))
+                merged.update(source_ids)
+
+        # роль з одним індексом (index_chunks дописує в нього) —
+        # перебудова, якщо він переріс тренування
+        for index_id in self.index_manager.get_indexes_by_role(role):
+            if index_id in merged or not self.index_manager.needs_rebuild(index_id):
+                continue
+
+            with self.index_manager.exclusive():
+                created.append(self.index_manager.rebuild_index(index_id))
+
+        return created
+
+    def _merge(self, role: str, source_ids: List[str]) -> List[Dict]:
+        # 1️⃣ живі вектори всіх вихідних індексів
+        chunk_ids: List[str] = []
+        blocks: List[np.ndarray] = []
+        seen = set()
+
+        for index_id in source_ids:
+            live = [
+                (vector_id, cid)
+                for vector_id, cid in self.index_manager.get_id_map(index_id).live_items()
+                if cid not in seen
+            ]
+            if not live:
+                continue
+
+            faiss_index = self.index_manager.load_index(index_id)
+            blocks.append(faiss_index.reconstruct([vector_id for vector_id, _ in live]))
+            chunk_ids.extend(cid for _, cid in live)
+            seen.update(cid for _, cid in live)
+
+        if not chunk_ids:
+            self.index_manager.swap_indexes(source_ids, [])
+            return []
+
+        vectors = np.vstack(blocks)
+        # повнорозмірні індекси отримують проєкцію тут — одну на всі шарди
+        projection = self.index_manager.get_projection(source_ids[0])
+        if projection is None:
+            projection = self.index_manager.fit_projection(vectors)
+            if projection is not None:
+                vectors = projection.apply(vectors)
+        chunks = dict(zip(chunk_ids, self.chunk_store.load_many(chunk_ids)))
+
+        # 2️⃣ нові шарди (на диску, але ще не видимі для запитів)
+        shards = []
+        shard_chunk_lists = []
+        for start in range(0, len(chunk_ids), self.shard_max_vectors):
+            shard_chunk_ids = chunk_ids[start:start + self.shard_max_vectors]
+            shard_chunk_lists.append(shard_chunk_ids)
+
+            shards.append(self.index_manager.build_from_vectors(
+                vectors[start:start + self.shard_max_vectors],
+                chunk_ids=shard_chunk_ids,
+                document_ids=sorted({
+                    chunks[cid]["document_id"]
+                    for cid in shard_chunk_ids
+                    if chunks[cid]
+                }),
+                index_role=role,
+                extra={"compacted_from": list(source_ids)},
+                postings=VectorPostings.from_chunks([
+                    chunks[cid] or {} for cid in shard_chunk_ids
+                ]),
+                projection=projection,
+            ))
+
+        # 3️⃣ index_ids у metadata чанків
+        old_ids = set(source_ids)
+        updated = []
+        for (metadata, _), shard_chunk_ids in zip(shards, shard_chunk_lists):
+            for cid in shard_chunk_ids:
+                chunk = chunks[cid]
+                if not chunk:
+                    continue
+
+                index_ids = [
+                    i for i in chunk["metadata"]["index_ids"] if i not in old_ids
+                ]
+                index_ids.append(metadata["index_id"])
+                chunk["metadata"]["index_ids"] = index_ids
+                updated.append(chunk)
+
+        self.chunk_store.save_many(updated)
+
+        # 4️⃣ атомарна підміна
+        self.index_manager.swap_indexes(source_ids, shards)
+
+        return [metadata for metadata, _ in shards]
@@ -1,8 +1,12 @@
 # core/indexing/embedder.py
 
-from typing import List
-from sentence_transformers import SentenceTransformer
+import threading
+from typing import Callable, Dict, List, Optional
 
+import numpy as np
+
+from core.indexing.embedding_cache import EmbeddingCache
+from core.system.model_artifacts import ModelArtifacts
 from config.settings import settings
 
 
@@ -10,6 +14,13 @@ class Embedder:
     """
     Config-driven embedding engine.
 
+    Backend-и (models.yaml → embeddings.backend):
+    - sentence_transformers: PyTorch
+    - onnx: ONNX Runtime (CPU), опційно int8 (див. OnnxEncoder)
+
+    Модель створюється при першому використанні (або warm_up()),
+    тож конструктор не імпортує torch / onnxruntime.
+
     НЕ:
     - не приймає model_name напряму
     - не знає, де він запускається
@@ -17,35 +28,213 @@ class Embedder:
     ВСЕ береться з models.yaml
     """
 
-    def __init__(self):
+    SUPPORTED_BACKENDS = ("sentence_transformers", "onnx")
+
+    def __init__(self, use_cache: bool = True):
+        """
+        use_cache=False — без EmbeddingCache навіть якщо він увімкнений
+        (воркери EmbeddingPool: кешем керує батьківський процес).
+        """
         cfg = settings.models["embeddings"]
 
         backend = cfg.get("backend")
-        if backend != "sentence_transformers":
+        if backend not in self.SUPPORTED_BACKENDS:
             raise ValueError(f"Unsupported embedding backend: {backend}")
 
         model_name = cfg["model"]
-        device = cfg.get("device", "cpu")
+        self.backend = backend
+        self.model_name = model_name
         self.normalize = cfg.get("normalize", True)
+        # токенів (з padding) на один forward pass; 0 → фіксовані батчі моделі
+        self.token_budget: int = int(cfg.get("token_budget", 0))
+
+        # вектори різних backend-ів (int8) не змішуються в кеші
+        self._cache_model = model_name
+        if backend == "onnx":
+            quantize = bool(cfg.get("onnx", {}).get("quantize", True))
+            self._cache_model = f"{model_name}#onnx{'-int8' if quantize else ''}"
+
+        # модель (і torch / onnxruntime) — при першому encode або warm_up()
+        self._cfg = cfg
+        self._model = None
+        self._model_lock = threading.Lock()
+
+        # (model, normalize, sha256(text)) → vector, на диску
+        self.cache: Optional[EmbeddingCache] = None
+        cache_cfg = cfg.get("cache", {})
+        if use_cache and cache_cfg.get("enabled", False):
+            self.cache = EmbeddingCache(
+                path=settings.paths.get("cache", {}).get(
+                    "embeddings", "data/cache/embeddings.sqlite"
+                ),
+                max_bytes=int(cache_cfg.get("max_size_mb", 0)) * 1024 * 1024,
+            )
+
+    # --------------------------------------------------
+    # MODEL
+    # --------------------------------------------------
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
 
-        self.model = SentenceTransformer(
-            model_name,
-            device=device
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def warm_up(self) -> None:
+        """
+        Завантаження моделі + один forward pass (мимо кешу).
+        """
+        self._encode(["warm up"])
+
+    def _load_model(self):
+        cfg = self._cfg
+        # локальний артефакт (models.yaml → artifacts) або ім'я в hub
+        source = ModelArtifacts().resolve(self.model_name)
+
+        if self.backend == "onnx":
+            from core.indexing.onnx_encoder import OnnxEncoder
+
+            onnx_cfg = cfg.get("onnx", {})
+
+            return OnnxEncoder(
+                self.model_name,
+                artifacts_path=settings.paths.get("models", {}).get(
+                    "onnx", "data/models/onnx"
+                ),
+                quantize=bool(onnx_cfg.get("quantize", True)),
+                batch_size=int(onnx_cfg.get("batch_size", 32)),
+                source=source,
+            )
+
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(
+            source,
+            device=cfg.get("device", "cpu")
         )
+
     # --------------------------------------------------
     # API
     # --------------------------------------------------
 
-    def embed(self, text: str) -> List[float]:
-        vec = self.model.encode(
-            text,
-            normalize_embeddings=self.normalize
+    def embed_array(self, text: str) -> np.ndarray:
+        """
+        Вектор (dimension,) float32.
+        """
+        return self.embed_batch_array([text])[0]
+
+    def embed_batch_array(
+        self,
+        texts: List[str],
+        encode: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Матриця (len(texts), dimension): C-contiguous float32,
+        нормалізована згідно з models.yaml → embeddings.normalize.
+
+        Кеш → лише промахи (унікальні тексти) йдуть у модель одним батчем.
+        encode — чим ембедити промахи (EmbeddingPool.embed_batch_array
+        для bulk ingestion); None → модель цього процесу.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        encode = encode or self._encode
+
+        if self.cache is None:
+            return encode(texts)
+
+        known: Dict[str, np.ndarray] = self.cache.get_many(
+            self._cache_model, self.normalize, texts
         )
-        return vec.tolist()
+
+        misses = list(dict.fromkeys(t for t in texts if t not in known))
+        if misses:
+            computed = dict(zip(misses, encode(misses)))
+            self.cache.put_many(self._cache_model, self.normalize, computed)
+            known.update(computed)
+
+        return np.stack([known[text] for text in texts]).astype(np.float32, copy=False)
+
+    # list API — тонкі обгортки для сумісності
+    def embed(self, text: str) -> List[float]:
+        return self.embed_array(text).tolist()
 
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        vectors = self.model.encode(
-            texts,
-            normalize_embeddings=self.normalize
-        )
-        return [v.tolist() for v in vectors]
+        return self.embed_batch_array(texts).tolist()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        if self.token_budget <= 0:
+            vectors = self.model.encode(
+                texts,
+                normalize_embeddings=self.normalize,
+                convert_to_numpy=True
+            )
+            return np.ascontiguousarray(vectors, dtype=np.float32)
+
+        # тексти схожої довжини → один батч, розмір батчу — за бюджетом
+        # токенів, а не фіксований: менше padding, довгі не OOM-лять
+        out: Optional[np.ndarray] = None
+        for positions in self._length_buckets(texts):
+            vectors = self.model.encode(
+                [texts[i] for i in positions],
+                batch_size=len(positions),
+                normalize_embeddings=self.normalize,
+                convert_to_numpy=True
+            )
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            # повернення до вихідного порядку
+            out[positions] = vectors
+
+        return out
+
+    def _length_buckets(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Позиції текстів, відсортовані за кількістю токенів і розбиті
+        так, що len(bucket) * max_len(bucket) <= token_budget.
+        """
+        lengths = self.token_lengths(texts)
+        order = np.argsort(lengths, kind="stable")
+
+        buckets: List[np.ndarray] = []
+        start = 0
+        for end in range(1, len(order) + 1):
+            # відсортовано за зростанням → останній елемент найдовший
+            if end < len(order):
+                padded = (end + 1 - start) * int(lengths[order[end]])
+                if padded <= self.token_budget:
+                    continue
+
+            buckets.append(order[start:end])
+            start = end
+
+        return buckets
+
+    def token_lengths(self, texts: List[str]) -> np.ndarray:
+        """
+        Кількість токенів (зі спецтокенами, не більше max_seq_length)
+        на текст — те, за чим будуються батчі token_budget.
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        max_length = getattr(self.model, "max_seq_length", None) or 512
+
+        if tokenizer is None:
+            # грубо: ~1 токен на слово
+            lengths = [len(text.split()) + 2 for text in texts]
+        else:
+            lengths = [
+                len(ids)
+                for ids in tokenizer(texts, add_special_tokens=True, truncation=False)["input_ids"]
+            ]
+
+        return np.minimum(np.asarray(lengths, dtype=np.int64), max_length)
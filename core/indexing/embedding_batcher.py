@@ -0,0 +1,173 @@
+"""
+EmbeddingBatcher
+================
+
+Об'єднання конкурентних embedding-запитів у спільні батчі.
+
+Під навантаженням кожен ask() робить кілька коротких embed-викликів
+(batch size 1). Batcher ставить їх у чергу і віддає моделі одним
+encode, коли:
+- набралось max_batch_size текстів, або
+- минуло max_wait_ms від першого запиту в батчі.
+
+Кожен виклик отримує свої рядки результату (Future).
+Працює з потоками (embed_array / embed_batch_array) і з корутинами
+(aembed_array / aembed_batch_array).
+
+Той самий інтерфейс, що й Embedder → підставляється замість нього.
+
+НЕ:
+- не кешує (це робить Embedder / EmbeddingCache)
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+
+import numpy as np
+
+from config.settings import settings
+
+
+class _Request:
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class EmbeddingBatcher:
+    """
+    Request-coalescing micro-batcher over an Embedder.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        cfg = settings.models["embeddings"].get("batching", {})
+
+        self.embedder = embedder
+        self.max_batch_size: int = int(max_batch_size or cfg.get("max_batch_size", 64))
+        self.max_wait: float = float(
+            max_wait_ms if max_wait_ms is not None else cfg.get("max_wait_ms", 2)
+        ) / 1000.0
+
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="embedding-batcher",
+            daemon=True
+        )
+        self._thread.start()
+
+    # --------------------------------------------------
+    # EMBEDDER INTERFACE
+    # --------------------------------------------------
+
+    @property
+    def model_name(self) -> str:
+        return self.embedder.model_name
+
+    @property
+    def normalize(self) -> bool:
+        return self.embedder.normalize
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Ставить тексти в чергу. Future → np.ndarray (len(texts), dimension).
+        """
+        request = _Request(list(texts))
+
+        # великий батч (ingestion) і так ефективний — не чекає в черзі
+        # і не затримує короткі запити
+        if len(request.texts) >= self.max_batch_size or not request.texts:
+            try:
+                request.future.set_result(self.embedder.embed_batch_array(request.texts))
+            except Exception as e:
+                request.future.set_exception(e)
+            return request.future
+
+        self._queue.put(request)
+        return request.future
+
+    def embed_array(self, text: str) -> np.ndarray:
+        return self.submit([text]).result()[0]
+
+    def embed_batch_array(self, texts: List[str]) -> np.ndarray:
+        return self.submit(texts).result()
+
+    async def aembed_array(self, text: str) -> np.ndarray:
+        return (await asyncio.wrap_future(self.submit([text])))[0]
+
+    async def aembed_batch_array(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    # list API — як у Embedder
+    def embed(self, text: str) -> List[float]:
+        return self.embed_array(text).tolist()
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_batch_array(texts).tolist()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    # --------------------------------------------------
+    # WORKER
+    # --------------------------------------------------
+
+    def _run(self) -> None:
+        stopping = False
+
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.monotonic() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+                if request is None:
+                    stopping = True
+                    break
+
+                batch.append(request)
+                size += len(request.texts)
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[_Request]) -> None:
+        # однакові тексти від різних викликів (той самий запит) — один раз
+        texts = list(dict.fromkeys(t for request in batch for t in request.texts))
+
+        try:
+            vectors = self.embedder.embed_batch_array(texts)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        rows = {text: i for i, text in enumerate(texts)}
+        for request in batch:
+            request.future.set_result(
+                vectors[[rows[text] for text in request.texts]]
+            )
@@ -0,0 +1,227 @@
+"""
+EmbeddingCache
+==============
+
+Персистентний content-addressed кеш embedding-ів.
+
+Ключ: (model, normalize, sha256(text)) — той самий текст тією ж
+моделлю ніколи не ембедиться двічі (re-ingest, rebuild, evaluation).
+
+Зберігання: SQLite (WAL), вектор — float32 BLOB.
+Розмір обмежений max_bytes: при переповненні видаляються
+записи, що найдовше не використовувались (LRU за last_used).
+
+last_used на читанні не пишеться одразу: hit лише ставить ключ у
+чергу (і лише якщо last_used старший за TOUCH_INTERVAL), а черга
+записується разом з put_many / перед витісненням — читання кешу
+не стає write-транзакцією SQLite.
+
+НЕ:
+- не викликає модель (це робить Embedder)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# last_used грубіший за цей інтервал LRU-порядку не змінює
+TOUCH_INTERVAL = 60.0
+# черга оновлень last_used, після якої вона записується і з get_many
+MAX_PENDING_TOUCHES = 4096
+
+class EmbeddingCache:
+    """
+    Disk-backed, size-bounded (model, normalize, text) → vector cache.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0):
+        self.path = path
+        # 0 → без обмеження
+        self.max_bytes = max_bytes
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # (model, normalize, text_hash) → час останнього hit-а, ще не записаний
+        self._pending_touches: Dict[Tuple[str, int, bytes], float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                normalize INTEGER NOT NULL,
+                text_hash BLOB NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, normalize, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+        self._total_bytes = int(self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0])
+
+    # --------------------------------------------------
+    # API
+    # --------------------------------------------------
+
+    @staticmethod
+    def text_hash(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(
+        self,
+        model: str,
+        normalize: bool,
+        texts: List[str]
+    ) -> Dict[str, np.ndarray]:
+        """
+        text → вектор для знайдених у кеші текстів.
+        """
+        hashes = {self.text_hash(text): text for text in set(texts)}
+        if not hashes:
+            return {}
+
+        found: Dict[str, np.ndarray] = {}
+        keys = list(hashes)
+
+        with self._lock:
+            # SQLite обмежує кількість параметрів запиту
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT text_hash, dimension, vector, last_used FROM embeddings "
+                    f"WHERE model = ? AND normalize = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, int(normalize), *batch]
+                ).fetchall()
+
+                now = time.time()
+                for text_hash, dimension, vector, last_used in rows:
+                    found[hashes[bytes(text_hash)]] = np.frombuffer(
+                        vector, dtype=np.float32, count=dimension
+                    )
+                    if now - last_used > TOUCH_INTERVAL:
+                        self._pending_touches[(model, int(normalize), bytes(text_hash))] = now
+
+            if len(self._pending_touches) >= MAX_PENDING_TOUCHES:
+                self._flush_touches()
+                self._conn.commit()
+
+        return found
+
+    def put_many(
+        self,
+        model: str,
+        normalize: bool,
+        vectors: Dict[str, np.ndarray]
+    ) -> None:
+        if not vectors:
+            return
+
+        now = time.time()
+        rows = []
+        for text, vector in vectors.items():
+            blob = np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+            rows.append((model, int(normalize), self.text_hash(text), len(vector), blob, now))
+
+        with self._lock:
+            # перезапис того самого ключа не повинен подвоювати розмір
+            replaced = self._stored_bytes(model, normalize, [row[2] for row in rows])
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, normalize, text_hash, dimension, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._total_bytes += sum(len(row[4]) for row in rows) - replaced
+
+            # LRU-порядок має бути актуальним до витіснення
+            self._flush_touches()
+            self._evict()
+            self._conn.commit()
+
+    def size_bytes(self) -> int:
+        return self._total_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending_touches.clear()
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _flush_touches(self) -> None:
+        """
+        Записує відкладені last_used (у транзакції виклику).
+        """
+        if not self._pending_touches:
+            return
+
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = MAX(last_used, ?) "
+            "WHERE model = ? AND normalize = ? AND text_hash = ?",
+            [(used, *key) for key, used in self._pending_touches.items()]
+        )
+        self._pending_touches.clear()
+
+    def _stored_bytes(self, model: str, normalize: bool, hashes: List[bytes]) -> int:
+        total = 0
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            total += int(self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                f"WHERE model = ? AND normalize = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                [model, int(normalize), *batch]
+            ).fetchone()[0])
+        return total
+
+    def _evict(self) -> int:
+        """
+        Видаляє найстаріші (за last_used) записи, поки кеш
+        перевищує max_bytes. Повертає кількість видалених записів.
+        """
+        if self.max_bytes <= 0 or self._total_bytes <= self.max_bytes:
+            return 0
+
+        # з запасом до 90% бюджету, щоб не чистити на кожному put
+        doomed = []
+        excess = self._total_bytes - int(self.max_bytes * 0.9)
+
+        for rowid, size in self._conn.execute(
+            "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        ):
+            if excess <= 0:
+                break
+            doomed.append((rowid,))
+            excess -= size
+            self._total_bytes -= size
+
+        self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", doomed)
+        return len(doomed)
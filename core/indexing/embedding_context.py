@@ -0,0 +1,71 @@
+"""
+EmbeddingContext
+================
+
+Embedding-и в межах ОДНОГО запиту (ask).
+
+Питання, чанки і відповідь проходять кеш → retrieval → rerank →
+evaluation → кеш; кожен етап просить вектори тих самих текстів.
+Контекст памʼятає text → вектор, тож кожен різний текст
+ембедиться щонайбільше один раз за запит, а нові тексти
+одного виклику йдуть у модель одним батчем.
+
+Той самий інтерфейс, що й Embedder → передається замість нього
+(параметр embeddings у lookup / retrieve / rerank / evaluate / store).
+
+НЕ:
+- не живе довше за запит (для цього EmbeddingCache)
+- не потокобезпечний: один запит — один потік
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+
+class EmbeddingContext:
+    """
+    Request-scoped text → vector memo over an Embedder (or EmbeddingBatcher).
+    """
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self._vectors: Dict[str, np.ndarray] = {}
+        # текстів, відправлених у модель (для діагностики)
+        self.encoded: int = 0
+
+    # --------------------------------------------------
+    # EMBEDDER INTERFACE
+    # --------------------------------------------------
+
+    @property
+    def model_name(self) -> str:
+        return self.embedder.model_name
+
+    @property
+    def normalize(self) -> bool:
+        return self.embedder.normalize
+
+    def embed_array(self, text: str) -> np.ndarray:
+        return self.embed_batch_array([text])[0]
+
+    def embed_batch_array(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        missing = list(dict.fromkeys(t for t in texts if t not in self._vectors))
+        if missing:
+            self._vectors.update(zip(missing, self.embedder.embed_batch_array(missing)))
+            self.encoded += len(missing)
+
+        return np.stack([self._vectors[text] for text in texts])
+
+    # list API — як у Embedder
+    def embed(self, text: str) -> List[float]:
+        return self.embed_array(text).tolist()
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_batch_array(texts).tolist()
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._vectors
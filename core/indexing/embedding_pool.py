@@ -0,0 +1,142 @@
+"""
+EmbeddingPool
+=============
+
+Багатопроцесний embedding для bulk ingestion.
+
+- вхід ріжеться на шарди по shard_size текстів
+- кожен процес-воркер має власну копію моделі (Embedder без кешу:
+  EmbeddingCache читає і пише лише батьківський процес, див.
+  Embedder.embed_batch_array(encode=...))
+- результати повертаються СТРОГО в порядку входу (стрімінгом)
+- у роботі щонайбільше max_in_flight шардів → памʼять обмежена
+  навіть для одного величезного PDF
+
+Кількість воркерів — models.yaml → embeddings.pool.workers
+(0 → кількість ядер).
+
+НЕ:
+- не використовується для коротких запитів (там EmbeddingBatcher)
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+
+
+# Embedder усередині процесу-воркера
+_worker_embedder = None
+
+
+def _init_worker(threads_per_worker: int) -> None:
+    # без цього кожен воркер бере всі ядра під BLAS / torch → oversubscription
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads_per_worker)
+
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+    global _worker_embedder
+    from core.indexing.embedder import Embedder
+    # N процесів на одному SQLite-файлі сперечалися б за WAL-лок на кожен put
+    _worker_embedder = Embedder(use_cache=False)
+
+
+def _embed_shard(texts: List[str]) -> np.ndarray:
+    return _worker_embedder.embed_batch_array(texts)
+
+
+class EmbeddingPool:
+    """
+    Process pool of Embedder replicas with ordered, bounded streaming.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        shard_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ):
+        cfg = settings.models["embeddings"].get("pool", {})
+
+        self.workers: int = int(workers or cfg.get("workers", 0) or os.cpu_count() or 1)
+        self.shard_size: int = int(shard_size or cfg.get("shard_size", 256))
+        # шардів одночасно в роботі (вхід + результати в памʼяті)
+        self.max_in_flight: int = int(
+            max_in_flight or cfg.get("max_in_flight", 0) or 2 * self.workers
+        )
+        # менші батчі дешевше зробити в основному процесі
+        self.min_texts: int = int(cfg.get("min_texts", 1024))
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    # --------------------------------------------------
+    # API
+    # --------------------------------------------------
+
+    def iter_embeddings(self, texts: List[str]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        (offset, матриця шарда) у порядку входу.
+        """
+        executor = self._get_executor()
+        pending: Deque[Tuple[int, Future]] = deque()
+
+        for start in range(0, len(texts), self.shard_size):
+            if len(pending) >= self.max_in_flight:
+                offset, future = pending.popleft()
+                yield offset, future.result()
+
+            pending.append((
+                start,
+                executor.submit(_embed_shard, texts[start:start + self.shard_size])
+            ))
+
+        while pending:
+            offset, future = pending.popleft()
+            yield offset, future.result()
+
+    def embed_batch_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Уся матриця (len(texts), dimension); виділяється один раз.
+        """
+        out: Optional[np.ndarray] = None
+
+        for offset, block in self.iter_embeddings(texts):
+            if out is None:
+                out = np.empty((len(texts), block.shape[1]), dtype=np.float32)
+            out[offset:offset + len(block)] = block
+
+        if out is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return out
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+
+            # spawn: fork процесу з уже ініціалізованим torch небезпечний
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,),
+            )
+        return self._executor
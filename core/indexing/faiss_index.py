@@ -1,52 +1,316 @@
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+import os
+import math
 import faiss
 import numpy as np
 
+from core.indexing.vector_store import VectorStore
+
+
+# FAISS рекомендує щонайменше ~39 тренувальних точок на центроїд
+MIN_POINTS_PER_CENTROID = 39
+# менше 2^4 центроїдів на субквантизатор — кодбук вироджений,
+# такий корпус індексується PQ_FALLBACK_TYPE (без тренування)
+MIN_PQ_NBITS = 4
+PQ_FALLBACK_TYPE = "sq8"
+# allowlist до такого розміру шукається точним перебором
+EXACT_SELECTION_MAX = 4096
+
 
 class FaissIndex:
     """
     FAISS index wrapper (cosine similarity via L2 normalization).
+
+    Типи індексу (models.yaml → indexing.type):
+    - flat: точний brute-force пошук
+    - ivf:  IVF-Flat (nlist / nprobe), потребує тренування
+    - hnsw: граф HNSW (m / ef_search), тренування не потрібне
+    - fp16:   float16, 2 байти на компоненту (2x менше, recall ≈ flat)
+    - sq8:    scalar quantization, 1 байт на компоненту (4x менше)
+    - pq:     product quantization (m байт на вектор при nbits=8)
+    - ivf_pq: IVF + PQ для великих корпусів
+
+    rescore_factor > 0: поруч з індексом зберігаються точні float-вектори
+    (*.vectors, mmap), і top-(k * rescore_factor) кандидатів
+    переоцінюються точною відстанню. vectors_dtype: float16 — *.vectors
+    удвічі менші (точності float16 для cosine вистачає).
+
+    Вектори мають стабільні int id (позиція чанка в метаданих індексу),
+    що дозволяє дописувати (add_with_ids) та видаляти (remove_ids).
+    IVF підтримує зовнішні id нативно (direct map — hashtable),
+    flat / hnsw обгорнуті в IndexIDMap2.
     """
 
-    def __init__(self, dimension: int):
+    SUPPORTED_TYPES = ("flat", "ivf", "hnsw", "fp16", "sq8", "pq", "ivf_pq")
+    IVF_TYPES = ("ivf", "ivf_pq")
+
+    def __init__(
+        self,
+        dimension: int,
+        index_type: str = "flat",
+        params: Optional[Dict] = None,
+    ):
+        if index_type not in self.SUPPORTED_TYPES:
+            raise ValueError(f"Unsupported FAISS index type: {index_type}")
+
         self.dimension = dimension
-        self.index: faiss.Index = faiss.IndexFlatL2(dimension)
+        self.index_type = index_type
+        self.params: Dict = dict(params or {})
+        self.writable = True
+
+        self.index: faiss.Index = faiss.index_factory(
+            dimension,
+            self.factory_string(),
+            faiss.METRIC_L2
+        )
+
+        if self.index_type == "hnsw":
+            self._base_index().hnsw.efConstruction = int(
+                self.params.get("ef_construction", 40)
+            )
+
+        if self.index_type in self.IVF_TYPES:
+            # IDMap2 поверх IVF ламає id після remove_ids,
+            # тому IVF тримає зовнішні id сам
+            self.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+        self.exact: Optional[VectorStore] = None
+        if self.rescore_factor() > 0:
+            self.exact = VectorStore(
+                dimension, dtype=np.dtype(self.params.get("vectors_dtype", "float32"))
+            )
+
+        self._apply_search_params()
+
+    # --------------------------------------------------
+    # CONFIG
+    # --------------------------------------------------
+
+    def factory_string(self) -> str:
+        nlist = int(self.params.get("nlist", 100))
+        pq = f"PQ{int(self.params.get('m', 16))}x{int(self.params.get('nbits', 8))}"
+
+        if self.index_type == "ivf":
+            return f"IVF{nlist},Flat"
+
+        if self.index_type == "ivf_pq":
+            return f"IVF{nlist},{pq}"
+
+        if self.index_type == "hnsw":
+            return f"IDMap2,HNSW{int(self.params.get('m', 32))}"
+
+        if self.index_type == "fp16":
+            return "IDMap2,SQfp16"
+
+        if self.index_type == "sq8":
+            return "IDMap2,SQ8"
+
+        if self.index_type == "pq":
+            return f"IDMap2,{pq}"
+
+        return "IDMap2,Flat"
+
+    def rescore_factor(self) -> int:
+        return int(self.params.get("rescore_factor", 0))
+
+    @staticmethod
+    def fallback_type(index_type: str, n_vectors: int) -> str:
+        """
+        Тип, який можна якісно натренувати на n_vectors точках:
+        PQ / IVF-PQ на малому корпусі → PQ_FALLBACK_TYPE.
+        """
+        if (
+            index_type in ("pq", "ivf_pq")
+            and n_vectors < MIN_POINTS_PER_CENTROID * 2 ** MIN_PQ_NBITS
+        ):
+            return PQ_FALLBACK_TYPE
+        return index_type
+
+    @staticmethod
+    def effective_params(
+        index_type: str,
+        params: Dict,
+        n_vectors: int,
+        dimension: Optional[int] = None
+    ) -> Dict:
+        """
+        Підганяє параметри під розмір корпусу та розмірність:
+        - IVF не може мати більше центроїдів, ніж дозволяє вибірка
+        - PQ потребує ~39 * 2^nbits тренувальних точок (як і IVF —
+          ~39 на центроїд); менший корпус див. fallback_type
+        - кількість PQ-субквантизаторів має ділити dimension
+        """
+        params = dict(params or {})
+
+        if index_type in FaissIndex.IVF_TYPES:
+            nlist = int(params.get("nlist", 100))
+            max_nlist = max(1, n_vectors // MIN_POINTS_PER_CENTROID)
+            params["nlist"] = max(1, min(nlist, max_nlist))
+            params["nprobe"] = max(1, min(int(params.get("nprobe", 8)), params["nlist"]))
+
+        if index_type in ("pq", "ivf_pq"):
+            max_nbits = max(
+                MIN_PQ_NBITS,
+                int(math.log2(max(n_vectors // MIN_POINTS_PER_CENTROID, 1)))
+            )
+            params["nbits"] = min(int(params.get("nbits", 8)), max_nbits)
+
+            m = int(params.get("m", 16))
+            if dimension:
+                m = max(d for d in range(1, min(m, dimension) + 1) if dimension % d == 0)
+            params["m"] = m
+
+        return params
+
+    def _apply_search_params(self) -> None:
+        space = faiss.ParameterSpace()
+
+        if self.index_type in self.IVF_TYPES:
+            space.set_index_parameter(
+                self.index, "nprobe", int(self.params.get("nprobe", 8))
+            )
+
+        elif self.index_type == "hnsw":
+            space.set_index_parameter(
+                self.index, "efSearch", int(self.params.get("ef_search", 64))
+            )
+
+    # --------------------------------------------------
+    # TRAIN
+    # --------------------------------------------------
+
+    def requires_training(self) -> bool:
+        return not self.index.is_trained
+
+    def train(self, vectors: np.ndarray) -> None:
+        if not self.requires_training():
+            return
+
+        x = self._prepare(vectors)
+        self.index.train(x)  # type: ignore[arg-type]
 
     # --------------------------------------------------
     # ADD
     # --------------------------------------------------
 
-    def add(self, vectors: List[List[float]]) -> None:
-        if not vectors:
+    def add(
+        self,
+        vectors: np.ndarray,
+        ids: Optional[List[int]] = None
+    ) -> None:
+        """
+        ids=None → послідовні id (ntotal, ntotal + 1, ...).
+        """
+        if len(vectors) == 0:
             return
 
-        x = np.asarray(vectors, dtype="float32")
+        if not self.writable:
+            raise RuntimeError("FAISS index is memory-mapped read-only")
 
-        if x.ndim != 2 or x.shape[1] != self.dimension:
-            raise ValueError(
-                f"Vector dimension mismatch: expected (*, {self.dimension}), got {x.shape}"
+        x = self._prepare(vectors)
+
+        if self.requires_training():
+            raise RuntimeError(
+                f"FAISS index '{self.index_type}' must be trained before add()"
             )
 
-        # cosine similarity via normalization
-        faiss.normalize_L2(x)
+        if ids is None:
+            ids = list(range(self.size(), self.size() + len(x)))
+
+        if len(ids) != len(x):
+            raise ValueError("ids and vectors must have the same length")
+
+        if self.exact is not None:
+            # рядок у *.vectors == int id вектора
+            if ids[0] != len(self.exact) or ids[-1] != ids[0] + len(ids) - 1:
+                raise ValueError("Exact vectors require sequential ids")
+            self.exact.append(x)
+
+        if self.has_ids():
+            self.index.add_with_ids(x, np.asarray(ids, dtype="int64"))  # type: ignore[arg-type]
+            return
+
+        # legacy індекс без IDMap: id == позиція, тому лише послідовне додавання
+        if ids[0] != self.size() or ids != list(range(ids[0], ids[0] + len(ids))):
+            raise ValueError("Legacy FAISS index supports only sequential ids")
 
         # ✅ high-level API (correct at runtime)
         self.index.add(x)  # type: ignore[arg-type]
 
+    # --------------------------------------------------
+    # RECONSTRUCT
+    # --------------------------------------------------
+
+    def reconstruct(self, ids: List[int]) -> np.ndarray:
+        """
+        Відновлює збережені (нормалізовані) вектори за id —
+        без повторного embedding. З *.vectors — точно, інакше
+        з індексу (для SQ / PQ — наближено).
+        """
+        if not ids:
+            return np.empty((0, self.dimension), dtype="float32")
+
+        if self.exact is not None:
+            return self.exact.get(ids)
+
+        # legacy IVF без direct map: будуємо його в памʼяті
+        if (
+            isinstance(self.index, faiss.IndexIVF)
+            and self.index.direct_map.type == faiss.DirectMap.NoMap
+        ):
+            self.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+        return self.index.reconstruct_batch(np.asarray(ids, dtype="int64"))
+
+    # --------------------------------------------------
+    # REMOVE
+    # --------------------------------------------------
+
+    def remove(self, ids: List[int]) -> int:
+        """
+        Фізично видаляє вектори через remove_ids.
+
+        Повертає кількість видалених векторів. 0 означає, що індекс
+        не підтримує видалення (HNSW, legacy без IDMap) — тоді
+        вектори лишаються як tombstones і фільтруються вище.
+        """
+        if not ids:
+            return 0
+
+        if not self.writable:
+            raise RuntimeError("FAISS index is memory-mapped read-only")
+
+        # legacy індекс: remove_ids зсунув би позиційні id
+        if not self.has_ids():
+            return 0
+
+        try:
+            return int(self.index.remove_ids(np.asarray(ids, dtype="int64")))
+        except RuntimeError:
+            return 0
+
     # --------------------------------------------------
     # SEARCH
     # --------------------------------------------------
 
     def search(
         self,
-        query_vector: List[float],
+        query_vector: np.ndarray,
         k: int,
+        ids: Optional[np.ndarray] = None
     ) -> Tuple[List[int], List[float]]:
+        """
+        ids — allowlist id векторів (фільтр метаданих);
+        None → пошук по всьому індексу.
+        """
         if self.index.ntotal == 0:
             return [], []
 
-        q = np.asarray([query_vector], dtype="float32")
+        if ids is not None and len(ids) == 0:
+            return [], []
+
+        q = np.array(query_vector, dtype="float32").reshape(1, -1)
 
         if q.shape[1] != self.dimension:
             raise ValueError(
@@ -55,10 +319,86 @@ class FaissIndex:
 
         faiss.normalize_L2(q)
 
-        # ✅ high-level API
-        distances, indices = self.index.search(q, k)  # type: ignore[arg-type]
+        # мала вибірка → точний перебір дешевший за обхід індексу
+        # (і не втрачає кандидатів через nprobe / efSearch)
+        if ids is not None and len(ids) <= EXACT_SELECTION_MAX:
+            pairs = self._search_subset(q[0], ids)
+            if pairs is not None:
+                pairs = pairs[:k]
+                return [i for i, _ in pairs], [d for _, d in pairs]
+
+        fetch_k = k
+        if self.exact is not None:
+            fetch_k = k * max(1, self.rescore_factor())
+
+        if ids is None:
+            # ✅ high-level API
+            distances, indices = self.index.search(q, fetch_k)  # type: ignore[arg-type]
+        else:
+            selector = faiss.IDSelectorBatch(np.asarray(ids, dtype="int64"))
+            distances, indices = self.index.search(  # type: ignore[call-arg]
+                q, fetch_k, params=self._search_parameters(selector)
+            )
+
+        # FAISS доповнює результат -1, якщо знайдено менше ніж k
+        pairs = [
+            (int(i), float(d))
+            for i, d in zip(indices[0], distances[0])
+            if i >= 0
+        ]
+
+        if self.exact is not None and pairs:
+            pairs = self._rescore(q[0], [i for i, _ in pairs])[:k]
+
+        return [i for i, _ in pairs], [d for _, d in pairs]
+
+    def _search_parameters(self, selector) -> "faiss.SearchParameters":
+        """
+        SearchParameters з IDSelector; nprobe / efSearch задаються
+        явно, бо params перекривають значення з ParameterSpace.
+        """
+        if self.index_type in self.IVF_TYPES:
+            return faiss.SearchParametersIVF(
+                sel=selector, nprobe=int(self.params.get("nprobe", 8))
+            )
+
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(
+                sel=selector, efSearch=int(self.params.get("ef_search", 64))
+            )
+
+        return faiss.SearchParameters(sel=selector)
+
+    def _search_subset(
+        self,
+        q: np.ndarray,
+        ids: np.ndarray
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Точні відстані до вибраних векторів.
+        None — індекс не вміє reconstruct (тоді працює IDSelector).
+        """
+        if self.exact is not None:
+            return self._rescore(q, [int(i) for i in ids])
+
+        try:
+            vectors = self.reconstruct([int(i) for i in ids])
+        except RuntimeError:
+            return None
+
+        distances = 2.0 - 2.0 * (vectors @ q)
+        order = np.argsort(distances, kind="stable")
+        return [(int(ids[j]), float(distances[j])) for j in order]
+
+    def _rescore(self, q: np.ndarray, ids: List[int]) -> List[Tuple[int, float]]:
+        """
+        Точна L2² між нормалізованими векторами: 2 - 2·cos.
+        """
+        vectors = self.exact.get(ids)
+        distances = 2.0 - 2.0 * (vectors @ q)
 
-        return indices[0].tolist(), distances[0].tolist()
+        order = np.argsort(distances, kind="stable")
+        return [(ids[j], float(distances[j])) for j in order]
 
     # --------------------------------------------------
     # META
@@ -67,18 +407,108 @@ class FaissIndex:
     def size(self) -> int:
         return int(self.index.ntotal)
 
+    def has_ids(self) -> bool:
+        """
+        Чи підтримує індекс довільні зовнішні id (add_with_ids / remove_ids).
+        """
+        return self._is_id_map() or isinstance(self.index, faiss.IndexIVF)
+
     # --------------------------------------------------
     # PERSISTENCE
     # --------------------------------------------------
 
     def save(self, path: str) -> None:
+        """
+        Атомарний запис: tmp-файл + os.replace.
+        """
         path = Path(path)
         path.parent.mkdir(parents=True, exist_ok=True)
-        faiss.write_index(self.index, str(path))
+
+        tmp_path = path.with_name(path.name + ".tmp")
+        faiss.write_index(self.index, str(tmp_path))
+        os.replace(tmp_path, path)
+
+        if self.exact is not None:
+            self.exact.save(str(self.vectors_path(path)))
+
+    @staticmethod
+    def vectors_path(path: str) -> Path:
+        return Path(path).with_suffix(".vectors")
 
     @classmethod
-    def load(cls, path: str) -> "FaissIndex":
-        index = faiss.read_index(str(path))
-        obj = cls(index.d)
+    def load(
+        cls,
+        path: str,
+        index_type: str = "flat",
+        params: Optional[Dict] = None,
+        mmap: bool = False,
+    ) -> "FaissIndex":
+        """
+        mmap=True: індекс відображається у памʼять (read-only),
+        сторінки підтягуються ОС за потреби.
+        """
+        if mmap:
+            flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+            index = faiss.read_index(str(path), flags | faiss.IO_FLAG_READ_ONLY)
+        else:
+            index = faiss.read_index(str(path))
+
+        obj = cls.__new__(cls)
+        obj.dimension = index.d
+        obj.index_type = index_type
+        obj.params = dict(params or {})
+        obj.writable = not mmap
         obj.index = index
+
+        obj.exact = None
+        vectors_path = cls.vectors_path(path)
+        if obj.rescore_factor() > 0 and vectors_path.exists():
+            obj.exact = VectorStore.load(str(vectors_path))
+
+        obj._apply_search_params()
+        return obj
+
+    def clone(self) -> "FaissIndex":
+        """
+        Приватна writable-копія (copy-on-write): зміни не зачіпають
+        запити, що зараз шукають по цьому обʼєкту.
+        Лише для writable-індексів (копія mmap — теж view на файл).
+        """
+        if not self.writable:
+            raise RuntimeError("FAISS index is memory-mapped read-only")
+
+        obj = FaissIndex.__new__(FaissIndex)
+        obj.dimension = self.dimension
+        obj.index_type = self.index_type
+        obj.params = dict(self.params)
+        obj.writable = True
+        obj.index = faiss.clone_index(self.index)
+        obj.exact = self.exact.copy() if self.exact is not None else None
+
+        obj._apply_search_params()
         return obj
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _is_id_map(self) -> bool:
+        return isinstance(self.index, (faiss.IndexIDMap, faiss.IndexIDMap2))
+
+    def _base_index(self) -> faiss.Index:
+        if self._is_id_map():
+            return faiss.downcast_index(self.index.index)
+        return self.index
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        # копія: normalize_L2 працює in-place і не повинен змінювати масив виклику
+        x = np.array(vectors, dtype="float32", order="C")
+
+        if x.ndim != 2 or x.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension mismatch: expected (*, {self.dimension}), got {x.shape}"
+            )
+
+        # cosine similarity via normalization
+        faiss.normalize_L2(x)
+        return x
@@ -0,0 +1,154 @@
+"""
+ChunkIdMap
+==========
+
+Компактне відображення vector_id → chunk_id для FAISS-індексу.
+
+Формат sidecar-файлу <index_id>.ids:
+- заголовок: magic (8 байт), width (uint32), reserved (uint32), count (uint64)
+- масив фіксованої ширини (numpy "S{width}", utf-8)
+- позиція в масиві == стабільний int id вектора у FAISS
+- видалений чанк → порожній запис
+
+Файл читається через np.memmap: старт не парсить мільйони рядків,
+а сторінки підтягуються ОС лише під час lookup.
+
+НЕ:
+- не знає про FAISS
+- змінює дані лише copy-on-write (старі читачі бачать стару версію)
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+MAGIC = b"CHUNKIDS"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("width", "<u4"),
+    ("reserved", "<u4"),
+    ("count", "<u8"),
+])
+
+
+class ChunkIdMap:
+    """
+    Fixed-width, memory-mappable vector_id → chunk_id mapping.
+    """
+
+    def __init__(self, ids: np.ndarray):
+        self._ids = ids
+
+    # --------------------------------------------------
+    # CONSTRUCTION
+    # --------------------------------------------------
+
+    @classmethod
+    def from_list(cls, chunk_ids: Iterable[Optional[str]]) -> "ChunkIdMap":
+        encoded = [(cid or "").encode("utf-8") for cid in chunk_ids]
+        width = max((len(cid) for cid in encoded), default=1) or 1
+        return cls(np.array(encoded, dtype=f"S{width}"))
+
+    @classmethod
+    def load(cls, path: str) -> "ChunkIdMap":
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if header.size == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a chunk id map: {path}")
+
+        width = int(header["width"][0])
+        count = int(header["count"][0])
+
+        if count == 0:
+            return cls(np.empty(0, dtype=f"S{width}"))
+
+        ids = np.memmap(
+            path,
+            dtype=f"S{width}",
+            mode="r",
+            offset=HEADER_DTYPE.itemsize,
+            shape=(count,)
+        )
+        return cls(ids)
+
+    def save(self, path: str) -> None:
+        """
+        Атомарний запис: tmp-файл + os.replace.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        header = np.array(
+            [(MAGIC, self.width, 0, len(self))],
+            dtype=HEADER_DTYPE
+        )
+
+        with open(tmp_path, "wb") as f:
+            f.write(header.tobytes())
+            f.write(np.ascontiguousarray(self._ids).tobytes())
+
+        os.replace(tmp_path, path)
+
+    # --------------------------------------------------
+    # READ API
+    # --------------------------------------------------
+
+    @property
+    def width(self) -> int:
+        return self._ids.dtype.itemsize
+
+    def __len__(self) -> int:
+        return int(self._ids.shape[0])
+
+    def get(self, vector_id: int) -> Optional[str]:
+        if not 0 <= vector_id < len(self):
+            return None
+
+        raw = self._ids[vector_id]
+        return raw.decode("utf-8") if raw else None
+
+    def live_count(self) -> int:
+        return int(np.count_nonzero(self._ids != b""))
+
+    def live_items(self) -> List[Tuple[int, str]]:
+        """
+        [(vector_id, chunk_id)] для невидалених чанків.
+        """
+        positions = np.flatnonzero(self._ids != b"")
+        return [
+            (int(i), self._ids[i].decode("utf-8"))
+            for i in positions
+        ]
+
+    def find(self, chunk_ids: Iterable[str]) -> List[int]:
+        """
+        vector_ids для заданих chunk_ids (векторизовано).
+        """
+        targets = np.array([cid.encode("utf-8") for cid in chunk_ids])
+        if targets.size == 0 or len(self) == 0:
+            return []
+
+        return np.flatnonzero(np.isin(self._ids, targets)).tolist()
+
+    def to_list(self) -> List[Optional[str]]:
+        return [self.get(i) for i in range(len(self))]
+
+    # --------------------------------------------------
+    # COPY-ON-WRITE UPDATES
+    # --------------------------------------------------
+
+    def append(self, chunk_ids: List[str]) -> "ChunkIdMap":
+        encoded = [cid.encode("utf-8") for cid in chunk_ids]
+        width = max([self.width] + [len(cid) for cid in encoded])
+
+        return ChunkIdMap(np.concatenate([
+            self._ids.astype(f"S{width}"),
+            np.array(encoded, dtype=f"S{width}"),
+        ]))
+
+    def remove(self, vector_ids: List[int]) -> "ChunkIdMap":
+        ids = np.array(self._ids)
+        ids[np.asarray(vector_ids, dtype="int64")] = b""
+        return ChunkIdMap(ids)
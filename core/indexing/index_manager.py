@@ -1,27 +1,100 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import heapq
 import json
+import os
+import threading
 import uuid
 from datetime import datetime
 
+import numpy as np
+
 from core.indexing.embedder import Embedder
+from core.indexing.embedding_pool import EmbeddingPool
 from core.indexing.faiss_index import FaissIndex
+from core.indexing.id_map import ChunkIdMap
+from core.indexing.locks import ReadWriteLock
+from core.indexing.postings import SearchFilter, VectorPostings
+from core.indexing.projection import Projection
 from config.settings import settings
 
 
+# (chunk_id, score, index_id); score — cosine similarity, більше = краще
+SearchHit = Tuple[str, float, str]
+
+# індекс ролі, натренований на меншому корпусі, перебудовується,
+# коли живих векторів стало у стільки разів більше (див. needs_rebuild)
+RETRAIN_GROWTH = 2
+# tombstones добираються в top-k не більше ніж k * MAX_TOMBSTONE_OVERFETCH
+MAX_TOMBSTONE_OVERFETCH = 4
+# metadata, що переживає перебудову індексу
+REBUILD_KEEP_KEYS = ("embedding_model", "embedding_config", "created_at", "compacted_from")
+# у кеші проєкцій None — валідне значення (повнорозмірний індекс)
+_MISSING = object()
+
+
 class IndexManager:
     """
     Manages multiple FAISS indexes (config-driven).
+
+    Індекси завантажуються ліниво (mmap) і тримаються в LRU
+    з бюджетом памʼяті (system.yaml → indexes).
+
+    Потокобезпечність:
+    - реєстр індексів (_metadata) — під ReadWriteLock: запити читають
+      паралельно, публікація змін ексклюзивна
+    - завантаження індексів і sidecar-ів (диск / mmap) — поза локами;
+      у кеші (_indexes / _id_maps / _postings / _projections, під
+      _cache_lock) потрапляє лише версія поточної metadata
+    - зміни — copy-on-write: писач працює з приватною копією індексу
+      і лише потім атомарно підміняє її в реєстрі; запити, що вже
+      виконуються, дошукують по старій версії
+    - писачі серіалізуються між собою (exclusive())
     """
 
     def __init__(self, indexes_path: str):
         self.embedder = Embedder()
 
+        # bulk ingestion у кількох процесах (models.yaml → embeddings.pool)
+        self.embedding_pool: Optional[EmbeddingPool] = None
+        if settings.models["embeddings"].get("pool", {}).get("enabled", False):
+            self.embedding_pool = EmbeddingPool()
+
         self.indexes_path = Path(indexes_path)
         self.indexes_path.mkdir(parents=True, exist_ok=True)
 
-        self._indexes: Dict[str, FaissIndex] = {}
+        cache_cfg = settings.system.get("indexes", {})
+        self.use_mmap: bool = cache_cfg.get("mmap", True)
+        # 0 → без обмеження
+        self.max_memory_bytes: int = int(cache_cfg.get("max_memory_mb", 0)) * 1024 * 1024
+        # частка tombstones (від живих векторів), після якої індекс перебудовується
+        self.max_tombstone_ratio: float = float(cache_cfg.get("max_tombstone_ratio", 0.2))
+
+        # LRU: найстаріші (холодні) індекси — на початку
+        self._indexes: "OrderedDict[str, FaissIndex]" = OrderedDict()
+        self._index_sizes: Dict[str, int] = {}
         self._metadata: Dict[str, Dict] = {}
+        # vector_id → chunk_id (mmap sidecar *.ids), вантажаться ліниво
+        self._id_maps: Dict[str, ChunkIdMap] = {}
+        # vector_id → document_id / created_at (sidecar *.postings)
+        self._postings: Dict[str, VectorPostings] = {}
+        # PCA / truncate перед FAISS (None — повна розмірність)
+        self._projections: Dict[str, Optional[Projection]] = {}
+
+        # пул для паралельного fan-out (FAISS відпускає GIL під час search)
+        self.search_workers: int = int(
+            settings.system.get("retrieval", {}).get("search_workers", 4)
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # реєстр: читачі — запити, писач — публікація нової версії
+        self._lock = ReadWriteLock()
+        # повний цикл зміни (embed → build → commit) — по одному писачу
+        self._write_mutex = threading.RLock()
+        # LRU змінюється і з потоків запитів
+        self._cache_lock = threading.Lock()
 
         self._load_all_metadata()
 
@@ -33,85 +106,1010 @@ class IndexManager:
         for meta_path in self.indexes_path.glob("*.index.json"):
             with open(meta_path, "r", encoding="utf-8") as f:
                 meta = json.load(f)
-                self._metadata[meta["index_id"]] = meta
+
+            # legacy: chunk_ids у JSON → одноразова міграція в sidecar
+            if "chunk_ids" in meta:
+                meta = self._migrate_chunk_ids(meta)
+
+            self._metadata[meta["index_id"]] = meta
+
+        # незавершена компакція: шард уже записаний, а старі індекси
+        # ще не видалені → старі ігноруються, щоб не дублювати вектори
+        superseded = {
+            old_id
+            for meta in self._metadata.values()
+            for old_id in meta.get("compacted_from", [])
+        }
+        for index_id in superseded:
+            self._metadata.pop(index_id, None)
+
+    def _migrate_chunk_ids(self, meta: Dict) -> Dict:
+        meta = dict(meta)
+        id_map = ChunkIdMap.from_list(meta.pop("chunk_ids"))
+
+        meta["ids_path"] = str(self.indexes_path / f"{meta['index_id']}.ids")
+        meta["ids_count"] = len(id_map)
+
+        id_map.save(meta["ids_path"])
+        self._write_metadata(meta)
+
+        return meta
+
+    def get_metadata(self, index_id: str) -> Dict:
+        with self._lock.read():
+            meta = self._metadata.get(index_id)
+        if not meta:
+            raise KeyError(f"Index metadata not found: {index_id}")
+        return meta
+
+    def get_id_map(self, index_id: str) -> ChunkIdMap:
+        return self._id_map_for(self.get_metadata(index_id))
+
+    def get_postings(self, index_id: str) -> Optional[VectorPostings]:
+        """
+        None — індекс побудований до появи *.postings (див. migrate_postings).
+        """
+        return self._postings_for(self.get_metadata(index_id))
+
+    def get_projection(self, index_id: str) -> Optional[Projection]:
+        """
+        Проєкція, в просторі якої лежать вектори індексу
+        (None — вектори моделі без змін).
+        """
+        return self._projection_for(self.get_metadata(index_id))
+
+    def _id_map_for(self, meta: Dict) -> ChunkIdMap:
+        id_map = self._cached(self._id_maps, meta)
+        if id_map is None:
+            id_map = self._remember(self._id_maps, meta, ChunkIdMap.load(meta["ids_path"]))
+        return id_map
+
+    def _postings_for(self, meta: Dict) -> Optional[VectorPostings]:
+        postings = self._cached(self._postings, meta)
+        if postings is None:
+            postings_path = meta.get("postings_path")
+            if not postings_path or not os.path.exists(postings_path):
+                return None
+
+            postings = self._remember(self._postings, meta, VectorPostings.load(postings_path))
+        return postings
+
+    def _projection_for(self, meta: Dict) -> Optional[Projection]:
+        projection = self._cached(self._projections, meta, _MISSING)
+        if projection is _MISSING:
+            projection = self._remember(
+                self._projections,
+                meta,
+                Projection.from_metadata(meta["projection"]) if meta.get("projection") else None
+            )
+        return projection
+
+    def _cached(self, cache: Dict, meta: Dict, default=None):
+        """
+        Закешоване для цієї версії metadata (інакше default).
+        """
+        with self._lock.read(), self._cache_lock:
+            if self._metadata.get(meta["index_id"]) is not meta:
+                return default
+            return cache.get(meta["index_id"], default)
+
+    def _remember(self, cache: Dict, meta: Dict, value):
+        """
+        Кладе завантажене поза локами в кеш, якщо за цей час metadata
+        не змінилась; паралельний запит міг завантажити першим.
+        """
+        with self._lock.read(), self._cache_lock:
+            if self._metadata.get(meta["index_id"]) is not meta:
+                return value
+            return cache.setdefault(meta["index_id"], value)
+
+    def exclusive(self) -> threading.RLock:
+        """
+        Серіалізує писачів (with index_manager.exclusive(): ...).
+        Запити при цьому НЕ блокуються.
+        """
+        return self._write_mutex
+
+    def migrate_postings(self, chunk_store) -> List[str]:
+        """
+        Одноразово будує *.postings для старих індексів з ChunkStore.
+        Повертає index_ids, які було доповнено.
+        """
+        migrated: List[str] = []
+
+        with self._write_mutex:
+            for index_id in self.list_indexes():
+                meta = self.get_metadata(index_id)
+                if meta.get("postings_path"):
+                    continue
+
+                chunk_ids = self.get_id_map(index_id).to_list()
+                loaded = iter(chunk_store.load_many([c for c in chunk_ids if c]))
+                chunks = [
+                    (next(loaded) if chunk_id else None) or {}
+                    for chunk_id in chunk_ids
+                ]
+                postings = VectorPostings.from_chunks(chunks)
+
+                updated = dict(meta)
+                updated["postings_path"] = str(self.indexes_path / f"{index_id}.postings")
+                postings.save(updated["postings_path"])
+                self._write_metadata(updated)
+
+                with self._lock.write():
+                    self._metadata[index_id] = updated
+                    self._postings[index_id] = postings
+                migrated.append(index_id)
+
+        return migrated
 
     # --------------------------------------------------
     # BUILD
     # --------------------------------------------------
 
     def build_index(self, chunks: List[Dict], index_role: str = "general") -> Dict:
+        embeddings = self._embed_chunks(chunks)
+
+        with self._write_mutex:
+            return self._build_and_register(chunks, embeddings, index_role)
+
+    def _build_and_register(
+        self,
+        chunks: List[Dict],
+        embeddings: np.ndarray,
+        index_role: str
+    ) -> Dict:
+        # нові індекси ролі — у просторі вже наявних (їх можна буде злити)
+        projection = self._role_projection(index_role)
+        if projection is not None:
+            embeddings = projection.apply(embeddings)
+
+        metadata, faiss_index = self.build_from_vectors(
+            embeddings,
+            chunk_ids=[chunk["chunk_id"] for chunk in chunks],
+            document_ids=sorted({chunk["document_id"] for chunk in chunks}),
+            index_role=index_role,
+            postings=VectorPostings.from_chunks(chunks),
+            projection=projection,
+        )
+
+        # файли вже на диску → індекс стає видимим одним кроком
+        with self._lock.write():
+            self._metadata[metadata["index_id"]] = metadata
+        self._cache_index(metadata["index_id"], faiss_index)
+
+        return metadata
+
+    def _embed_chunks(self, chunks: List[Dict]) -> np.ndarray:
+        # embedding — найдовший крок, тому виконується поза локами
         texts = [chunk["content"] for chunk in chunks]
-        chunk_ids = [chunk["chunk_id"] for chunk in chunks]
-        document_ids = sorted({chunk["document_id"] for chunk in chunks})
 
-        embeddings = self.embedder.embed_batch(texts)
-        dimension = len(embeddings[0])
+        # кеш — у цьому процесі, промахи великого батчу — у процеси пулу
+        encode = None
+        if self.embedding_pool is not None and len(texts) >= self.embedding_pool.min_texts:
+            encode = self.embedding_pool.embed_batch_array
+
+        return self.embedder.embed_batch_array(texts, encode=encode)
 
-        faiss_index = FaissIndex(dimension)
-        faiss_index.add(embeddings)
+    def build_from_vectors(
+        self,
+        vectors: np.ndarray,
+        chunk_ids: List[str],
+        document_ids: List[str],
+        index_role: str,
+        extra: Optional[Dict] = None,
+        postings: Optional[VectorPostings] = None,
+        projection: Optional[Projection] = None,
+        index_id: Optional[str] = None,
+        revision: int = 0
+    ) -> Tuple[Dict, FaissIndex]:
+        """
+        Будує та зберігає індекс з готових векторів.
+        НЕ реєструє його в менеджері (див. build_index / swap_indexes).
 
-        index_id = str(uuid.uuid4())
-        index_path = self.indexes_path / f"{index_id}.faiss"
-        metadata_path = self.indexes_path / f"{index_id}.index.json"
+        projection — простір, у якому вже лежать vectors (компакція,
+        наявна роль); None → vectors моделі, проєкція підбирається
+        з models.yaml → indexing.projection.
+
+        index_id / revision — нова ревізія наявного індексу
+        (rebuild_index): файли <index_id>.r<revision>.*, metadata — та сама.
+        """
+        vectors = np.asarray(vectors, dtype="float32")
+
+        # порожній індекс мав би dimension 0 і ламав би append у роль
+        if vectors.ndim != 2 or vectors.shape[0] == 0 or vectors.shape[1] == 0:
+            raise ValueError(f"Cannot build an index from vectors of shape {vectors.shape}")
+
+        if projection is None:
+            projection = self.fit_projection(vectors)
+            if projection is not None:
+                vectors = projection.apply(vectors)
+
+        dimension = vectors.shape[1]
+
+        faiss_index = self._create_faiss_index(dimension, len(vectors))
+        if faiss_index.requires_training():
+            faiss_index.train(self._training_sample(vectors))
+        faiss_index.add(vectors)
+
+        index_id = index_id or str(uuid.uuid4())
+        stem = f"{index_id}.r{revision}" if revision else index_id
+        index_path = self.indexes_path / f"{stem}.faiss"
+        ids_path = self.indexes_path / f"{stem}.ids"
+        postings_path = self.indexes_path / f"{stem}.postings"
 
         faiss_index.save(str(index_path))
+        id_map = ChunkIdMap.from_list(chunk_ids)
+        id_map.save(str(ids_path))
+
+        if postings is not None:
+            postings.save(str(postings_path))
+
+        projection_path = self.indexes_path / f"{stem}.projection"
+        if projection is not None and projection.kind == "pca":
+            projection.save(str(projection_path))
 
         metadata = {
             "index_id": index_id,
             "index_type": "faiss",
+            "faiss_index_type": faiss_index.index_type,
+            "faiss_params": faiss_index.params,
+            "faiss_factory": faiss_index.factory_string(),
             "index_role": index_role,
+            "embedding_model": settings.models["embeddings"]["model"],
             "embedding_config": settings.models["embeddings"],
             "index_path": str(index_path),
-            "chunk_ids": chunk_ids,
+            "dimension": dimension,
+            # vector_id → chunk_id (бінарний sidecar, див. ChunkIdMap)
+            "ids_path": str(ids_path),
+            "ids_count": len(id_map),
             "document_ids": document_ids,
+            # вектори, що лишилися в індексі після видалення (HNSW / legacy)
+            "tombstones": 0,
+            # корпус, під який підібрані параметри / тренування / проєкція
+            # (faiss_params: nlist, nbits, downgraded_from), див. needs_rebuild
+            "trained_ntotal": len(vectors),
+            "revision": revision,
             "created_at": datetime.utcnow().isoformat() + "Z",
         }
+        if postings is not None:
+            # document_id / created_at векторів для фільтрованого пошуку
+            metadata["postings_path"] = str(postings_path)
+        if projection is not None:
+            # запити проходять ту саму проєкцію (див. query_many)
+            metadata["projection"] = projection.to_metadata(str(projection_path))
+        metadata.update(extra or {})
+
+        self._write_metadata(metadata)
+
+        return metadata, faiss_index
+
+    def index_chunks(self, chunks: List[Dict], index_role: str = "general") -> Optional[Dict]:
+        """
+        Дописує чанки в наявний індекс ролі (з тією ж embedding-моделлю)
+        або створює новий, якщо такого ще немає.
+        Немає чанків (документ без тексту) → None, індекс не змінюється.
+
+        Індекс, що переріс корпус, на якому тренувався, перебудовується
+        (див. needs_rebuild / rebuild_index).
+        """
+        if not chunks:
+            return None
+
+        embeddings = self._embed_chunks(chunks)
+
+        # вибір індексу і запис — атомарно відносно інших писачів
+        with self._write_mutex:
+            index_id = self._get_appendable_index(index_role)
+            if index_id is None:
+                return self._build_and_register(chunks, embeddings, index_role)
+
+            return self._append_vectors(index_id, chunks, embeddings)
+
+    # --------------------------------------------------
+    # INCREMENTAL UPDATE
+    # --------------------------------------------------
+
+    def append_chunks(self, index_id: str, chunks: List[Dict]) -> Dict:
+        """
+        Додає чанки в наявний індекс (add_with_ids).
+        """
+        meta = self.get_metadata(index_id)
+        if not chunks:
+            return meta
+
+        embeddings = self._embed_chunks(chunks)
+
+        with self._write_mutex:
+            return self._append_vectors(index_id, chunks, embeddings)
+
+    def _append_vectors(
+        self,
+        index_id: str,
+        chunks: List[Dict],
+        embeddings: np.ndarray
+    ) -> Dict:
+        meta = self.get_metadata(index_id)
+        faiss_index = self._load_writable(index_id)
+        id_map = self.get_id_map(index_id)
+
+        projection = self.get_projection(index_id)
+        if projection is not None:
+            embeddings = projection.apply(embeddings)
+
+        start = len(id_map)
+        vector_ids = list(range(start, start + len(chunks)))
+        faiss_index.add(embeddings, ids=vector_ids)
+
+        id_map = id_map.append([c["chunk_id"] for c in chunks])
+
+        postings = self.get_postings(index_id)
+        if postings is not None:
+            postings = postings.append(chunks)
+
+        updated = dict(meta)
+        updated["ids_count"] = len(id_map)
+        updated["document_ids"] = sorted(
+            set(meta.get("document_ids", [])) | {c["document_id"] for c in chunks}
+        )
+        updated["updated_at"] = datetime.utcnow().isoformat() + "Z"
+
+        self._commit(index_id, faiss_index, id_map, updated, postings)
+
+        if self.needs_rebuild(index_id):
+            return self.rebuild_index(index_id)
+        return updated
+
+    def remove_chunks(
+        self,
+        index_id: str,
+        chunk_ids: List[str],
+        document_id: Optional[str] = None
+    ) -> int:
+        """
+        Видаляє вектори чанків з індексу (remove_ids).
+        document_id — документ, що видаляється повністю
+        (прибирається з document_ids індексу).
+
+        Повертає кількість чанків, знятих з індексу.
+        """
+        with self._write_mutex:
+            return self._remove_vectors(index_id, chunk_ids, document_id)
+
+    def _remove_vectors(
+        self,
+        index_id: str,
+        chunk_ids: List[str],
+        document_id: Optional[str]
+    ) -> int:
+        meta = self.get_metadata(index_id)
+        id_map = self.get_id_map(index_id)
+
+        vector_ids = id_map.find(chunk_ids)
+        if not vector_ids:
+            return 0
+
+        faiss_index = self._load_writable(index_id)
+        removed = faiss_index.remove(vector_ids)
+
+        id_map = id_map.remove(vector_ids)
+        has_live = id_map.live_count() > 0
+
+        postings = self.get_postings(index_id)
+        if postings is not None:
+            postings = postings.remove(vector_ids)
+
+        updated = dict(meta)
+        updated["tombstones"] = meta.get("tombstones", 0) + len(vector_ids) - removed
+        updated["document_ids"] = [
+            doc_id
+            for doc_id in meta.get("document_ids", [])
+            if doc_id != document_id and has_live
+        ]
+        updated["updated_at"] = datetime.utcnow().isoformat() + "Z"
+
+        self._commit(index_id, faiss_index, id_map, updated, postings)
+
+        if self.needs_rebuild(index_id):
+            self.rebuild_index(index_id)
+        return len(vector_ids)
+
+    def needs_rebuild(self, index_id: str) -> Optional[str]:
+        """
+        Причина перебудувати індекс або None.
+
+        "tombstones": видалені вектори, що лишилися у FAISS (HNSW / legacy),
+        перевищили indexes.max_tombstone_ratio живих — запити добирають
+        їх у top-k.
+        "undertrained": nlist / PQ nbits / fallback-тип / PCA підбиралися
+        під trained_ntotal векторів, а живих уже в RETRAIN_GROWTH+ разів
+        більше (індекс ролі росте дописуванням документів).
+        """
+        meta = self.get_metadata(index_id)
+        live = self.get_id_map(index_id).live_count()
+        if live == 0:
+            return None
+
+        if meta.get("tombstones", 0) > self.max_tombstone_ratio * live:
+            return "tombstones"
+
+        cfg = self._index_config()
+        # legacy-індекс без trained_ntotal → одноразова перебудова
+        trained = int(meta.get("trained_ntotal", 0))
+        if (
+            trained < int(cfg.get("train_sample_size", 100000))
+            and live >= RETRAIN_GROWTH * max(trained, 1)
+            and self._depends_on_sample(meta)
+        ):
+            return "undertrained"
 
-        with open(metadata_path, "w", encoding="utf-8") as f:
+        return None
+
+    def _depends_on_sample(self, meta: Dict) -> bool:
+        """
+        Чи залежить індекс від розміру тренувального корпусу.
+        """
+        if meta.get("faiss_index_type") in ("ivf", "pq", "ivf_pq"):
+            return True
+
+        if meta.get("faiss_params", {}).get("downgraded_from"):
+            return True
+
+        # PCA не навчилась на замалій вибірці (min_fit_vectors)
+        projection_cfg = self._index_config().get("projection", {})
+        return projection_cfg.get("type", "none") == "pca" and "projection" not in meta
+
+    def rebuild_index(self, index_id: str) -> Dict:
+        """
+        Перебудовує індекс з його живих векторів (без повторного embedding)
+        під тим самим index_id — metadata.index_ids чанків не змінюються.
+
+        Параметри, тренування і проєкція — під поточний розмір; vector_ids
+        ущільнюються. Файли нової ревізії пишуться поруч, перемикання —
+        атомарний запис *.index.json, старі файли видаляються після нього.
+        """
+        with self._write_mutex:
+            meta = self.get_metadata(index_id)
+            live = self.get_id_map(index_id).live_items()
+            if not live:
+                return meta
+
+            vector_ids = [vector_id for vector_id, _ in live]
+            vectors = self._load_writable(index_id).reconstruct(vector_ids)
+
+            postings = self.get_postings(index_id)
+            if postings is not None:
+                postings = postings.take(vector_ids)
+
+            extra = {key: meta[key] for key in REBUILD_KEEP_KEYS if key in meta}
+            extra["updated_at"] = datetime.utcnow().isoformat() + "Z"
+
+            metadata, faiss_index = self.build_from_vectors(
+                vectors,
+                chunk_ids=[chunk_id for _, chunk_id in live],
+                document_ids=meta.get("document_ids", []),
+                index_role=meta.get("index_role", "general"),
+                extra=extra,
+                postings=postings,
+                # повнорозмірний індекс отримає PCA тут, якщо вже вистачає векторів
+                projection=self.get_projection(index_id),
+                index_id=index_id,
+                revision=int(meta.get("revision", 0)) + 1,
+            )
+
+            with self._lock.write():
+                self._metadata[index_id] = metadata
+                self._id_maps.pop(index_id, None)
+                self._postings.pop(index_id, None)
+                self._projections.pop(index_id, None)
+                with self._cache_lock:
+                    self._indexes.pop(index_id, None)
+                    self._index_sizes.pop(index_id, None)
+
+            self._cache_index(index_id, faiss_index)
+            self._delete_files(meta, keep_metadata=True)
+
+            return metadata
+
+    def swap_indexes(
+        self,
+        old_ids: List[str],
+        new_indexes: List[Tuple[Dict, FaissIndex]]
+    ) -> None:
+        """
+        Підміняє набір індексів новим (компакція).
+
+        Нові індекси вже збережені на диску; підміна — один крок
+        під write-локом, тож запит бачить або старий набір, або новий.
+        Запити, що виконуються, дошукують по старих обʼєктах FaissIndex
+        (mmap лишається валідним і після видалення файлів).
+        """
+        with self._write_mutex:
+            removed: List[Dict] = []
+
+            with self._lock.write():
+                for metadata, _ in new_indexes:
+                    self._metadata[metadata["index_id"]] = metadata
+
+                for index_id in old_ids:
+                    meta = self._metadata.pop(index_id, None)
+                    self._id_maps.pop(index_id, None)
+                    self._postings.pop(index_id, None)
+                    self._projections.pop(index_id, None)
+                    if meta:
+                        removed.append(meta)
+
+            with self._cache_lock:
+                for index_id in old_ids:
+                    self._indexes.pop(index_id, None)
+                    self._index_sizes.pop(index_id, None)
+
+            for metadata, faiss_index in new_indexes:
+                self._cache_index(metadata["index_id"], faiss_index)
+
+            for meta in removed:
+                self._delete_files(meta)
+
+    def _delete_files(self, meta: Dict, keep_metadata: bool = False) -> None:
+        """
+        keep_metadata=True — файли попередньої ревізії (rebuild_index).
+        """
+        paths = [
+            Path(meta["index_path"]),
+            FaissIndex.vectors_path(meta["index_path"]),
+            Path(meta["ids_path"]),
+        ]
+        if meta.get("postings_path"):
+            paths.append(Path(meta["postings_path"]))
+        if meta.get("projection", {}).get("path"):
+            paths.append(Path(meta["projection"]["path"]))
+        if not keep_metadata:
+            paths.append(self.indexes_path / f"{meta['index_id']}.index.json")
+
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+
+    def _get_appendable_index(self, index_role: str) -> Optional[str]:
+        model = settings.models["embeddings"]["model"]
+
+        with self._lock.read():
+            candidates = [
+                meta
+                for meta in self._metadata.values()
+                if meta.get("index_role") == index_role
+                and meta.get("embedding_model") == model
+            ]
+        if not candidates:
+            return None
+
+        # найсвіжіший індекс ролі
+        return max(candidates, key=lambda meta: meta["created_at"])["index_id"]
+
+    def _role_projection(self, index_role: str) -> Optional[Projection]:
+        """
+        Проєкція найсвіжішого індексу ролі, якщо вона відповідає
+        поточному models.yaml → indexing.projection.
+        """
+        index_id = self._get_appendable_index(index_role)
+        if index_id is None:
+            return None
+
+        projection = self.get_projection(index_id)
+        cfg = self._index_config().get("projection", {})
+        if (
+            projection is None
+            or projection.kind != cfg.get("type", "none")
+            or projection.output_dim != int(cfg.get("dimension", 0))
+        ):
+            return None
+
+        return projection
+
+    def _load_writable(self, index_id: str) -> FaissIndex:
+        """
+        Приватна копія для змін: опублікований обʼєкт може саме зараз
+        обслуговувати запити, а mmap-індекси ще й read-only.
+        """
+        with self._cache_lock:
+            cached = self._indexes.get(index_id)
+        # clone mmap-індексу лишився б view на файл → читаємо з диска
+        if cached is not None and cached.writable:
+            return cached.clone()
+
+        meta = self.get_metadata(index_id)
+        return FaissIndex.load(
+            meta["index_path"],
+            index_type=meta.get("faiss_index_type", "flat"),
+            params=meta.get("faiss_params"),
+        )
+
+    def _commit(
+        self,
+        index_id: str,
+        faiss_index: FaissIndex,
+        id_map: ChunkIdMap,
+        metadata: Dict,
+        postings: Optional[VectorPostings] = None
+    ) -> None:
+        """
+        Атомарно фіксує зміни: .faiss → *.ids → *.postings → *.index.json
+        (кожен через tmp + os.replace), потім in-memory стан —
+        одним кроком під write-локом.
+        """
+        faiss_index.save(metadata["index_path"])
+        id_map.save(metadata["ids_path"])
+        if postings is not None:
+            postings.save(metadata["postings_path"])
+        self._write_metadata(metadata)
+
+        with self._lock.write():
+            self._metadata[index_id] = metadata
+            self._id_maps[index_id] = id_map
+            if postings is not None:
+                self._postings[index_id] = postings
+            with self._cache_lock:
+                self._indexes.pop(index_id, None)
+                self._index_sizes.pop(index_id, None)
+
+        self._cache_index(index_id, faiss_index)
+
+    def _write_metadata(self, metadata: Dict) -> None:
+        metadata_path = self.indexes_path / f"{metadata['index_id']}.index.json"
+        tmp_path = metadata_path.with_name(metadata_path.name + ".tmp")
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
 
-        self._metadata[index_id] = metadata
-        self._indexes[index_id] = faiss_index
+        os.replace(tmp_path, metadata_path)
 
-        return metadata
+    # --------------------------------------------------
+    # ANN CONFIG
+    # --------------------------------------------------
+
+    @staticmethod
+    def _index_config() -> Dict:
+        return settings.models.get("indexing", {})
+
+    def _create_faiss_index(self, dimension: int, n_vectors: int) -> FaissIndex:
+        """
+        Створює FAISS-індекс згідно з models.yaml → indexing.
+        """
+        cfg = self._index_config()
+        requested_type = cfg.get("type", "flat")
+
+        sample_size = min(n_vectors, int(cfg.get("train_sample_size", 100000)))
+        # замалий корпус для PQ → sq8 (faiss_params.downgraded_from у metadata)
+        index_type = FaissIndex.fallback_type(requested_type, sample_size)
+
+        params = FaissIndex.effective_params(
+            index_type,
+            cfg.get(index_type, {}),
+            sample_size,
+            dimension=dimension,
+        )
+        params["rescore_factor"] = int(cfg.get("rescore_factor", 0))
+        params["vectors_dtype"] = cfg.get("vectors_dtype", "float32")
+        if index_type != requested_type:
+            params["downgraded_from"] = requested_type
+
+        return FaissIndex(dimension, index_type=index_type, params=params)
+
+    def fit_projection(self, vectors: np.ndarray) -> Optional[Projection]:
+        """
+        Проєкція з models.yaml → indexing.projection для векторів моделі.
+        """
+        return Projection.from_config(
+            self._index_config().get("projection", {}),
+            self._training_sample(vectors),
+        )
+
+    def _training_sample(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Випадкова (відтворювана) вибірка для тренування IVF.
+        """
+        sample_size = int(self._index_config().get("train_sample_size", 100000))
+        if len(embeddings) <= sample_size:
+            return embeddings
+
+        rng = np.random.default_rng(0)
+        positions = rng.choice(len(embeddings), size=sample_size, replace=False)
+        return embeddings[np.sort(positions)]
 
     # --------------------------------------------------
     # LOAD
     # --------------------------------------------------
 
-    def load_index(self, index_id: str) -> None:
-        if index_id in self._indexes:
+    def load_index(self, index_id: str) -> FaissIndex:
+        return self._index_for(self.get_metadata(index_id))
+
+    def _index_for(self, meta: Dict) -> FaissIndex:
+        index_id = meta["index_id"]
+
+        with self._lock.read(), self._cache_lock:
+            if self._metadata.get(index_id) is meta and index_id in self._indexes:
+                self._indexes.move_to_end(index_id)
+                return self._indexes[index_id]
+
+        faiss_index = FaissIndex.load(
+            meta["index_path"],
+            index_type=meta.get("faiss_index_type", "flat"),
+            params=meta.get("faiss_params"),
+            mmap=self.use_mmap,
+        )
+        return self._cache_index(index_id, faiss_index, meta)
+
+    # --------------------------------------------------
+    # LRU
+    # --------------------------------------------------
+
+    def _cache_index(
+        self,
+        index_id: str,
+        faiss_index: FaissIndex,
+        meta: Optional[Dict] = None
+    ) -> FaissIndex:
+        """
+        meta — версія, з якої завантажено faiss_index (None — поточна).
+        Повертає обʼєкт, що лежить у кеші.
+        """
+        meta = meta or self.get_metadata(index_id)
+
+        # розмір файлу — оцінка памʼяті, яку індекс займе (або змапить)
+        try:
+            size = os.path.getsize(meta["index_path"])
+        except OSError:
+            size = 0
+
+        with self._lock.read(), self._cache_lock:
+            # індекс змінився, поки завантажувався
+            if self._metadata.get(index_id) is not meta:
+                return faiss_index
+
+            # паралельний запит міг уже завантажити (або писач — оновити) індекс
+            cached = self._indexes.get(index_id)
+            if cached is not None and cached is not faiss_index:
+                return cached
+
+            self._indexes[index_id] = faiss_index
+            self._indexes.move_to_end(index_id)
+            self._index_sizes[index_id] = size
+
+            self._evict_cold_indexes(keep=index_id)
+
+        return faiss_index
+
+    def _evict_cold_indexes(self, keep: str) -> None:
+        """
+        Викидає найменш нещодавно використані індекси,
+        поки сумарний розмір перевищує бюджет (під _cache_lock).
+        """
+        if self.max_memory_bytes <= 0:
             return
 
-        meta = self._metadata.get(index_id)
-        if not meta:
-            raise KeyError(f"Index metadata not found: {index_id}")
+        while sum(self._index_sizes.values()) > self.max_memory_bytes:
+            cold_id = next(iter(self._indexes))
+            if cold_id == keep:
+                break
 
-        self._indexes[index_id] = FaissIndex.load(meta["index_path"])
+            del self._indexes[cold_id]
+            del self._index_sizes[cold_id]
 
     # --------------------------------------------------
     # QUERY
     # --------------------------------------------------
 
-    def query(self, query: str, k: int, index_id: str) -> List[str]:
-        self.load_index(index_id)
+    def query(
+        self,
+        query: str,
+        k: int,
+        index_id: str,
+        filters: Optional[SearchFilter] = None,
+        embeddings=None
+    ) -> List[str]:
+        query_vector = (embeddings or self.embedder).embed_array(query)
+        return [
+            chunk_id
+            for chunk_id, _, _ in self.search_vector(query_vector, k, index_id, filters)
+        ]
+
+    def query_many(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        index_ids: List[str],
+        filters: Optional[SearchFilter] = None
+    ) -> List[SearchHit]:
+        """
+        Multi-index recall для вже обчисленого query-вектора.
+
+        - запит ембедиться ОДИН раз (на стороні виклику)
+        - індекси шукаються паралельно (thread pool)
+        - filters відсікають індекси за metadata, а всередині
+          індексу стають allowlist-ом для FAISS (IDSelector)
+        - результати зливаються в глобальний top-k без дублікатів
+        """
+        if not index_ids:
+            return []
+
+        # знімок metadata — під read-локом; індекс, id map і sidecar-и
+        # саме цієї версії вантажаться вже без локу (холодне завантаження
+        # не блокує писачів), FAISS-пошук — теж.
+        # Індекси, що зникли (компакція), пропускаються
+        with self._lock.read():
+            metas = [(index_id, self._metadata.get(index_id)) for index_id in index_ids]
 
-        query_vector = self.embedder.embed(query)
-        indices, _ = self._indexes[index_id].search(query_vector, k)
+        targets = []
+        # fingerprint проєкції → query-вектор у її просторі
+        projected: Dict[str, np.ndarray] = {}
+        for index_id, meta in metas:
+            try:
+                target = self._search_target(meta, query_vector, filters, projected)
+            except (OSError, RuntimeError):
+                # файли версії видалено (rebuild_index) → поточна версія
+                with self._lock.read():
+                    current = self._metadata.get(index_id)
+                if current is meta:
+                    raise
+                target = self._search_target(current, query_vector, filters, projected)
 
-        chunk_ids = self._metadata[index_id]["chunk_ids"]
-        return [chunk_ids[i] for i in indices if i < len(chunk_ids)]
+            if target is not None:
+                targets.append(target)
+
+        if len(targets) <= 1 or self.search_workers <= 1:
+            per_index = [
+                self._search_loaded(meta, faiss_index, id_map, q, k, allowed)
+                for meta, faiss_index, id_map, q, allowed in targets
+            ]
+        else:
+            per_index = list(self._get_executor().map(
+                lambda target: self._search_loaded(*target[:4], k, target[4]),
+                targets
+            ))
+
+        return self._merge_top_k(per_index, k)
+
+    def search_vector(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        index_id: str,
+        filters: Optional[SearchFilter] = None
+    ) -> List[SearchHit]:
+        self.get_metadata(index_id)
+        return self.query_many(query_vector, k, [index_id], filters)
+
+    def _search_target(
+        self,
+        meta: Optional[Dict],
+        query_vector: np.ndarray,
+        filters: Optional[SearchFilter],
+        projected: Dict[str, np.ndarray]
+    ) -> Optional[Tuple]:
+        """
+        (meta, індекс, id map, query-вектор, allowlist) однієї версії;
+        None — індекс зник або не проходить фільтр.
+        """
+        if meta is None or (filters and not filters.matches_index(meta)):
+            return None
+
+        allowed = self._resolve_filter(meta, filters)
+        if allowed is not None and len(allowed) == 0:
+            return None
+
+        return (
+            meta,
+            self._index_for(meta),
+            self._id_map_for(meta),
+            self._project_query(query_vector, meta, projected),
+            allowed,
+        )
+
+    def _project_query(
+        self,
+        query_vector: np.ndarray,
+        meta: Dict,
+        projected: Dict[str, np.ndarray]
+    ) -> np.ndarray:
+        projection = self._projection_for(meta)
+        if projection is None:
+            return query_vector
+
+        key = projection.fingerprint()
+        if key not in projected:
+            projected[key] = projection.apply(query_vector)
+        return projected[key]
+
+    def _resolve_filter(
+        self,
+        meta: Dict,
+        filters: Optional[SearchFilter]
+    ) -> Optional[np.ndarray]:
+        """
+        SearchFilter → allowlist vector_ids індексу.
+        None — обмеження на рівні векторів не потрібне.
+        """
+        if filters is None or not filters.is_vector_level():
+            return None
+
+        postings = self._postings_for(meta)
+        if postings is not None:
+            return postings.select(filters)
+
+        # старий індекс без *.postings: можна вирішити лише цілим індексом
+        only_documents = filters.created_from is None and filters.created_to is None
+        if only_documents and set(meta.get("document_ids", [])) <= filters.document_ids:
+            return None
+
+        return np.empty(0, dtype="int64")
+
+    @staticmethod
+    def _search_loaded(
+        meta: Dict,
+        faiss_index: FaissIndex,
+        id_map: ChunkIdMap,
+        query_vector: np.ndarray,
+        k: int,
+        allowed: Optional[np.ndarray] = None
+    ) -> List[SearchHit]:
+        index_id = meta["index_id"]
+
+        # tombstones займають місця в top-k → добираємо з запасом, обмеженим
+        # MAX_TOMBSTONE_OVERFETCH (більше tombstones → rebuild_index);
+        # allowlist містить лише живі вектори
+        fetch_k = k
+        if allowed is None:
+            fetch_k += min(meta.get("tombstones", 0), k * MAX_TOMBSTONE_OVERFETCH)
+        indices, distances = faiss_index.search(query_vector, fetch_k, ids=allowed)
+
+        hits: List[SearchHit] = []
+        for i, d in zip(indices, distances):
+            chunk_id = id_map.get(i)
+            if chunk_id is not None:
+                # L2² між нормалізованими векторами → cosine similarity
+                hits.append((chunk_id, 1.0 - d / 2.0, index_id))
+
+        return hits[:k]
+
+    @staticmethod
+    def _merge_top_k(per_index: List[List[SearchHit]], k: int) -> List[SearchHit]:
+        """
+        Глобальний top-k: дублікати чанка між індексами
+        зводяться до найкращого score.
+        """
+        best: Dict[str, SearchHit] = {}
+
+        for hits in per_index:
+            for hit in hits:
+                current = best.get(hit[0])
+                if current is None or hit[1] > current[1]:
+                    best[hit[0]] = hit
+
+        return heapq.nlargest(k, best.values(), key=lambda hit: hit[1])
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._cache_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.search_workers,
+                    thread_name_prefix="faiss-search"
+                )
+            return self._executor
 
     # --------------------------------------------------
     # DISCOVERY
     # --------------------------------------------------
 
     def list_indexes(self) -> List[str]:
-        return list(self._metadata.keys())
+        with self._lock.read():
+            return list(self._metadata.keys())
 
     def get_indexes_by_role(self, role: str) -> List[str]:
-        return [
-            index_id
-            for index_id, meta in self._metadata.items()
-            if meta.get("index_role") == role
-        ]
+        with self._lock.read():
+            return [
+                index_id
+                for index_id, meta in self._metadata.items()
+                if meta.get("index_role") == role
+            ]
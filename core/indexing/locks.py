@@ -0,0 +1,97 @@
+"""
+ReadWriteLock
+=============
+
+Readers-writer lock для IndexManager.
+
+- багато читачів одночасно, писач — ексклюзивно
+- пріоритет писача: нові читачі чекають, якщо писач у черзі
+  (інакше постійний потік запитів блокує ingestion назавжди)
+- реентерабельний у межах потоку (read усередині read / write,
+  write усередині write); підвищення read → write НЕ підтримується
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class ReadWriteLock:
+    """
+    Writer-preferring, per-thread reentrant readers-writer lock.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._local = threading.local()
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        depth = getattr(self._local, "reads", 0)
+
+        # повторний вхід (або читання писачем) — без очікування,
+        # інакше потік чекав би писача, що чекає на нього
+        if depth or self._writer == threading.get_ident():
+            self._local.reads = depth + 1
+            try:
+                yield
+            finally:
+                self._local.reads = depth
+            return
+
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+        self._local.reads = 1
+        try:
+            yield
+        finally:
+            self._local.reads = 0
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    # --------------------------------------------------
+    # WRITE
+    # --------------------------------------------------
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        me = threading.get_ident()
+
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                if getattr(self._local, "reads", 0):
+                    raise RuntimeError("Cannot upgrade a read lock to a write lock")
+
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+
+                self._writer = me
+                self._writer_depth = 1
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if self._writer_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
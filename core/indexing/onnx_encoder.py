@@ -0,0 +1,212 @@
+"""
+OnnxEncoder
+===========
+
+ONNX Runtime backend для Embedder (CPU).
+
+Відповідає за:
+- одноразовий експорт sentence-transformers моделі в ONNX
+  (transformer + tokenizer + pooling-конфіг у локальний каталог)
+- опційну dynamic int8 квантизацію (onnxruntime.quantization)
+- inference з тим самим pooling / нормалізацією, що й torch backend
+
+Артефакт: <models.onnx>/<model>/
+- model.onnx / model.int8.onnx
+- tokenizer files
+- encoder.json (pooling, max_seq_length, input names)
+
+Інтерфейс encode() сумісний з SentenceTransformer.encode,
+тому Embedder не розрізняє backend-и.
+
+Залежності (onnxruntime, transformers; torch — лише для експорту)
+імпортуються ліниво.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+MANIFEST = "encoder.json"
+
+
+class OnnxEncoder:
+    """
+    SentenceTransformer-compatible encoder on ONNX Runtime.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        artifacts_path: str,
+        quantize: bool = True,
+        batch_size: int = 32,
+        source: Optional[str] = None
+    ):
+        """
+        source — звідки експортувати (локальний артефакт моделі);
+        None → model_name з hub.
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.path = Path(artifacts_path) / model_name.replace("/", "__")
+
+        if not (self.path / MANIFEST).exists():
+            self.export(model_name, self.path, source=source)
+
+        with open(self.path / MANIFEST, "r", encoding="utf-8") as f:
+            self.manifest: Dict = json.load(f)
+
+        model_file = self.path / "model.onnx"
+        if quantize:
+            model_file = self.path / "model.int8.onnx"
+            if not model_file.exists():
+                self._quantize(self.path / "model.onnx", model_file)
+
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.path), local_files_only=True)
+        self.session = ort.InferenceSession(
+            str(model_file),
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    @property
+    def max_seq_length(self) -> int:
+        return int(self.manifest["max_seq_length"])
+
+    # --------------------------------------------------
+    # EXPORT
+    # --------------------------------------------------
+
+    @staticmethod
+    def export(model_name: str, path: Path, source: Optional[str] = None) -> None:
+        """
+        SentenceTransformer → ONNX (один раз; далі береться з диска).
+        """
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        path.mkdir(parents=True, exist_ok=True)
+
+        st = SentenceTransformer(source or model_name, device="cpu")
+        transformer = st[0]
+        pooling = st[1].get_pooling_mode_str() if len(st) > 1 else "mean"
+
+        tokenizer = transformer.tokenizer
+        model = transformer.auto_model.eval()
+
+        sample = tokenizer(["export"], return_tensors="pt")
+        input_names = [
+            name for name in ("input_ids", "attention_mask", "token_type_ids")
+            if name in sample
+        ]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        class _Wrapper(torch.nn.Module):
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, *inputs):
+                kwargs = dict(zip(input_names, inputs))
+                return self.inner(**kwargs).last_hidden_state
+
+        tmp_path = path / "model.onnx.tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                _Wrapper(model),
+                tuple(sample[name] for name in input_names),
+                str(tmp_path),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+        os.replace(tmp_path, path / "model.onnx")
+
+        tokenizer.save_pretrained(str(path))
+
+        manifest = {
+            "model": model_name,
+            "pooling": pooling,
+            "max_seq_length": int(transformer.max_seq_length),
+            "input_names": input_names,
+        }
+        with open(path / MANIFEST, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _quantize(source: Path, target: Path) -> None:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp_path = target.with_name(target.name + ".tmp")
+        quantize_dynamic(str(source), str(tmp_path), weight_type=QuantType.QInt8)
+        os.replace(tmp_path, target)
+
+    # --------------------------------------------------
+    # INFERENCE
+    # --------------------------------------------------
+
+    def encode(
+        self,
+        texts: List[str],
+        normalize_embeddings: bool = True,
+        convert_to_numpy: bool = True,
+        batch_size: Optional[int] = None,
+        **kwargs
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        batch_size = batch_size or self.batch_size
+        blocks = [
+            self._encode_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ]
+        vectors = np.vstack(blocks).astype(np.float32, copy=False)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.clip(norms, 1e-12, None)
+
+        return vectors[0] if single else vectors
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.manifest["max_seq_length"],
+            return_tensors="np",
+        )
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in self.manifest["input_names"]
+            if name in self._input_names
+        }
+
+        hidden = self.session.run(None, feeds)[0]
+        mask = encoded["attention_mask"].astype(np.float32)[..., None]
+
+        return self._pool(hidden, mask)
+
+    def _pool(self, hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        pooling = self.manifest.get("pooling", "mean")
+
+        if pooling == "cls":
+            return hidden[:, 0]
+
+        if pooling == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+
+        # mean pooling з урахуванням padding
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
@@ -0,0 +1,264 @@
+"""
+VectorPostings
+==============
+
+Метадані векторів FAISS-індексу для фільтрованого пошуку.
+
+Формат sidecar-файлу <index_id>.postings:
+- заголовок: magic (8 байт), width (uint32), reserved (uint32), count (uint64)
+- created_at: int64[count] (unix seconds, -1 — невідомо)
+- document_id: "S{width}"[count] (utf-8, порожній запис — видалений вектор)
+- позиція == стабільний int id вектора (як у ChunkIdMap)
+
+Posting-список document_id → vector_ids будується один раз
+(argsort) при першому фільтрованому запиті.
+
+НЕ:
+- не знає про FAISS
+- змінює дані лише copy-on-write
+"""
+
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+
+MAGIC = b"POSTINGS"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("width", "<u4"),
+    ("reserved", "<u4"),
+    ("count", "<u8"),
+])
+UNKNOWN_TIME = -1
+
+Timestamp = Union[str, datetime, int, float, None]
+
+
+def to_timestamp(value: Timestamp) -> int:
+    """
+    ISO-рядок / datetime / число → unix seconds.
+    """
+    if value is None:
+        return UNKNOWN_TIME
+
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    # naive datetime у сховищах — це UTC (datetime.utcnow())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return int(value.timestamp())
+
+
+class SearchFilter:
+    """
+    Фільтр метаданих для IndexManager.query / query_many.
+    ЛИШЕ параметри; None — без обмеження.
+    """
+
+    def __init__(
+        self,
+        document_ids: Optional[Iterable[str]] = None,
+        index_roles: Optional[Iterable[str]] = None,
+        created_from: Timestamp = None,
+        created_to: Timestamp = None
+    ):
+        self.document_ids = set(document_ids) if document_ids is not None else None
+        self.index_roles = set(index_roles) if index_roles is not None else None
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def is_vector_level(self) -> bool:
+        """
+        Чи потрібен allowlist векторів (а не лише вибір індексів).
+        """
+        return (
+            self.document_ids is not None
+            or self.created_from is not None
+            or self.created_to is not None
+        )
+
+    def matches_index(self, meta: Dict) -> bool:
+        """
+        Дешеве відсікання цілих індексів за їх metadata.
+        """
+        if self.index_roles is not None and meta.get("index_role") not in self.index_roles:
+            return False
+
+        if self.document_ids is not None and "document_ids" in meta:
+            return not self.document_ids.isdisjoint(meta["document_ids"])
+
+        return True
+
+
+class VectorPostings:
+    """
+    Per-vector document_id / created_at with document → vector_ids postings.
+    """
+
+    def __init__(self, documents: np.ndarray, created_at: np.ndarray):
+        self._documents = documents
+        self._created_at = created_at
+        self._by_document: Optional[Dict[bytes, np.ndarray]] = None
+
+    # --------------------------------------------------
+    # CONSTRUCTION
+    # --------------------------------------------------
+
+    @classmethod
+    def from_lists(
+        cls,
+        document_ids: List[Optional[str]],
+        created_at: List[Timestamp]
+    ) -> "VectorPostings":
+        encoded = [(doc_id or "").encode("utf-8") for doc_id in document_ids]
+        width = max((len(doc_id) for doc_id in encoded), default=1) or 1
+
+        return cls(
+            np.array(encoded, dtype=f"S{width}"),
+            np.array([to_timestamp(t) for t in created_at], dtype="int64"),
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Dict]) -> "VectorPostings":
+        return cls.from_lists(
+            [chunk.get("document_id") for chunk in chunks],
+            [chunk.get("created_at") for chunk in chunks],
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "VectorPostings":
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if header.size == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a postings file: {path}")
+
+        width = int(header["width"][0])
+        count = int(header["count"][0])
+
+        if count == 0:
+            return cls(np.empty(0, dtype=f"S{width}"), np.empty(0, dtype="int64"))
+
+        offset = HEADER_DTYPE.itemsize
+        created_at = np.memmap(path, dtype="int64", mode="r", offset=offset, shape=(count,))
+        documents = np.memmap(
+            path,
+            dtype=f"S{width}",
+            mode="r",
+            offset=offset + created_at.nbytes,
+            shape=(count,)
+        )
+        return cls(documents, created_at)
+
+    def save(self, path: str) -> None:
+        """
+        Атомарний запис: tmp-файл + os.replace.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        header = np.array(
+            [(MAGIC, self._documents.dtype.itemsize, 0, len(self))],
+            dtype=HEADER_DTYPE
+        )
+
+        with open(tmp_path, "wb") as f:
+            f.write(header.tobytes())
+            f.write(np.ascontiguousarray(self._created_at, dtype="int64").tobytes())
+            f.write(np.ascontiguousarray(self._documents).tobytes())
+
+        os.replace(tmp_path, path)
+
+    # --------------------------------------------------
+    # READ API
+    # --------------------------------------------------
+
+    def __len__(self) -> int:
+        return int(self._documents.shape[0])
+
+    def select(self, search_filter: SearchFilter) -> np.ndarray:
+        """
+        Відсортовані vector_ids живих векторів, що проходять фільтр.
+        """
+        if search_filter.document_ids is not None:
+            postings = self._document_postings()
+            lists = [
+                postings[doc_id.encode("utf-8")]
+                for doc_id in search_filter.document_ids
+                if doc_id.encode("utf-8") in postings
+            ]
+            ids = np.sort(np.concatenate(lists)) if lists else np.empty(0, dtype="int64")
+        else:
+            ids = np.flatnonzero(self._documents != b"").astype("int64")
+
+        if search_filter.created_from is not None or search_filter.created_to is not None:
+            created = self._created_at[ids]
+            mask = created != UNKNOWN_TIME
+
+            if search_filter.created_from is not None:
+                mask &= created >= to_timestamp(search_filter.created_from)
+            if search_filter.created_to is not None:
+                mask &= created <= to_timestamp(search_filter.created_to)
+
+            ids = ids[mask]
+
+        return ids
+
+    def _document_postings(self) -> Dict[bytes, np.ndarray]:
+        if self._by_document is None:
+            # stable argsort → vector_ids кожного документа вже відсортовані
+            order = np.argsort(self._documents, kind="stable")
+            keys, starts = np.unique(self._documents[order], return_index=True)
+            ends = np.r_[starts[1:], len(order)]
+
+            self._by_document = {
+                bytes(key): order[start:end].astype("int64")
+                for key, start, end in zip(keys, starts, ends)
+                if key
+            }
+
+        return self._by_document
+
+    # --------------------------------------------------
+    # COPY-ON-WRITE UPDATES
+    # --------------------------------------------------
+
+    def append(self, chunks: List[Dict]) -> "VectorPostings":
+        added = VectorPostings.from_chunks(chunks)
+        width = max(self._documents.dtype.itemsize, added._documents.dtype.itemsize)
+
+        return VectorPostings(
+            np.concatenate([
+                self._documents.astype(f"S{width}"),
+                added._documents.astype(f"S{width}"),
+            ]),
+            np.concatenate([np.asarray(self._created_at), added._created_at]),
+        )
+
+    def take(self, vector_ids: List[int]) -> "VectorPostings":
+        """
+        Записи вибраних векторів у новій нумерації 0..n-1
+        (перебудова індексу з ущільненням vector_ids).
+        """
+        positions = np.asarray(vector_ids, dtype="int64")
+        return VectorPostings(
+            np.array(self._documents[positions]),
+            np.array(self._created_at[positions]),
+        )
+
+    def remove(self, vector_ids: List[int]) -> "VectorPostings":
+        positions = np.asarray(vector_ids, dtype="int64")
+
+        documents = np.array(self._documents)
+        created_at = np.array(self._created_at)
+        documents[positions] = b""
+        created_at[positions] = UNKNOWN_TIME
+
+        return VectorPostings(documents, created_at)
@@ -0,0 +1,223 @@
+"""
+Projection
+==========
+
+Пост-embedding зменшення розмірності перед FAISS.
+
+Типи (models.yaml → indexing.projection.type):
+- pca:      x → (x - mean) @ components, components навчаються
+            на вибірці векторів під час побудови індексу
+- truncate: перші dimension компонент (Matryoshka-моделі,
+            що тренувались з вкладеними префіксами)
+
+Після проєкції вектор L2-нормалізується (cosine similarity).
+
+Проєкція — частина індексу: параметри в metadata (projection),
+PCA-матриця — у sidecar-файлі <index_id>.projection:
+- заголовок: magic (8 байт), input_dim (uint32), output_dim (uint32)
+- mean (input_dim,) float32
+- components (input_dim, output_dim) float32
+
+Запит проходить ту саму проєкцію, що й вектори індексу.
+
+НЕ:
+- не знає про FAISS
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+
+MAGIC = b"PROJECTN"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("input_dim", "<u4"),
+    ("output_dim", "<u4"),
+])
+
+
+class Projection:
+    """
+    Linear map input_dim → output_dim followed by L2 normalization.
+    """
+
+    TYPES = ("pca", "truncate")
+
+    def __init__(
+        self,
+        kind: str,
+        input_dim: int,
+        output_dim: int,
+        components: Optional[np.ndarray] = None,
+        mean: Optional[np.ndarray] = None
+    ):
+        if kind not in self.TYPES:
+            raise ValueError(f"Unsupported projection type: {kind}")
+
+        if not 0 < output_dim <= input_dim:
+            raise ValueError(
+                f"Projection must reduce dimension: {input_dim} → {output_dim}"
+            )
+
+        self.kind = kind
+        self.input_dim = input_dim
+        self.output_dim = output_dim
+        # truncate → None (зріз без множення)
+        self.components = components
+        self.mean = mean
+        self._fingerprint: Optional[str] = None
+
+    # --------------------------------------------------
+    # CONSTRUCTION
+    # --------------------------------------------------
+
+    @classmethod
+    def fit_pca(cls, vectors: np.ndarray, output_dim: int) -> "Projection":
+        x = np.asarray(vectors, dtype=np.float64)
+        mean = x.mean(axis=0)
+
+        # головні компоненти — праві сингулярні вектори центрованої вибірки
+        _, _, vt = np.linalg.svd(x - mean, full_matrices=False)
+
+        return cls(
+            "pca",
+            input_dim=x.shape[1],
+            output_dim=output_dim,
+            components=np.ascontiguousarray(vt[:output_dim].T, dtype=np.float32),
+            mean=mean.astype(np.float32),
+        )
+
+    @classmethod
+    def from_config(cls, cfg: Dict, sample: np.ndarray) -> Optional["Projection"]:
+        """
+        models.yaml → indexing.projection для вибірки sample.
+        None — проєкція вимкнена або неможлива (замала вибірка для PCA,
+        dimension не менша за розмірність моделі).
+        """
+        kind = (cfg or {}).get("type", "none")
+        if kind == "none":
+            return None
+
+        input_dim = sample.shape[1]
+        output_dim = int(cfg.get("dimension", 0))
+        if not 0 < output_dim < input_dim:
+            return None
+
+        if kind == "truncate":
+            return cls("truncate", input_dim, output_dim)
+
+        # PCA на кількох векторах перенавчається на цей документ;
+        # такий індекс лишається повнорозмірним до компакції
+        if len(sample) < max(output_dim, int(cfg.get("min_fit_vectors", 1024))):
+            return None
+
+        return cls.fit_pca(sample, output_dim)
+
+    # --------------------------------------------------
+    # API
+    # --------------------------------------------------
+
+    def apply(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        (n, input_dim) або (input_dim,) → float32 тієї ж форми
+        з output_dim компонентами, L2-нормалізовані.
+        """
+        x = np.asarray(vectors, dtype=np.float32)
+        single = x.ndim == 1
+        x = x.reshape(-1, self.input_dim)
+
+        if self.kind == "truncate":
+            y = np.array(x[:, :self.output_dim], dtype=np.float32, order="C")
+        else:
+            y = np.ascontiguousarray((x - self.mean) @ self.components, dtype=np.float32)
+
+        y /= np.clip(np.linalg.norm(y, axis=1, keepdims=True), 1e-12, None)
+        return y[0] if single else y
+
+    def fingerprint(self) -> str:
+        """
+        Однаковий fingerprint ⇔ однаковий простір векторів
+        (індекси можна зливати без повторного embedding).
+        """
+        if self._fingerprint is not None:
+            return self._fingerprint
+
+        digest = hashlib.sha256(
+            f"{self.kind}:{self.input_dim}:{self.output_dim}".encode("utf-8")
+        )
+        if self.components is not None:
+            digest.update(self.mean.tobytes())
+            digest.update(self.components.tobytes())
+
+        self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def to_metadata(self, path: Optional[str] = None) -> Dict:
+        meta = {
+            "type": self.kind,
+            "input_dim": self.input_dim,
+            "output_dim": self.output_dim,
+            "fingerprint": self.fingerprint(),
+        }
+        if self.kind == "pca":
+            meta["path"] = str(path)
+        return meta
+
+    @classmethod
+    def from_metadata(cls, meta: Dict) -> "Projection":
+        if meta["type"] == "pca":
+            return cls.load(meta["path"])
+        return cls(meta["type"], int(meta["input_dim"]), int(meta["output_dim"]))
+
+    # --------------------------------------------------
+    # PERSISTENCE (pca)
+    # --------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """
+        Атомарний запис: tmp-файл + os.replace.
+        """
+        if self.components is None:
+            raise ValueError("Only PCA projections are persisted")
+
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        header = np.array(
+            [(MAGIC, self.input_dim, self.output_dim)],
+            dtype=HEADER_DTYPE
+        )
+        with open(tmp_path, "wb") as f:
+            f.write(header.tobytes())
+            f.write(self.mean.tobytes())
+            f.write(self.components.tobytes())
+
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Projection":
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if header.size == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a projection: {path}")
+
+        input_dim = int(header["input_dim"][0])
+        output_dim = int(header["output_dim"][0])
+
+        data = np.fromfile(
+            path,
+            dtype=np.float32,
+            offset=HEADER_DTYPE.itemsize,
+            count=input_dim + input_dim * output_dim
+        )
+
+        return cls(
+            "pca",
+            input_dim=input_dim,
+            output_dim=output_dim,
+            components=data[input_dim:].reshape(input_dim, output_dim),
+            mean=data[:input_dim],
+        )
@@ -0,0 +1,164 @@
+"""
+VectorStore
+===========
+
+Точні (float) копії векторів FAISS-індексу.
+
+Потрібні, коли сам індекс квантований (SQ8 / PQ / IVF-PQ):
+- exact re-scoring top-кандидатів
+- компакція без втрати точності (reconstruct з PQ — наближений)
+
+Формат sidecar-файлу <index_id>.vectors:
+- заголовок: magic (8 байт), dimension (uint32), itemsize (uint32), count (uint64)
+- матриця (count, dimension); рядок == стабільний int id вектора
+
+Файл читається через np.memmap — у RAM потрапляють лише
+рядки, до яких звертається re-scoring.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+
+MAGIC = b"VECSTORE"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("dimension", "<u4"),
+    ("itemsize", "<u4"),
+    ("count", "<u8"),
+])
+DTYPES = {4: np.float32, 2: np.float16}
+
+
+class VectorStore:
+    """
+    Append-only, memory-mappable matrix of exact vectors.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        dtype=np.float32,
+        base: Optional[np.ndarray] = None,
+        source_path: Optional[str] = None
+    ):
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+
+        # base — збережена частина (memmap), tail — ще не збережені рядки
+        self._base = base if base is not None else np.empty((0, dimension), dtype=self.dtype)
+        self._tail: List[np.ndarray] = []
+        self._source_path = source_path
+
+    # --------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------
+
+    @classmethod
+    def load(cls, path: str) -> "VectorStore":
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if header.size == 0 or header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a vector store: {path}")
+
+        dimension = int(header["dimension"][0])
+        dtype = DTYPES[int(header["itemsize"][0])]
+        count = int(header["count"][0])
+
+        base = None
+        if count:
+            base = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=HEADER_DTYPE.itemsize,
+                shape=(count, dimension)
+            )
+
+        return cls(dimension, dtype=dtype, base=base, source_path=str(path))
+
+    def save(self, path: str) -> None:
+        """
+        Атомарний запис (tmp + os.replace).
+
+        Якщо файл уже містить base — він копіюється і дописується
+        лише tail, без завантаження всієї матриці в RAM.
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+
+        if self._source_path and Path(self._source_path) == path and path.exists():
+            shutil.copyfile(path, tmp_path)
+            with open(tmp_path, "r+b") as f:
+                f.seek(0)
+                f.write(self._header().tobytes())
+                f.seek(0, os.SEEK_END)
+                for block in self._tail:
+                    f.write(np.ascontiguousarray(block).tobytes())
+        else:
+            with open(tmp_path, "wb") as f:
+                f.write(self._header().tobytes())
+                f.write(np.ascontiguousarray(self._base).tobytes())
+                for block in self._tail:
+                    f.write(np.ascontiguousarray(block).tobytes())
+
+        os.replace(tmp_path, path)
+
+        # після збереження файл — нове джерело base
+        saved = VectorStore.load(str(path))
+        self._base, self._tail, self._source_path = saved._base, [], saved._source_path
+
+    # --------------------------------------------------
+    # API
+    # --------------------------------------------------
+
+    def __len__(self) -> int:
+        return int(self._base.shape[0]) + sum(int(b.shape[0]) for b in self._tail)
+
+    def append(self, vectors: np.ndarray) -> None:
+        x = np.asarray(vectors, dtype=self.dtype)
+        if x.ndim != 2 or x.shape[1] != self.dimension:
+            raise ValueError(
+                f"Vector dimension mismatch: expected (*, {self.dimension}), got {x.shape}"
+            )
+        self._tail.append(x.copy())
+
+    def copy(self) -> "VectorStore":
+        """
+        Копія для запису: base (memmap) спільний, tail — власний.
+        """
+        store = VectorStore(
+            self.dimension, dtype=self.dtype, base=self._base, source_path=self._source_path
+        )
+        store._tail = list(self._tail)
+        return store
+
+    def get(self, ids: List[int]) -> np.ndarray:
+        """
+        Рядки за id як float32 (для обчислень).
+        """
+        ids = np.asarray(ids, dtype="int64")
+        base_len = int(self._base.shape[0])
+
+        out = np.empty((len(ids), self.dimension), dtype=np.float32)
+        in_base = ids < base_len
+        out[in_base] = self._base[ids[in_base]]
+
+        if not in_base.all():
+            tail = np.vstack(self._tail)
+            out[~in_base] = tail[ids[~in_base] - base_len]
+
+        return out
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _header(self) -> np.ndarray:
+        return np.array(
+            [(MAGIC, self.dimension, self.dtype.itemsize, len(self))],
+            dtype=HEADER_DTYPE
+        )
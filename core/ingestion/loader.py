@@ -19,11 +19,12 @@ from datetime import datetime
 import uuid
 import hashlib
 
-from langchain_community.document_loaders import PyPDFLoader
-
 
 class DocumentLoader:
     def load_pdf(self, source: str) -> Dict:
+        # langchain імпортується лише при першому ingestion
+        from langchain_community.document_loaders import PyPDFLoader
+
         loader = PyPDFLoader(source)
         pages = loader.load()
 
@@ -0,0 +1,106 @@
+"""
+Record backends
+===============
+
+Фізичне зберігання записів ChunkStore / DocumentStore
+(system.yaml → knowledge.backend):
+
+- files:    один <id>.json на запис (історичний формат)
+- segments: append-only сегменти + memmap індекс (SegmentLog) у
+            <base_path>/_segments; мільйони записів — десятки файлів
+- sqlite:   таблиця в спільному SQLite-файлі (SQLiteRecords,
+            paths.yaml → data.sqlite) на пару (ключ, base_path);
+            індексовані document_id / index_id
+
+Спільний інтерфейс: get_many / put_many / delete / ids / iter_records.
+Перенесення між форматами: python -m tools.knowledge_storage migrate
+
+НЕ:
+- не додає backward-compat полів (це роблять сховища)
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from config.settings import settings
+from core.knowledge.json_io import read_json_many, write_json_many
+from core.knowledge.segment_log import ITER_BATCH, SegmentLog
+from core.knowledge.sqlite_records import SQLiteRecords
+
+
+BACKENDS = ("files", "segments", "sqlite")
+
+
+def open_backend(base_path: str, key: str, kind: Optional[str] = None):
+    """
+    kind=None → system.yaml → knowledge.backend.
+    sqlite: таблиця <ключ без _id>_<hash(base_path)> (chunk_3f2a9c1e) —
+    сховища з різними base_path (інший state_path, тест) у спільному
+    файлі не діляться записами.
+    """
+    cfg = settings.system.get("knowledge", {})
+    kind = kind or cfg.get("backend", "files")
+
+    if kind == "files":
+        return JsonDirectory(base_path, key)
+
+    if kind == "segments":
+        segments_cfg = cfg.get("segments", {})
+        return SegmentLog(
+            os.path.join(base_path, "_segments"),
+            key,
+            max_segment_bytes=int(segments_cfg.get("max_segment_mb", 64)) * 2**20
+        )
+
+    if kind == "sqlite":
+        scope = hashlib.sha1(os.path.abspath(base_path).encode("utf-8")).hexdigest()[:8]
+        return SQLiteRecords(
+            settings.paths["data"].get("sqlite", "data/knowledge.sqlite"),
+            table=f"{key[:-len('_id')]}_{scope}",
+            key=key
+        )
+
+    raise ValueError(f"Unsupported knowledge backend: {kind}")
+
+
+class JsonDirectory:
+    """
+    One JSON file per record: <base_path>/<id>.json.
+    """
+
+    def __init__(self, base_path: str, key: str):
+        self.base_path = base_path
+        self.key = key
+        os.makedirs(self.base_path, exist_ok=True)
+
+    def get_many(self, ids: List[str]) -> List[Optional[Dict]]:
+        return read_json_many([self._path(record_id) for record_id in ids])
+
+    def put_many(self, records: Iterable[Dict]) -> None:
+        write_json_many([(self._path(r[self.key]), r) for r in records])
+
+    def delete(self, record_id: str) -> bool:
+        path = self._path(record_id)
+        if not os.path.exists(path):
+            return False
+
+        os.remove(path)
+        return True
+
+    def ids(self) -> List[str]:
+        return [
+            filename[:-len(".json")]
+            for filename in os.listdir(self.base_path)
+            if filename.endswith(".json")
+        ]
+
+    def iter_records(self) -> Iterator[Dict]:
+        ids = self.ids()
+        for start in range(0, len(ids), ITER_BATCH):
+            for record in self.get_many(ids[start:start + ITER_BATCH]):
+                if record is not None:
+                    yield record
+
+    def _path(self, record_id: str) -> str:
+        return os.path.join(self.base_path, f"{record_id}.json")
@@ -0,0 +1,138 @@
+"""
+ChunkCache
+==========
+
+In-process read-through LRU кеш чанків перед ChunkStore.load / load_many.
+
+Популярні чанки читаються і парсяться з диска на кожному ask();
+з кешем — віддаються з памʼяті.
+
+- бюджет — сумарний розмір content (utf-8 байти), а не кількість
+  записів: чанки різної довжини займають різну памʼять
+  (system.yaml → knowledge.chunk_cache_mb, 0 → вимкнено)
+- save / delete чанка → інвалідація запису; прочитане з диска до
+  інвалідації (конкурентний save) у кеш не потрапляє — generation
+- лічильники hits / misses / evictions (stats())
+- видає копію верхнього рівня і metadata: виклики змінюють
+  metadata.index_ids перед save, і це не повинно потрапити в кеш
+
+НЕ:
+- не читає диск (це робить ChunkStore)
+- не синхронізується між процесами
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ChunkCache:
+    """
+    Byte-bounded LRU cache of parsed chunks.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+
+        # chunk_id → (chunk, size)
+        self._entries: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # росте на кожну інвалідацію
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --------------------------------------------------
+    # API
+    # --------------------------------------------------
+
+    def get_many(self, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """
+        chunk_id → копія чанка для знайдених у кеші.
+        """
+        found: Dict[str, Dict] = {}
+
+        with self._lock:
+            for chunk_id in chunk_ids:
+                entry = self._entries.get(chunk_id)
+                if entry is None:
+                    self.misses += 1
+                    continue
+
+                self._entries.move_to_end(chunk_id)
+                found[chunk_id] = self._copy(entry[0])
+                self.hits += 1
+
+        return found
+
+    def put_many(self, chunks: Iterable[Dict], generation: Optional[int] = None) -> None:
+        """
+        generation — значення self.generation ДО читання з диска;
+        якщо з того часу була інвалідація, дані могли застаріти.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            for chunk in chunks:
+                size = len(chunk.get("content", "").encode("utf-8"))
+                # більший за весь бюджет — не витісняє решту кешу
+                if size > self.max_bytes:
+                    continue
+
+                self._drop(chunk["chunk_id"])
+                self._entries[chunk["chunk_id"]] = (self._copy(chunk), size)
+                self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+
+    def invalidate(self, chunk_ids: Iterable[str]) -> None:
+        with self._lock:
+            self.generation += 1
+            for chunk_id in chunk_ids:
+                self._drop(chunk_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _drop(self, chunk_id: str) -> None:
+        entry = self._entries.pop(chunk_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    @staticmethod
+    def _copy(chunk: Dict) -> Dict:
+        copy = dict(chunk)
+        metadata: Optional[Dict] = chunk.get("metadata")
+        if metadata is not None:
+            copy["metadata"] = dict(metadata)
+            if "index_ids" in metadata:
+                copy["metadata"]["index_ids"] = list(metadata["index_ids"])
+        return copy
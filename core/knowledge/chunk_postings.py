@@ -0,0 +1,261 @@
+"""
+ChunkPostings
+=============
+
+Вторинні індекси ChunkStore:
+- document_id → chunk_ids
+- index_id    → chunk_ids
+
+Без них get_chunks_by_document / get_chunks_by_index читають
+і парсять КОЖЕН файл чанка; з ними — лише чанки результату.
+
+Зберігання (<chunks>/_postings/):
+- postings.json — знімок обох відображень (+ чанки без document_id)
+- postings.log  — журнал змін після знімка (JSON lines):
+  {"op": "put", "chunk_id", "document_id", "index_ids"} | {"op": "del", "chunk_id"}
+
+save / delete чанка дописують один рядок у журнал (O(1)),
+а не переписують знімок. Журнал зливається у знімок, коли стає
+довшим за сам знімок. Відтворення журналу ідемпотентне, тому
+збій між записом знімка і очищенням журналу безпечний.
+
+Немає файлів, а чанки є (старе сховище) → rebuild() з диска.
+
+НЕ:
+- не читає і не пише самі чанки (це робить ChunkStore)
+- не синхронізується між процесами: один писач на каталог
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+SNAPSHOT = "postings.json"
+LOG = "postings.log"
+# журнал зливається у знімок не частіше, ніж раз на стільки змін
+MIN_COMPACT_ENTRIES = 1000
+
+
+class ChunkPostings:
+    """
+    Persistent document_id / index_id → chunk_ids maps with an append-only log.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # chunk_id → (document_id, index_ids): щоб при повторному save
+        # прибрати чанк зі старих списків
+        self._entries: Dict[str, Tuple[Optional[str], Tuple[str, ...]]] = {}
+        self._by_document: Dict[str, Set[str]] = {}
+        self._by_index: Dict[str, Set[str]] = {}
+
+        self._log_entries = 0
+        self._lock = threading.Lock()
+
+        self._load()
+
+    # --------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------
+
+    def exists(self) -> bool:
+        return (self.path / SNAPSHOT).exists() or (self.path / LOG).exists()
+
+    def _load(self) -> None:
+        snapshot_path = self.path / SNAPSHOT
+        if snapshot_path.exists():
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+
+            index_ids: Dict[str, List[str]] = {}
+            for index_id, chunk_ids in snapshot.get("indexes", {}).items():
+                for chunk_id in chunk_ids:
+                    index_ids.setdefault(chunk_id, []).append(index_id)
+
+            for document_id, chunk_ids in snapshot.get("documents", {}).items():
+                for chunk_id in chunk_ids:
+                    self._put(chunk_id, document_id, index_ids.get(chunk_id, ()))
+
+            for chunk_id in snapshot.get("unassigned", []):
+                self._put(chunk_id, None, index_ids.get(chunk_id, ()))
+
+        log_path = self.path / LOG
+        torn = False
+        if log_path.exists():
+            with open(log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # недописаний рядок (збій під час запису)
+                        torn = True
+                        continue
+                    self._apply(record)
+                    self._log_entries += 1
+
+        # інакше наступний запис продовжив би обірваний рядок
+        if torn:
+            self._write_snapshot()
+
+    def compact(self) -> None:
+        """
+        Знімок поточного стану + порожній журнал.
+        """
+        with self._lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        snapshot = {
+            "documents": {
+                document_id: sorted(chunk_ids)
+                for document_id, chunk_ids in self._by_document.items()
+            },
+            "indexes": {
+                index_id: sorted(chunk_ids)
+                for index_id, chunk_ids in self._by_index.items()
+            },
+            # чанки без document_id
+            "unassigned": sorted(
+                chunk_id
+                for chunk_id, (document_id, _) in self._entries.items()
+                if document_id is None
+            ),
+        }
+
+        tmp_path = self.path / (SNAPSHOT + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path / SNAPSHOT)
+
+        open(self.path / LOG, "w").close()
+        self._log_entries = 0
+
+    def rebuild(self, chunks: Iterable[Dict]) -> None:
+        """
+        Повна перебудова з чанків на диску.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._by_document.clear()
+            self._by_index.clear()
+
+            for chunk in chunks:
+                self._put(
+                    chunk["chunk_id"],
+                    chunk.get("document_id"),
+                    chunk.get("metadata", {}).get("index_ids", []),
+                )
+
+            self._write_snapshot()
+
+    # --------------------------------------------------
+    # UPDATE
+    # --------------------------------------------------
+
+    def put(self, chunk: Dict) -> None:
+        self.put_many([chunk])
+
+    def put_many(self, chunks: Iterable[Dict]) -> None:
+        """
+        Одним дописом у журнал (save_many).
+        """
+        with self._lock:
+            records = []
+            for chunk in chunks:
+                record = {
+                    "op": "put",
+                    "chunk_id": chunk["chunk_id"],
+                    "document_id": chunk.get("document_id"),
+                    "index_ids": list(chunk.get("metadata", {}).get("index_ids", [])),
+                }
+
+                current = self._entries.get(record["chunk_id"])
+                if current == (record["document_id"], tuple(record["index_ids"])):
+                    continue
+
+                self._apply(record)
+                records.append(record)
+
+            if records:
+                self._append_log(records)
+
+    def remove(self, chunk_id: str) -> None:
+        with self._lock:
+            if chunk_id not in self._entries:
+                return
+
+            record = {"op": "del", "chunk_id": chunk_id}
+            self._apply(record)
+            self._append_log([record])
+
+    # --------------------------------------------------
+    # LOOKUP
+    # --------------------------------------------------
+
+    def chunks_by_document(self, document_id: str) -> List[str]:
+        with self._lock:
+            return sorted(self._by_document.get(document_id, ()))
+
+    def chunks_by_index(self, index_id: str) -> List[str]:
+        with self._lock:
+            return sorted(self._by_index.get(index_id, ()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _append_log(self, records: List[Dict]) -> None:
+        with open(self.path / LOG, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        self._log_entries += len(records)
+
+        if self._log_entries >= max(MIN_COMPACT_ENTRIES, len(self._entries)):
+            self._write_snapshot()
+
+    def _apply(self, record: Dict) -> None:
+        if record["op"] == "del":
+            self._drop(record["chunk_id"])
+        else:
+            self._put(
+                record["chunk_id"],
+                record.get("document_id"),
+                record.get("index_ids", []),
+            )
+
+    def _put(self, chunk_id: str, document_id: Optional[str], index_ids: Iterable[str]) -> None:
+        self._drop(chunk_id)
+
+        index_ids = tuple(index_ids)
+        self._entries[chunk_id] = (document_id, index_ids)
+
+        if document_id is not None:
+            self._by_document.setdefault(document_id, set()).add(chunk_id)
+        for index_id in index_ids:
+            self._by_index.setdefault(index_id, set()).add(chunk_id)
+
+    def _drop(self, chunk_id: str) -> None:
+        current = self._entries.pop(chunk_id, None)
+        if current is None:
+            return
+
+        document_id, index_ids = current
+        self._discard(self._by_document, document_id, chunk_id)
+        for index_id in index_ids:
+            self._discard(self._by_index, index_id, chunk_id)
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[str]], key: Optional[str], chunk_id: str) -> None:
+        if key is None or key not in postings:
+            return
+
+        postings[key].discard(chunk_id)
+        if not postings[key]:
+            del postings[key]
@@ -1,6 +1,11 @@
-import json
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+
+from config.settings import settings
+from core.knowledge.backends import open_backend
+from core.knowledge.chunk_cache import ChunkCache
+from core.knowledge.chunk_postings import ChunkPostings
+from core.knowledge.sqlite_records import SQLiteRecords
 
 
 class ChunkStore:
@@ -8,11 +13,48 @@ class ChunkStore:
     Сховище чанків.
     Source of truth для chunk-level knowledge.
     Працює з chunk.schema.json
+
+    document_id / index_id → chunk_ids — у ChunkPostings
+    (<base_path>/_postings), оновлюються на save / delete.
+
+    load_many / save_many — пакетні варіанти для ask / ingestion /
+    compaction (паралельне читання, групований атомарний запис).
+
+    Формат на диску — backend (files | segments | sqlite,
+    system.yaml → knowledge.backend). У sqlite document_id / index_id —
+    індексовані колонки, тож postings не ведуться.
+
+    Перед load / load_many — LRU ChunkCache з бюджетом у байтах
+    (system.yaml → knowledge.chunk_cache_mb, 0 → без кешу).
+
+    read_only=True — для звітів і бенчмарків над живим каталогом:
+    postings не будуються і не пишуться (get_chunks_by_* тоді
+    перебирають усі чанки), save / delete не використовуються.
     """
 
-    def __init__(self, base_path: str):
+    def __init__(
+        self,
+        base_path: str,
+        backend: Optional[str] = None,
+        read_only: bool = False
+    ):
         self.base_path = base_path
-        os.makedirs(self.base_path, exist_ok=True)
+        if not read_only:
+            os.makedirs(self.base_path, exist_ok=True)
+
+        self.records = open_backend(self.base_path, "chunk_id", backend)
+
+        cache_mb = settings.system.get("knowledge", {}).get("chunk_cache_mb", 0)
+        self.cache: Optional[ChunkCache] = (
+            ChunkCache(int(cache_mb * 2**20)) if cache_mb else None
+        )
+
+        self.postings: Optional[ChunkPostings] = None
+        if not read_only and not isinstance(self.records, SQLiteRecords):
+            self.postings = ChunkPostings(os.path.join(self.base_path, "_postings"))
+            # сховище з часів до postings → одноразова побудова з диска
+            if not self.postings.exists():
+                self.rebuild_postings()
 
     # --------------------------------------------------
     # BASIC IO
@@ -20,35 +62,73 @@ class ChunkStore:
 
     def save(self, chunk: Dict) -> None:
         """
-        Зберігає чанк як окремий JSON-файл.
+        Зберігає чанк.
+        """
+        self.save_many([chunk])
+
+    def save_many(self, chunks: List[Dict]) -> None:
+        """
+        Зберігає групу чанків (files: спершу всі tmp-файли, потім rename-и;
+        segments: один дозапис у сегмент),
+        postings — одним дописом у журнал.
         """
-        chunk_id = chunk["chunk_id"]
+        if not chunks:
+            return
 
         # 🔒 гарантуємо мультиіндексну metadata
-        chunk.setdefault("metadata", {})
-        chunk["metadata"].setdefault("index_ids", [])
+        for chunk in chunks:
+            chunk.setdefault("metadata", {})
+            chunk["metadata"].setdefault("index_ids", [])
+
+        self.records.put_many(chunks)
 
-        path = os.path.join(self.base_path, f"{chunk_id}.json")
+        if self.cache is not None:
+            self.cache.invalidate(c["chunk_id"] for c in chunks)
 
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(chunk, f, ensure_ascii=False, indent=2)
+        if self.postings is not None:
+            self.postings.put_many(chunks)
 
     def load(self, chunk_id: str) -> Optional[Dict]:
         """
         Завантажує чанк за ID.
         """
-        path = os.path.join(self.base_path, f"{chunk_id}.json")
-        if not os.path.exists(path):
-            return None
+        return self.load_many([chunk_id])[0]
+
+    def load_many(self, chunk_ids: List[str]) -> List[Optional[Dict]]:
+        """
+        Завантажує чанки за ID (паралельно для великих списків).
+        Порядок — як у chunk_ids; відсутній чанк → None.
+        """
+        cached: Dict[str, Dict] = {}
+        if self.cache is not None:
+            generation = self.cache.generation
+            cached = self.cache.get_many(chunk_ids)
 
-        with open(path, "r", encoding="utf-8") as f:
-            chunk = json.load(f)
+        missing = [cid for cid in dict.fromkeys(chunk_ids) if cid not in cached]
+        loaded = {
+            cid: self._ensure_metadata(chunk)
+            for cid, chunk in zip(missing, self.records.get_many(missing))
+            if chunk is not None
+        }
 
-        # 🔒 backward compatibility
-        chunk.setdefault("metadata", {})
-        chunk["metadata"].setdefault("index_ids", [])
+        if self.cache is not None and loaded:
+            self.cache.put_many(loaded.values(), generation)
 
-        return chunk
+        return [cached.get(cid) or loaded.get(cid) for cid in chunk_ids]
+
+    def delete(self, chunk_id: str) -> bool:
+        """
+        Видаляє чанк за ID. Повертає False, якщо його не було.
+        """
+        if self.cache is not None:
+            self.cache.invalidate([chunk_id])
+
+        if not self.records.delete(chunk_id):
+            return False
+
+        if self.postings is not None:
+            self.postings.remove(chunk_id)
+        return True
 
     # --------------------------------------------------
     # QUERY HELPERS (OFFLINE / ORCHESTRATION)
@@ -58,17 +138,22 @@ class ChunkStore:
         """
         Повертає список всіх chunk_id.
         """
-        return [
-            filename.replace(".json", "")
-            for filename in os.listdir(self.base_path)
-            if filename.endswith(".json")
-        ]
+        return self.records.ids()
 
     def get_chunks_by_document(self, document_id: str) -> List[Dict]:
         """
-        Повертає всі чанки документа.
+        Повертає всі чанки документа (O(розмір результату)).
         """
-        return self._filter_chunks(
+        if self.postings is None and not isinstance(self.records, SQLiteRecords):
+            # read_only без postings — повний перебір
+            return [c for c in self._iter_chunks() if c.get("document_id") == document_id]
+
+        chunk_ids = (
+            self.records.ids_by_document(document_id) if self.postings is None
+            else self.postings.chunks_by_document(document_id)
+        )
+        return self._load_postings(
+            chunk_ids,
             lambda c: c.get("document_id") == document_id
         )
 
@@ -76,33 +161,51 @@ class ChunkStore:
         """
         Повертає всі чанки, що належать до індексу (MULTI-INDEX SAFE).
         """
-        return self._filter_chunks(
+        if self.postings is None and not isinstance(self.records, SQLiteRecords):
+            # read_only без postings — повний перебір
+            return [
+                c for c in self._iter_chunks()
+                if index_id in c["metadata"]["index_ids"]
+            ]
+
+        chunk_ids = (
+            self.records.ids_by_index(index_id) if self.postings is None
+            else self.postings.chunks_by_index(index_id)
+        )
+        return self._load_postings(
+            chunk_ids,
             lambda c: index_id in c.get("metadata", {}).get("index_ids", [])
         )
 
+    def rebuild_postings(self) -> None:
+        """
+        Перебудовує postings скануванням усіх чанків
+        (після ручних змін у каталозі).
+        """
+        if self.postings is not None:
+            self.postings.rebuild(self._iter_chunks())
+
     # --------------------------------------------------
     # INTERNAL
     # --------------------------------------------------
 
-    def _filter_chunks(self, predicate) -> List[Dict]:
+    def _load_postings(self, chunk_ids: List[str], predicate) -> List[Dict]:
         """
-        Універсальний фільтр чанків (offline use).
+        Чанки за postings; predicate відсікає застарілі записи
+        (файл змінено в обхід save).
         """
-        results = []
-
-        for filename in os.listdir(self.base_path):
-            if not filename.endswith(".json"):
-                continue
-
-            path = os.path.join(self.base_path, filename)
-            with open(path, "r", encoding="utf-8") as f:
-                chunk = json.load(f)
-
-            # 🔒 backward compatibility
-            chunk.setdefault("metadata", {})
-            chunk["metadata"].setdefault("index_ids", [])
+        return [
+            chunk for chunk in self.load_many(chunk_ids)
+            if chunk is not None and predicate(chunk)
+        ]
 
-            if predicate(chunk):
-                results.append(chunk)
+    def _iter_chunks(self) -> Iterator[Dict]:
+        for chunk in self.records.iter_records():
+            yield self._ensure_metadata(chunk)
 
-        return results
+    @staticmethod
+    def _ensure_metadata(chunk: Dict) -> Dict:
+        # 🔒 backward compatibility
+        chunk.setdefault("metadata", {})
+        chunk["metadata"].setdefault("index_ids", [])
+        return chunk
@@ -1,56 +1,73 @@
-import json
 import os
 from typing import Dict, Optional, List
 
+from core.knowledge.backends import open_backend
+
 
 class DocumentStore:
     """
     Сховище документів.
     Source of truth для document-level knowledge.
     Працює з document.schema.json
+
+    Формат на диску — backend (files | segments | sqlite,
+    system.yaml → knowledge.backend).
     """
 
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, backend: Optional[str] = None):
         self.base_path = base_path
         os.makedirs(self.base_path, exist_ok=True)
 
+        self.records = open_backend(self.base_path, "document_id", backend)
+
     # --------------------------------------------------
     # BASIC IO
     # --------------------------------------------------
 
     def save(self, document: Dict) -> None:
         """
-        Зберігає документ як окремий JSON-файл.
+        Зберігає документ.
         """
+        self.save_many([document])
 
-        document_id = document["document_id"]
-
+    def save_many(self, documents: List[Dict]) -> None:
+        """
+        Зберігає групу документів (files: спершу всі tmp-файли, потім rename-и;
+        segments: один дозапис у сегмент).
+        """
         # 🔒 гарантуємо стабільну metadata (мультиіндекс-safe)
-        document.setdefault("metadata", {})
-        document["metadata"].setdefault("index_ids", [])
+        for document in documents:
+            document.setdefault("metadata", {})
+            document["metadata"].setdefault("index_ids", [])
 
-        path = os.path.join(self.base_path, f"{document_id}.json")
-
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(document, f, ensure_ascii=False, indent=2)
+        self.records.put_many(documents)
 
     def load(self, document_id: str) -> Optional[Dict]:
         """
         Завантажує документ за ID.
         """
+        return self.load_many([document_id])[0]
 
-        path = os.path.join(self.base_path, f"{document_id}.json")
-        if not os.path.exists(path):
-            return None
+    def load_many(self, document_ids: List[str]) -> List[Optional[Dict]]:
+        """
+        Завантажує документи за ID. Порядок — як у document_ids;
+        відсутній документ → None.
+        """
+        documents = self.records.get_many(document_ids)
 
-        with open(path, "r", encoding="utf-8") as f:
-            document = json.load(f)
+        for document in documents:
+            if document is not None:
+                # 🔒 backward compatibility
+                document.setdefault("metadata", {})
+                document["metadata"].setdefault("index_ids", [])
 
-        # 🔒 backward compatibility
-        document.setdefault("metadata", {})
-        document["metadata"].setdefault("index_ids", [])
+        return documents
 
-        return document
+    def delete(self, document_id: str) -> bool:
+        """
+        Видаляє документ за ID. Повертає False, якщо його не було.
+        """
+        return self.records.delete(document_id)
 
     # --------------------------------------------------
     # HELPERS
@@ -60,8 +77,4 @@ class DocumentStore:
         """
         Повертає список всіх document_id.
         """
-        return [
-            filename.replace(".json", "")
-            for filename in os.listdir(self.base_path)
-            if filename.endswith(".json")
-        ]
+        return self.records.ids()
@@ -0,0 +1,88 @@
+"""
+JSON IO
+=======
+
+Файлові операції JSON-сховищ (backend files у DocumentStore / ChunkStore).
+
+- write_json_many: спершу ВСІ tmp-файли, потім os.replace кожного:
+  читач не бачить недописаний файл, а помилка серіалізації / диска
+  до rename не лишає жодного запису групи
+- read_json_many:  паралельне читання (system.yaml → knowledge.io_workers);
+  на повільних дисках латентність окремих open / read перекривається
+
+НЕ:
+- не знає структуру записів
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.settings import settings
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# менше — дешевше прочитати в потоці виклику
+PARALLEL_MIN_FILES = 4
+
+
+def read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def read_json_many(paths: Sequence[str]) -> List[Optional[Dict]]:
+    """
+    Записи в порядку paths; відсутній файл → None.
+    """
+    if len(paths) < PARALLEL_MIN_FILES:
+        return [read_json(path) for path in paths]
+
+    return list(_get_executor().map(read_json, paths))
+
+
+def write_json_many(items: Sequence[Tuple[str, Dict]]) -> None:
+    """
+    (path, data) групою: запис tmp-файлів, потім os.replace кожного.
+    """
+    written: List[Tuple[str, str]] = []
+
+    try:
+        for path, data in items:
+            written.append((_tmp_path(path), path))
+            with open(written[-1][0], "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+    except Exception:
+        for tmp_path, _ in written:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+        raise
+
+    for tmp_path, path in written:
+        os.replace(tmp_path, path)
+
+
+def _tmp_path(path: str) -> str:
+    # ".tmp" після ".json" → list_*() не бачить недописаних записів
+    return f"{path}.{threading.get_ident()}.tmp"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(settings.system.get("knowledge", {}).get("io_workers", 8)),
+                thread_name_prefix="knowledge-io"
+            )
+        return _executor
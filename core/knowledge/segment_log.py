@@ -0,0 +1,429 @@
+"""
+SegmentLog
+==========
+
+Append-only сховище записів (чанків / документів) у великих
+сегментних файлах замість одного JSON-файлу на запис.
+
+Формат (<base>/_segments/):
+- seg-000001.jsonl, ... — записи як компактні JSON lines;
+  видалення — tombstone-рядок {"_deleted": id}
+- segments.idx — відсортований індекс id → (segment, offset, length):
+  - заголовок: magic (8 байт), width (uint32), segment (uint32),
+    offset (uint64), count (uint64); (segment, offset) — позиція
+    в журналі, до якої індекс актуальний
+  - масив фіксованої ширини (id "S{width}", segment, offset, length)
+
+Індекс читається через np.memmap: старт не парсить записи,
+lookup — бінарний пошук по memmap + одне читання з сегмента.
+
+Записи після позиції індексу (хвіст журналу) тримаються в памʼяті
+і відтворюються при відкритті. Коли хвіст довшає, він зливається
+в новий індекс (векторизовано, tmp + os.replace).
+
+compact(): живі записи «смітних» закритих сегментів копіюються
+в активний, старі сегменти видаляються.
+
+НЕ:
+- не знає структуру записів, крім поля-ключа
+- не синхронізується між процесами: один писач на каталог
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+MAGIC = b"SEGINDEX"
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("width", "<u4"),
+    ("segment", "<u4"),
+    ("offset", "<u8"),
+    ("count", "<u8"),
+])
+INDEX = "segments.idx"
+TOMBSTONE = "_deleted"
+# хвіст журналу зливається в індекс не раніше, ніж стільки змін
+MIN_MERGE_ENTRIES = 1000
+ITER_BATCH = 512
+
+# (segment, offset, length); None — tombstone
+Location = Optional[Tuple[int, int, int]]
+
+
+def _entry_dtype(width: int) -> np.dtype:
+    return np.dtype([
+        ("id", f"S{width}"),
+        ("segment", "<u4"),
+        ("offset", "<u8"),
+        ("length", "<u4"),
+    ])
+
+
+class SegmentLog:
+    """
+    Append-only segment files with a memory-mapped id → location index.
+    """
+
+    def __init__(self, path: str, key: str, max_segment_bytes: int = 64 * 2**20):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.key = key
+        self.max_segment_bytes = max_segment_bytes
+
+        self._entries = np.empty(0, dtype=_entry_dtype(1))
+        # id → Location для записів після позиції індексу
+        self._recent: Dict[str, Location] = {}
+
+        self._active = 1
+        self._active_file: Optional[BinaryIO] = None
+        self._readers: Dict[int, BinaryIO] = {}
+
+        # lookup + pread під локом — мікросекунди; JSON парситься поза ним
+        self._lock = threading.Lock()
+
+        self._load()
+
+    # --------------------------------------------------
+    # READ API
+    # --------------------------------------------------
+
+    def get_many(self, ids: List[str]) -> List[Optional[Dict]]:
+        """
+        Записи в порядку ids; відсутній / видалений → None.
+        Читання з диска — в порядку (segment, offset).
+        """
+        raw: List[Optional[bytes]] = [None] * len(ids)
+
+        with self._lock:
+            locations = [self._locate(record_id) for record_id in ids]
+            order = sorted(
+                (i for i, loc in enumerate(locations) if loc is not None),
+                key=lambda i: locations[i]
+            )
+            for i in order:
+                raw[i] = self._read(*locations[i])
+
+        return [json.loads(data) if data is not None else None for data in raw]
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return [record_id for record_id, _ in self._live_locations()]
+
+    def iter_records(self) -> Iterator[Dict]:
+        """
+        Всі живі записи в порядку розташування на диску.
+        """
+        with self._lock:
+            locations = sorted(self._live_locations(), key=lambda item: item[1])
+
+        # пачками: get_many заново знаходить записи, тож compact
+        # між пачками безпечний
+        for start in range(0, len(locations), ITER_BATCH):
+            batch = [record_id for record_id, _ in locations[start:start + ITER_BATCH]]
+            for record in self.get_many(batch):
+                if record is not None:
+                    yield record
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._live_locations())
+
+    def stats(self) -> Dict:
+        """
+        Розмір і частка «сміття» (перезаписані / видалені) по сегментах.
+        """
+        with self._lock:
+            live = self._live_bytes()
+            segments = []
+            for segment in self._segments():
+                size = self._segment_path(segment).stat().st_size
+                segments.append({
+                    "segment": segment,
+                    "bytes": size,
+                    "live_bytes": live.get(segment, 0),
+                    "garbage_ratio": 1 - live.get(segment, 0) / size if size else 0.0,
+                })
+
+            return {
+                "records": len(self._live_locations()),
+                "active_segment": self._active,
+                "segments": segments,
+            }
+
+    # --------------------------------------------------
+    # WRITE API
+    # --------------------------------------------------
+
+    def put_many(self, records: Iterable[Dict]) -> None:
+        """
+        Один дозапис у активний сегмент на всю групу.
+        """
+        records = list(records)
+        if not records:
+            return
+
+        lines = [self._encode(record) for record in records]
+
+        with self._lock:
+            offset = self._append(b"".join(lines))
+            for record, line in zip(records, lines):
+                self._recent[record[self.key]] = (self._active, offset, len(line) - 1)
+                offset += len(line)
+
+            self._maybe_merge()
+
+    def delete(self, record_id: str) -> bool:
+        with self._lock:
+            if self._locate(record_id) is None:
+                return False
+
+            self._append(self._encode({TOMBSTONE: record_id}))
+            self._recent[record_id] = None
+
+            self._maybe_merge()
+            return True
+
+    def compact(self, min_garbage_ratio: float = 0.5) -> List[int]:
+        """
+        Переписує живі записи закритих сегментів із часткою сміття
+        >= min_garbage_ratio в активний сегмент і видаляє ці сегменти.
+        Повертає номери видалених сегментів.
+        """
+        with self._lock:
+            self._merge()
+
+            live = self._live_bytes()
+            victims = []
+            for segment in self._segments():
+                if segment == self._active:
+                    continue
+                size = self._segment_path(segment).stat().st_size
+                if not size or 1 - live.get(segment, 0) / size >= min_garbage_ratio:
+                    victims.append(segment)
+
+            if not victims:
+                return []
+
+            moving = np.isin(self._entries["segment"], victims)
+            entries = np.sort(self._entries[moving], order=["segment", "offset"])
+            for entry in entries:
+                line = self._read(int(entry["segment"]), int(entry["offset"]), int(entry["length"]))
+                offset = self._append(line + b"\n")
+                self._recent[entry["id"].decode("utf-8")] = (self._active, offset, len(line))
+
+            # новий індекс ДО видалення: збій між кроками лишає
+            # лише «мертві» сегменти, які прибере наступний compact
+            self._merge()
+
+            for segment in victims:
+                reader = self._readers.pop(segment, None)
+                if reader is not None:
+                    reader.close()
+                os.remove(self._segment_path(segment))
+
+            return victims
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+
+    # --------------------------------------------------
+    # INDEX
+    # --------------------------------------------------
+
+    def _load(self) -> None:
+        segments = self._segments()
+        self._active = segments[-1] if segments else 1
+
+        covered = (1, 0)
+        index_path = self.path / INDEX
+        if index_path.exists():
+            header = np.fromfile(index_path, dtype=HEADER_DTYPE, count=1)
+            if header.size == 0 or header["magic"][0] != MAGIC:
+                raise ValueError(f"Not a segment index: {index_path}")
+
+            count = int(header["count"][0])
+            dtype = _entry_dtype(int(header["width"][0]))
+            if count:
+                self._entries = np.memmap(
+                    index_path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=HEADER_DTYPE.itemsize,
+                    shape=(count,)
+                )
+            else:
+                self._entries = np.empty(0, dtype=dtype)
+            covered = (int(header["segment"][0]), int(header["offset"][0]))
+
+        for segment in segments:
+            if segment >= covered[0]:
+                self._replay(segment, covered[1] if segment == covered[0] else 0)
+
+    def _replay(self, segment: int, start: int) -> None:
+        path = self._segment_path(segment)
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("torn record")
+                    record = json.loads(line)
+                except ValueError:
+                    # недописаний хвіст (збій під час запису) — відрізаємо,
+                    # інакше наступний запис продовжив би обірваний рядок
+                    break
+
+                if TOMBSTONE in record:
+                    self._recent[record[TOMBSTONE]] = None
+                else:
+                    self._recent[record[self.key]] = (segment, offset, len(line) - 1)
+                offset += len(line)
+
+        if offset < path.stat().st_size:
+            os.truncate(path, offset)
+
+    def _maybe_merge(self) -> None:
+        if len(self._recent) >= max(MIN_MERGE_ENTRIES, len(self._entries) // 8):
+            self._merge()
+
+    def _merge(self) -> None:
+        """
+        Хвіст журналу → новий індекс (copy-on-write, tmp + os.replace).
+        """
+        if not self._recent and (self.path / INDEX).exists():
+            return
+
+        recent_ids = np.array([rid.encode("utf-8") for rid in self._recent])
+        kept = self._entries
+        if recent_ids.size and kept.size:
+            kept = kept[~np.isin(kept["id"], recent_ids)]
+
+        added = [
+            (rid.encode("utf-8"), *location)
+            for rid, location in self._recent.items()
+            if location is not None
+        ]
+        width = max(
+            [kept.dtype["id"].itemsize] + [len(item[0]) for item in added]
+        ) or 1
+        dtype = _entry_dtype(width)
+
+        entries = np.concatenate([
+            kept.astype(dtype),
+            np.array(added, dtype=dtype),
+        ])
+        entries = entries[np.argsort(entries["id"], kind="stable")]
+
+        position = (self._active, self._active_size())
+        header = np.array(
+            [(MAGIC, width, position[0], position[1], len(entries))],
+            dtype=HEADER_DTYPE
+        )
+
+        index_path = self.path / INDEX
+        tmp_path = index_path.with_name(INDEX + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header.tobytes())
+            f.write(np.ascontiguousarray(entries).tobytes())
+        os.replace(tmp_path, index_path)
+
+        self._entries = entries
+        self._recent = {}
+
+    def _locate(self, record_id: str) -> Location:
+        if record_id in self._recent:
+            return self._recent[record_id]
+
+        key = record_id.encode("utf-8")
+        ids = self._entries["id"]
+        if not ids.size or len(key) > ids.dtype.itemsize:
+            return None
+
+        pos = int(np.searchsorted(ids, key))
+        if pos < ids.size and ids[pos] == key:
+            entry = self._entries[pos]
+            return int(entry["segment"]), int(entry["offset"]), int(entry["length"])
+        return None
+
+    def _live_locations(self) -> List[Tuple[str, Tuple[int, int, int]]]:
+        locations = [
+            (raw.decode("utf-8"), (int(seg), int(off), int(length)))
+            for raw, seg, off, length in self._entries.tolist()
+            if raw.decode("utf-8") not in self._recent
+        ]
+        locations.extend(
+            (rid, location)
+            for rid, location in self._recent.items()
+            if location is not None
+        )
+        return locations
+
+    def _live_bytes(self) -> Dict[int, int]:
+        live: Dict[int, int] = {}
+        for _, (segment, _, length) in self._live_locations():
+            live[segment] = live.get(segment, 0) + length + 1
+        return live
+
+    # --------------------------------------------------
+    # SEGMENT FILES
+    # --------------------------------------------------
+
+    def _segments(self) -> List[int]:
+        return sorted(
+            int(name[4:-6])
+            for name in os.listdir(self.path)
+            if name.startswith("seg-") and name.endswith(".jsonl")
+        )
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.path / f"seg-{segment:06d}.jsonl"
+
+    def _active_size(self) -> int:
+        path = self._segment_path(self._active)
+        return path.stat().st_size if path.exists() else 0
+
+    def _append(self, data: bytes) -> int:
+        """
+        Дописує в активний сегмент (новий — після max_segment_bytes).
+        Повертає offset початку даних.
+        """
+        if self._active_file is None:
+            self._active_file = open(self._segment_path(self._active), "ab")
+
+        if self._active_file.tell() >= self.max_segment_bytes:
+            self._active_file.close()
+            self._active += 1
+            self._active_file = open(self._segment_path(self._active), "ab")
+
+        offset = self._active_file.tell()
+        self._active_file.write(data)
+        self._active_file.flush()
+        return offset
+
+    def _read(self, segment: int, offset: int, length: int) -> bytes:
+        reader = self._readers.get(segment)
+        if reader is None:
+            reader = self._readers[segment] = open(self._segment_path(segment), "rb")
+
+        reader.seek(offset)
+        return reader.read(length)
+
+    @staticmethod
+    def _encode(record: Dict) -> bytes:
+        return (
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        ).encode("utf-8")
@@ -0,0 +1,198 @@
+"""
+SQLiteRecords
+=============
+
+Backend записів в одному SQLite-файлі (paths.yaml → data.sqlite)
+для DocumentStore / ChunkStore / FeedbackStore / EvaluationStore.
+
+Таблиця на сховище — <document / chunk / feedback / evaluation>_<hash
+base_path> (див. open_backend):
+- id TEXT PRIMARY KEY, data TEXT (запис як JSON)
+- document_id, created_at — індексовані колонки
+- <table>_index — (index_id, id) з metadata.index_ids
+
+- WAL: читачі не блокують писача і один одного; зʼєднання
+  на потік, тож читання йдуть паралельно
+- put_many / delete — одна транзакція на групу (executemany)
+- SQL — константні рядки: sqlite3 кешує prepared statements
+  на зʼєднання
+- document_id / index_id → ids — запит по індексу, тому ChunkStore
+  не веде окремі postings
+
+НЕ:
+- не змінює структуру записів (data — той самий JSON, що у файлах)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from core.knowledge.segment_log import ITER_BATCH
+
+
+# SQLite обмежує кількість параметрів запиту
+MAX_PARAMS = 500
+
+
+class SQLiteRecords:
+    """
+    One table of JSON records in a shared WAL-mode SQLite database.
+    """
+
+    def __init__(self, path: str, table: str, key: str):
+        self.path = path
+        self.table = table
+        self.key = key
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        # sqlite і так серіалізує писачів; лок прибирає busy-очікування
+        self._write_lock = threading.Lock()
+
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    id TEXT PRIMARY KEY,
+                    document_id TEXT,
+                    created_at TEXT,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_document_id ON {table} (document_id)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)"
+            )
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table}_index (
+                    index_id TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    PRIMARY KEY (index_id, id)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_index_id ON {table}_index (id)"
+            )
+
+    # --------------------------------------------------
+    # READ API
+    # --------------------------------------------------
+
+    def get_many(self, ids: List[str]) -> List[Optional[Dict]]:
+        found: Dict[str, str] = {}
+        conn = self._conn()
+
+        for start in range(0, len(ids), MAX_PARAMS):
+            batch = ids[start:start + MAX_PARAMS]
+            found.update(conn.execute(
+                f"SELECT id, data FROM {self.table} "
+                f"WHERE id IN ({','.join('?' * len(batch))})",
+                batch
+            ).fetchall())
+
+        return [
+            json.loads(found[record_id]) if record_id in found else None
+            for record_id in ids
+        ]
+
+    def ids(self) -> List[str]:
+        return [row[0] for row in self._conn().execute(f"SELECT id FROM {self.table}")]
+
+    def ids_by_document(self, document_id: str) -> List[str]:
+        return [
+            row[0] for row in self._conn().execute(
+                f"SELECT id FROM {self.table} WHERE document_id = ? ORDER BY id",
+                (document_id,)
+            )
+        ]
+
+    def ids_by_index(self, index_id: str) -> List[str]:
+        return [
+            row[0] for row in self._conn().execute(
+                f"SELECT id FROM {self.table}_index WHERE index_id = ? ORDER BY id",
+                (index_id,)
+            )
+        ]
+
+    def iter_records(self) -> Iterator[Dict]:
+        cursor = self._conn().execute(f"SELECT data FROM {self.table} ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(ITER_BATCH)
+            if not rows:
+                return
+            for (data,) in rows:
+                yield json.loads(data)
+
+    # --------------------------------------------------
+    # WRITE API
+    # --------------------------------------------------
+
+    def put_many(self, records: Iterable[Dict]) -> None:
+        records = list(records)
+        rows = [
+            (
+                record[self.key],
+                record.get("document_id"),
+                record.get("created_at"),
+                json.dumps(record, ensure_ascii=False),
+            )
+            for record in records
+        ]
+        if not rows:
+            return
+
+        index_rows = [
+            (index_id, record[self.key])
+            for record in records
+            for index_id in record.get("metadata", {}).get("index_ids", [])
+        ]
+
+        conn = self._conn()
+        with self._write_lock, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (id, document_id, created_at, data) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            conn.executemany(
+                f"DELETE FROM {self.table}_index WHERE id = ?",
+                [(row[0],) for row in rows]
+            )
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {self.table}_index (index_id, id) VALUES (?, ?)",
+                index_rows
+            )
+
+    def delete(self, record_id: str) -> bool:
+        conn = self._conn()
+        with self._write_lock, conn:
+            deleted = conn.execute(
+                f"DELETE FROM {self.table} WHERE id = ?", (record_id,)
+            ).rowcount
+            conn.execute(f"DELETE FROM {self.table}_index WHERE id = ?", (record_id,))
+
+        return bool(deleted)
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
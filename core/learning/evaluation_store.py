@@ -1,7 +1,7 @@
-import json
-import os
 import uuid
-from typing import Dict
+from typing import Dict, Iterator, Optional
+
+from core.knowledge.backends import open_backend
 
 
 class EvaluationStore:
@@ -9,11 +9,13 @@ class EvaluationStore:
     Persistent storage for automatic evaluations.
 
     Зберігає evaluation ПОВНІСТЮ, без втрати сигналу.
+    Формат на диску — backend (files | segments | sqlite,
+    system.yaml → knowledge.backend).
     """
 
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, backend: Optional[str] = None):
         self.base_path = base_path
-        os.makedirs(self.base_path, exist_ok=True)
+        self.records = open_backend(self.base_path, "evaluation_id", backend)
 
     def save(self, evaluation: Dict) -> str:
         """
@@ -23,9 +25,18 @@ class EvaluationStore:
         evaluation_id = evaluation.get("evaluation_id") or str(uuid.uuid4())
         evaluation["evaluation_id"] = evaluation_id
 
-        path = os.path.join(self.base_path, f"{evaluation_id}.json")
-
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(evaluation, f, ensure_ascii=False, indent=2)
+        self.records.put_many([evaluation])
 
         return evaluation_id
+
+    def load(self, evaluation_id: str) -> Optional[Dict]:
+        """
+        Завантажує evaluation за id.
+        """
+        return self.records.get_many([evaluation_id])[0]
+
+    def iter_all(self) -> Iterator[Dict]:
+        """
+        Всі evaluation (offline-аналітика / debug UI).
+        """
+        return self.records.iter_records()
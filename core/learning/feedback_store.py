@@ -1,21 +1,24 @@
-import json
-import os
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
+
+from core.knowledge.backends import open_backend
 
 
 class FeedbackStore:
     """
     Persistent user feedback storage (👍 / 👎).
 
+    Формат на диску — backend (files | segments | sqlite,
+    system.yaml → knowledge.backend).
+
     НЕ:
     - не застосовує learning
     - не знає структуру evaluation
     """
 
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, backend: Optional[str] = None):
         self.base_path = base_path
-        os.makedirs(self.base_path, exist_ok=True)
+        self.records = open_backend(self.base_path, "feedback_id", backend)
 
     # --------------------------------------------------
     # CREATE
@@ -37,10 +40,7 @@ class FeedbackStore:
             "updated_at": None,
         }
 
-        path = os.path.join(self.base_path, f"{evaluation_id}.json")
-
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(record, f, ensure_ascii=False, indent=2)
+        self.records.put_many([record])
 
         return evaluation_id
 
@@ -59,17 +59,13 @@ class FeedbackStore:
         rating: -1 | 0 | 1
         """
 
-        path = os.path.join(self.base_path, f"{feedback_id}.json")
-
-        with open(path, "r", encoding="utf-8") as f:
-            record = json.load(f)
+        record = self._require(feedback_id)
 
         record["rating"] = rating
         record["comment"] = comment
         record["updated_at"] = datetime.utcnow().isoformat()
 
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(record, f, ensure_ascii=False, indent=2)
+        self.records.put_many([record])
 
     # --------------------------------------------------
     # READ
@@ -79,24 +75,28 @@ class FeedbackStore:
         """
         Завантажує feedback за id.
         """
-        path = os.path.join(self.base_path, f"{feedback_id}.json")
-        if not os.path.exists(path):
-            return None
+        return self.records.get_many([feedback_id])[0]
 
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+    def iter_all(self) -> Iterator[Dict]:
+        """
+        Всі feedback-записи (offline-аналітика / debug UI).
+        """
+        return self.records.iter_records()
 
     def mark_applied(self, feedback_id: str) -> None:
         """
         Позначає feedback як застосований до state.
         """
-        path = os.path.join(self.base_path, f"{feedback_id}.json")
-
-        with open(path, "r", encoding="utf-8") as f:
-            record = json.load(f)
+        record = self._require(feedback_id)
 
         record["applied"] = True
         record["updated_at"] = datetime.utcnow().isoformat()
 
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(record, f, ensure_ascii=False, indent=2)
+        self.records.put_many([record])
+
+    def _require(self, feedback_id: str) -> Dict:
+        record = self.load(feedback_id)
+        if record is None:
+            # як і раніше з open(...): невідомий feedback — помилка
+            raise FileNotFoundError(f"Feedback not found: {feedback_id}")
+        return record
@@ -13,10 +13,11 @@ Offline analytics helper.
 - не впливає на retrieval / rerank
 """
 
-import os
-import json
 from typing import Dict, List
 
+from core.learning.evaluation_store import EvaluationStore
+from core.learning.feedback_store import FeedbackStore
+
 
 class Trainer:
     """
@@ -31,39 +32,18 @@ class Trainer:
         self.evaluation_path = evaluation_path
         self.feedback_path = feedback_path
 
+        self.evaluation_store = EvaluationStore(evaluation_path)
+        self.feedback_store = FeedbackStore(feedback_path)
+
     # --------------------------------------------------
     # DATA LOADING
     # --------------------------------------------------
 
     def _load_evaluations(self) -> List[Dict]:
-        if not os.path.exists(self.evaluation_path):
-            return []
-
-        records = []
-        for fname in os.listdir(self.evaluation_path):
-            if fname.endswith(".json"):
-                with open(
-                    os.path.join(self.evaluation_path, fname),
-                    "r",
-                    encoding="utf-8"
-                ) as f:
-                    records.append(json.load(f))
-        return records
+        return list(self.evaluation_store.iter_all())
 
     def _load_feedback(self) -> List[Dict]:
-        if not os.path.exists(self.feedback_path):
-            return []
-
-        records = []
-        for fname in os.listdir(self.feedback_path):
-            if fname.endswith(".json"):
-                with open(
-                    os.path.join(self.feedback_path, fname),
-                    "r",
-                    encoding="utf-8"
-                ) as f:
-                    records.append(json.load(f))
-        return records
+        return list(self.feedback_store.iter_all())
 
     # --------------------------------------------------
     # AGGREGATION
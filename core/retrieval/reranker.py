@@ -25,17 +25,23 @@ class Reranker:
             self,
             query: str,
             chunks: List[Dict],
-            top_k: int
+            top_k: int,
+            embeddings=None
     ) -> List[Dict]:
+        """
+        embeddings — EmbeddingContext запиту (вектор питання вже є).
+        """
         if not chunks:
             return []
 
-        query_emb = np.array(self.embedder.embed(query))
+        # запит і всі чанки — одним батчем (float32 матриця)
+        embeddings = (embeddings or self.embedder).embed_batch_array(
+            [query] + [chunk["content"] for chunk in chunks]
+        )
+        query_emb = embeddings[0]
         scored = []
 
-        for chunk in chunks:
-            chunk_emb = np.array(self.embedder.embed(chunk["content"]))
-
+        for chunk, chunk_emb in zip(chunks, embeddings[1:]):
             # 1. base semantic similarity
             score = self._cosine(query_emb, chunk_emb)
 
@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict
 
-from core.indexing.index_manager import IndexManager
+from core.indexing.index_manager import IndexManager, SearchHit
+from core.indexing.postings import SearchFilter
 from .policies import RetrievalPolicy
 from .query_rewriter import QueryRewriter
 
@@ -24,11 +25,14 @@ class Retriever:
         self,
         index_manager: IndexManager,
         policy: RetrievalPolicy,
-        query_rewriter: Optional[QueryRewriter] = None
+        query_rewriter: Optional[QueryRewriter] = None,
+        embedder=None
     ):
         self.index_manager = index_manager
         self.policy = policy
         self.query_rewriter = query_rewriter or QueryRewriter()
+        # Embedder або EmbeddingBatcher (той самий інтерфейс)
+        self.embedder = embedder or index_manager.embedder
 
     # --------------------------------------------------
     # PUBLIC API
@@ -37,34 +41,59 @@ class Retriever:
     def retrieve(
         self,
         query: str,
-        index_roles: Optional[List[Dict]] = None
+        index_roles: Optional[List[Dict]] = None,
+        filters: Optional[SearchFilter] = None,
+        embeddings=None
     ) -> List[str]:
         """
-        Повертає список candidate chunk_ids.
+        Повертає список candidate chunk_ids (глобальний top-k, за score).
 
         index_roles:
         [
           {"index_role": "definition", "router_score": 1.0},
           {"index_role": "general", "router_score": 0.5}
         ]
+
+        filters — обмеження за document_id / created_at
+        (виконується всередині FAISS-пошуку)
+
+        embeddings — EmbeddingContext запиту (замість self.embedder)
+        """
+        return [
+            chunk_id
+            for chunk_id, _, _ in self.retrieve_scored(
+                query, index_roles, filters, embeddings
+            )
+        ]
+
+    def retrieve_scored(
+        self,
+        query: str,
+        index_roles: Optional[List[Dict]] = None,
+        filters: Optional[SearchFilter] = None,
+        embeddings=None
+    ) -> List[SearchHit]:
+        """
+        Те саме, що retrieve(), але з (chunk_id, score, index_id).
         """
         effective_query = self._prepare_query(query)
 
         # 1️⃣ Визначаємо index_ids для пошуку
         index_ids = self._resolve_index_ids(index_roles)
 
-        # 2️⃣ Recall по кожному індексу
-        all_chunk_ids: List[str] = []
+        if not index_ids:
+            return []
 
-        for index_id in index_ids:
-            chunk_ids = self.index_manager.query(
-                query=effective_query,
-                k=self.policy.top_k,
-                index_id=index_id
-            )
-            all_chunk_ids.extend(chunk_ids)
+        # 2️⃣ Embedding запиту — ОДИН раз для всіх індексів
+        query_vector = (embeddings or self.embedder).embed_array(effective_query)
 
-        return all_chunk_ids
+        # 3️⃣ Паралельний recall + глобальний top-k
+        return self.index_manager.query_many(
+            query_vector=query_vector,
+            k=self.policy.top_k,
+            index_ids=index_ids,
+            filters=filters
+        )
 
     # --------------------------------------------------
     # INTERNALS
@@ -0,0 +1,195 @@
+"""
+ModelArtifacts
+==============
+
+Локальний каталог артефактів моделей (paths.yaml → models.artifacts).
+
+Відповідає за:
+- prepare: одноразове збереження моделі + tokenizer-а з hub
+  у <artifacts>/<model>/ (sentence-transformers / transformers)
+- manifest artifact.json: файли, їх розміри та sha256
+- verify: перевірка цілісності перед завантаженням
+- resolve: локальний шлях для SentenceTransformer / pipeline
+
+models.yaml → artifacts:
+- enabled:    моделі вантажаться з каталогу
+- local_only: без hub (HF_HUB_OFFLINE); немає артефакту → помилка,
+              а не мовчазне звернення в мережу
+- verify:     none | size | sha256 (при кожному завантаженні)
+
+Підготовка: python -m tools.prepare_models
+
+НЕ:
+- не завантажує моделі в памʼять для inference (це роблять
+  Embedder / LLMClient за локальним шляхом)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.settings import settings
+
+
+MANIFEST = "artifact.json"
+VERIFY_MODES = ("none", "size", "sha256")
+
+
+class ModelArtifacts:
+    """
+    Prepared, checksummed local copies of hub models.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        cfg = settings.models.get("artifacts", {})
+
+        self.root = Path(
+            root or settings.paths.get("models", {}).get("artifacts", "data/models/artifacts")
+        )
+        self.enabled: bool = bool(cfg.get("enabled", False))
+        self.local_only: bool = bool(cfg.get("local_only", True))
+        self.verify_mode: str = cfg.get("verify", "size")
+
+        if self.verify_mode not in VERIFY_MODES:
+            raise ValueError(f"Unsupported artifact verify mode: {self.verify_mode}")
+
+    # --------------------------------------------------
+    # RESOLVE
+    # --------------------------------------------------
+
+    def path_for(self, model_name: str) -> Path:
+        return self.root / model_name.replace("/", "__")
+
+    def resolve(self, model_name: str) -> str:
+        """
+        Що передати в SentenceTransformer / pipeline:
+        - artifacts вимкнено → model_name (hub / HF cache, як раніше)
+        - є артефакт → перевірений локальний шлях
+        - немає артефакту і local_only → RuntimeError
+        """
+        if not self.enabled:
+            return model_name
+
+        if self.local_only:
+            # transformers / huggingface_hub читають це при імпорті і при запитах
+            os.environ["HF_HUB_OFFLINE"] = "1"
+            os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+        path = self.path_for(model_name)
+        if not (path / MANIFEST).exists():
+            if self.local_only:
+                raise RuntimeError(
+                    f"Model artifact not prepared: {model_name} "
+                    f"(run: python -m tools.prepare_models)"
+                )
+            return model_name
+
+        self.verify(model_name, self.verify_mode)
+        return str(path)
+
+    # --------------------------------------------------
+    # PREPARE
+    # --------------------------------------------------
+
+    def prepare(self, model_name: str, kind: str, task: Optional[str] = None) -> Dict:
+        """
+        kind: "sentence_transformers" | "transformers" (task — для pipeline).
+        Каталог зʼявляється атомарно: збереження в *.tmp + rename.
+        """
+        path = self.path_for(model_name)
+        tmp_path = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        try:
+            self._save(model_name, kind, task, tmp_path)
+        except Exception:
+            # недозбережений артефакт не повинен лишатися на диску
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        manifest = {
+            "model": model_name,
+            "kind": kind,
+            "task": task,
+            "files": self._checksums(tmp_path),
+            "prepared_at": datetime.utcnow().isoformat() + "Z",
+        }
+        with open(tmp_path / MANIFEST, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+        return manifest
+
+    # --------------------------------------------------
+    # VERIFY
+    # --------------------------------------------------
+
+    def verify(self, model_name: str, mode: str = "sha256") -> None:
+        """
+        RuntimeError зі списком файлів, що відсутні або змінились.
+        """
+        if mode == "none":
+            return
+
+        path = self.path_for(model_name)
+        with open(path / MANIFEST, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        broken: List[str] = []
+        for name, expected in manifest["files"].items():
+            file_path = path / name
+
+            if not file_path.is_file() or file_path.stat().st_size != expected["size"]:
+                broken.append(name)
+            elif mode == "sha256" and self._sha256(file_path) != expected["sha256"]:
+                broken.append(name)
+
+        if broken:
+            raise RuntimeError(
+                f"Model artifact corrupted: {model_name}: {', '.join(sorted(broken))}"
+            )
+
+    # --------------------------------------------------
+    # INTERNALS
+    # --------------------------------------------------
+
+    @staticmethod
+    def _save(model_name: str, kind: str, task: Optional[str], path: Path) -> None:
+        if kind == "sentence_transformers":
+            from sentence_transformers import SentenceTransformer
+
+            SentenceTransformer(model_name, device="cpu").save(str(path))
+
+        elif kind == "transformers":
+            from transformers import pipeline
+
+            pipeline(task=task, model=model_name).save_pretrained(str(path))
+
+        else:
+            raise ValueError(f"Unsupported artifact kind: {kind}")
+
+    @classmethod
+    def _checksums(cls, path: Path) -> Dict[str, Dict]:
+        return {
+            str(file_path.relative_to(path)): {
+                "size": file_path.stat().st_size,
+                "sha256": cls._sha256(file_path),
+            }
+            for file_path in sorted(path.rglob("*"))
+            if file_path.is_file()
+        }
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
@@ -0,0 +1,98 @@
+"""
+Startup
+=======
+
+Час холодного старту сервісу.
+
+Відповідає за:
+- StartupProfiler: тривалість кожної фази ініціалізації
+- warm_up: завантаження моделей до першого запиту
+  (синхронно або у фоновому потоці)
+
+Моделі (embedder, LLM) створюються ліниво при першому використанні;
+warm-up лише переносить цю вартість з першого запиту на старт.
+
+НЕ:
+- не знає, які саме компоненти існують (їх передає сервіс)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+class StartupProfiler:
+    """
+    phase → seconds (у порядку виконання).
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._last_checkpoint = self.started_at
+        self._phases: "OrderedDict[str, float]" = OrderedDict()
+        # warm-up пише з фонового потоку
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def checkpoint(self, name: str) -> None:
+        """
+        Фаза name = час від попереднього checkpoint (або старту).
+        """
+        now = time.perf_counter()
+        self.record(name, now - self._last_checkpoint)
+        self._last_checkpoint = now
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[name] = self._phases.get(name, 0.0) + seconds
+
+    def report(self) -> Dict:
+        with self._lock:
+            phases = dict(self._phases)
+
+        return {
+            "phases": {name: round(seconds, 4) for name, seconds in phases.items()},
+            "elapsed_seconds": round(time.perf_counter() - self.started_at, 4),
+        }
+
+
+def warm_up(
+    targets: Dict[str, Callable[[], None]],
+    profiler: Optional[StartupProfiler] = None,
+    background: bool = True
+) -> Optional[threading.Thread]:
+    """
+    Викликає targets (name → callable) по черзі; час кожного —
+    у profiler як "warm_up.<name>". Помилка одного target не зупиняє
+    інші: той самий виклик повториться (і впаде) при першому запиті.
+
+    background=True → повертає запущений daemon-потік.
+    """
+
+    def run() -> None:
+        for name, target in targets.items():
+            started = time.perf_counter()
+            try:
+                target()
+            except Exception:
+                pass
+            finally:
+                if profiler is not None:
+                    profiler.record(f"warm_up.{name}", time.perf_counter() - started)
+
+    if not background:
+        run()
+        return None
+
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -10,7 +10,7 @@ Indexing Service
 - підготовка даних для retrieval / learning
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 import uuid
 
@@ -42,11 +42,13 @@ class IndexingService:
     # CHUNK INDEXING
     # ==================================================
 
-    def index_chunks(self, chunks: List[Dict]) -> Dict:
+    def index_chunks(self, chunks: List[Dict]) -> Optional[Dict]:
         """
         Індексує чанки документа.
-        Повертає Index metadata (schema v2).
+        Повертає Index metadata (schema v2); немає чанків → None.
         """
+        if not chunks:
+            return None
 
         # 1. Побудова індексу через IndexManager
         self.index_manager.build_index(chunks)
@@ -11,9 +11,8 @@ RAG Service
 - не керує state ініціалізацією
 """
 
-from typing import Dict
+from typing import Dict, List
 import os
-import json
 # Chunking
 from core.chunking.chunker import Chunker
 
@@ -27,6 +26,9 @@ from core.knowledge.chunk_store import ChunkStore
 # Indexing
 from core.indexing.index_manager import IndexManager
 from core.indexing.index_router import SemanticIndexRouter
+from core.indexing.compactor import IndexCompactor
+from core.indexing.embedding_batcher import EmbeddingBatcher
+from core.indexing.embedding_context import EmbeddingContext
 
 # Retrieval
 from core.retrieval.retriever import Retriever
@@ -50,11 +52,15 @@ from core.learning.policies_update import StatePolicyUpdater
 
 # System registry
 from core.system.system_registry import SystemRegistry
+from core.system.startup import StartupProfiler, warm_up
 # Feedback
 from core.learning.feedback_store import FeedbackStore
+from core.learning.evaluation_store import EvaluationStore
 # Cache
 from core.cache.semantic_cache import SemanticCache
 from core.cache.manager import CacheManager
+# Config
+from config.settings import settings
 
 
 class RAGService:
@@ -69,6 +75,9 @@ class RAGService:
         indexes_path: str,
         state_path: str,
     ):
+        # моделі створюються ліниво; тут — лише час конструювання
+        self.startup = StartupProfiler()
+
         # ---------------- System registry ----------------
         self.system_registry = SystemRegistry(
             documents_path=documents_path,
@@ -83,14 +92,38 @@ class RAGService:
 
         self.loader = DocumentLoader()
         self.chunker = Chunker()
+        self.startup.checkpoint("knowledge")
 
         # ---------------- Indexing ----------------
         self.index_manager = IndexManager(
             indexes_path=indexes_path,
         )
 
+        # старі індекси без *.postings → одноразова міграція
+        self.index_manager.migrate_postings(self.chunk_store)
+        self.startup.checkpoint("indexing")
+
         self.index_router = SemanticIndexRouter()
 
+        # короткі embed-виклики з паралельних ask() → спільні батчі;
+        # ingestion працює з Embedder напряму
+        self.query_embedder = self.index_manager.embedder
+        if settings.models["embeddings"].get("batching", {}).get("enabled", False):
+            self.query_embedder = EmbeddingBatcher(self.index_manager.embedder)
+
+        # фонове злиття дрібних індексів у шарди ролей
+        self.index_compactor = IndexCompactor(
+            index_manager=self.index_manager,
+            chunk_store=self.chunk_store,
+        )
+
+        compaction_cfg = settings.system.get("compaction", {})
+        if compaction_cfg.get("background", False):
+            self.index_compactor.start(
+                interval_seconds=compaction_cfg.get("interval_seconds", 3600)
+            )
+        self.startup.checkpoint("compaction")
+
         # ---------------- State ----------------
         self.state_manager = StateManager(
             base_path=state_path
@@ -100,6 +133,7 @@ class RAGService:
         self.state_policy = StatePolicyUpdater(
             state_manager=self.state_manager
         )
+        self.startup.checkpoint("state")
 
         # ---------------- Retrieval ----------------
         self.retrieval_policy = RetrievalPolicy(
@@ -111,10 +145,11 @@ class RAGService:
         self.retriever = Retriever(
             index_manager=self.index_manager,
             policy=self.retrieval_policy,
+            embedder=self.query_embedder,
         )
 
         self.reranker = Reranker(
-            embedder=self.index_manager.embedder,
+            embedder=self.query_embedder,
             state_manager=self.state_manager,
         )
 
@@ -125,20 +160,24 @@ class RAGService:
 
         # ---------------- Generation ----------------
         self.llm_client = LLMClient(mode="colab")  # або "local"
+        self.startup.checkpoint("retrieval_generation")
 
         # ---------------- Evaluation ----------------
         self.evaluator = Evaluator(
-            embedder=self.index_manager.embedder
+            embedder=self.query_embedder
         )
 
         # ---------------- Feedback ----------------
         self.feedback_store = FeedbackStore(
             base_path=os.path.join(state_path, "feedback")
         )
+        self.evaluation_store = EvaluationStore(
+            base_path=os.path.join(state_path, "evaluations")
+        )
 
         # ---------------- Cache ----------------
         self.semantic_cache = SemanticCache(
-            embedder=self.index_manager.embedder,
+            embedder=self.query_embedder,
             similarity_threshold=0.9,
         )
 
@@ -146,6 +185,37 @@ class RAGService:
             semantic_cache=self.semantic_cache,
             ttl=60 * 60,
         )
+        self.startup.checkpoint("evaluation_cache")
+
+        # ---------------- Warm-up ----------------
+        # none → перший запит платить за завантаження моделей
+        # background → моделі вантажаться паралельно з першими діями
+        # sync → конструктор повертається з уже готовими моделями
+        self._warm_up_thread = None
+        mode = settings.system.get("startup", {}).get("warm_up", "none")
+        if mode != "none":
+            self._warm_up_thread = warm_up(
+                {
+                    "embedder": self.index_manager.embedder.warm_up,
+                    "llm": self.llm_client.warm_up,
+                },
+                profiler=self.startup,
+                background=mode == "background",
+            )
+
+    def startup_report(self) -> Dict:
+        """
+        Розбивка часу старту: фази конструктора + warm_up.* (коли завершено).
+        """
+        report = self.startup.report()
+        report["models_loaded"] = {
+            "embedder": self.index_manager.embedder.is_loaded,
+            "llm": self.llm_client.is_loaded,
+        }
+        report["warm_up_running"] = (
+            self._warm_up_thread is not None and self._warm_up_thread.is_alive()
+        )
+        return report
 
     # ======================================================
     # INGESTION
@@ -153,21 +223,29 @@ class RAGService:
 
     def ingest_pdf(self, source: str) -> Dict:
         """
-        PDF → document → chunks → index
+        PDF → document → chunks → index (append у індекс ролі)
         """
         document = self.loader.load_pdf(source)
         self.document_store.save(document)
 
         chunks = self.chunker.split(document)
 
-        index_metadata = self.index_manager.build_index(chunks)
+        index_metadata = self.index_manager.index_chunks(chunks)
+        if index_metadata is None:
+            # документ без тексту: чанків і індексу немає
+            return {
+                "document_id": document["document_id"],
+                "chunks_count": 0,
+                "index": None,
+            }
 
         for chunk in chunks:
             chunk.setdefault("metadata", {})
             chunk["metadata"].setdefault("index_ids", [])
             chunk["metadata"]["index_ids"].append(index_metadata["index_id"])
             chunk["metadata"]["embedding_model"] = index_metadata["embedding_model"]
-            self.chunk_store.save(chunk)
+
+        self.chunk_store.save_many(chunks)
 
         return {
             "document_id": document["document_id"],
@@ -175,12 +253,55 @@ class RAGService:
             "index": index_metadata,
         }
 
+    def delete_document(self, document_id: str) -> Dict:
+        """
+        document → chunks → vectors (remove_ids) → видалення
+        """
+        chunks = self.chunk_store.get_chunks_by_document(document_id)
+
+        by_index: Dict[str, List[str]] = {}
+        for chunk in chunks:
+            for index_id in chunk["metadata"].get("index_ids", []):
+                by_index.setdefault(index_id, []).append(chunk["chunk_id"])
+
+        known_indexes = set(self.index_manager.list_indexes())
+        vectors_removed = 0
+
+        for index_id, chunk_ids in by_index.items():
+            if index_id not in known_indexes:
+                continue
+            vectors_removed += self.index_manager.remove_chunks(
+                index_id=index_id,
+                chunk_ids=chunk_ids,
+                document_id=document_id,
+            )
+
+        for chunk in chunks:
+            self.chunk_store.delete(chunk["chunk_id"])
+        self.document_store.delete(document_id)
+
+        # кешовані відповіді могли спиратися на цей документ
+        self.cache_manager.invalidate_all()
+
+        return {
+            "document_id": document_id,
+            "chunks_count": len(chunks),
+            "vectors_removed": vectors_removed,
+        }
+
     # ======================================================
     # QUESTION ANSWERING + ONLINE LEARNING
     # ======================================================
 
     def ask(self, question: str) -> Dict:
-        cached = self.semantic_cache.lookup(question)
+        # один ключ для кешу, retrieval (_prepare_query теж strip-ить) і rerank,
+        # інакше питання з пробілами по краях ембедиться двічі
+        question = question.strip()
+
+        # кожен різний текст (питання, чанки, відповідь) — один embed за запит
+        embeddings = EmbeddingContext(self.query_embedder)
+
+        cached = self.semantic_cache.lookup(question, embeddings=embeddings)
         if cached is not None:
             return cached
 
@@ -192,13 +313,11 @@ class RAGService:
         ]
 
         # --------- retrieval ---------
-        chunk_ids = self.retriever.retrieve(question, index_roles)
+        chunk_ids = self.retriever.retrieve(
+            question, index_roles, embeddings=embeddings
+        )
 
-        chunks = []
-        for cid in chunk_ids:
-            chunk = self.chunk_store.load(cid)
-            if chunk:
-                chunks.append(chunk)
+        chunks = [c for c in self.chunk_store.load_many(chunk_ids) if c]
 
         if not chunks:
             return {
@@ -214,6 +333,7 @@ class RAGService:
             query=question,
             chunks=chunks,
             top_k=self.retrieval_policy.rerank_k,
+            embeddings=embeddings,
         )
 
         # --------- reasoning ---------
@@ -231,6 +351,7 @@ class RAGService:
             answer=answer,
             chunks=ranked_chunks,
             index_ids=[r["index_role"] for r in index_roles],
+            embeddings=embeddings,
         )
 
         # 🔁 ONLINE LEARNING (AUTOMATIC)
@@ -252,7 +373,7 @@ class RAGService:
             "feedback_id": feedback_id,
         }
 
-        self.semantic_cache.store(question, result)
+        self.semantic_cache.store(question, result, embeddings=embeddings)
         return result
 
     def submit_feedback(
@@ -277,19 +398,10 @@ class RAGService:
             return
 
         # 2. load evaluation
-        evaluation_id = feedback["evaluation_id"]
-        evaluation_path = os.path.join(
-            self.state_manager.base_path,
-            "evaluations",
-            f"{evaluation_id}.json"
-        )
-
-        if not os.path.exists(evaluation_path):
+        evaluation = self.evaluation_store.load(feedback["evaluation_id"])
+        if evaluation is None:
             return
 
-        with open(evaluation_path, "r", encoding="utf-8") as f:
-            evaluation = json.load(f)
-
         # 3. apply human signal
         self.state_policy.apply(
             evaluation=evaluation,
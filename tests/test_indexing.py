@@ -0,0 +1,391 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from config.settings import settings
+from core.indexing.compactor import IndexCompactor
+from core.indexing.index_manager import IndexManager
+from core.indexing.locks import ReadWriteLock
+from core.indexing.postings import SearchFilter, VectorPostings
+from core.knowledge.chunk_store import ChunkStore
+
+
+DIM = 16
+
+
+def _vector(text: str) -> np.ndarray:
+    # детермінований одиничний вектор замість моделі
+    seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+    v = np.random.default_rng(seed).standard_normal(DIM).astype("float32")
+    return v / np.linalg.norm(v)
+
+
+def _chunks(document_id: str, n: int, created_at: str = "2026-01-01T00:00:00Z"):
+    return [
+        {
+            "chunk_id": f"{document_id}-{i}",
+            "document_id": document_id,
+            "content": f"{document_id} text {i}",
+            "created_at": created_at,
+            "metadata": {"index_ids": []},
+        }
+        for i in range(n)
+    ]
+
+
+def _top(manager: IndexManager, text: str, k: int = 1, filters=None):
+    return [
+        chunk_id
+        for chunk_id, _, _ in manager.query_many(
+            _vector(text), k, manager.list_indexes(), filters
+        )
+    ]
+
+
+@pytest.fixture
+def index_config(monkeypatch):
+    cfg = {"type": "flat", "projection": {"type": "none"}}
+    monkeypatch.setitem(settings.models, "indexing", cfg)
+    return cfg
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch, index_config):
+    im = IndexManager(str(tmp_path / "indexes"))
+    monkeypatch.setattr(
+        im, "_embed_chunks",
+        lambda chunks: np.stack([_vector(c["content"]) for c in chunks])
+    )
+    return im
+
+
+# --------------------------------------------------
+# INCREMENTAL UPDATE
+# --------------------------------------------------
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf"])
+def test_remove_chunks_keeps_vector_ids_stable(manager, index_config, index_type):
+    index_config["type"] = index_type
+    meta = manager.index_chunks(_chunks("d1", 60) + _chunks("d2", 60))
+    index_id = meta["index_id"]
+
+    before = manager.get_id_map(index_id).find([c["chunk_id"] for c in _chunks("d2", 60)])
+
+    removed = manager.remove_chunks(index_id, [c["chunk_id"] for c in _chunks("d1", 60)], "d1")
+
+    assert removed == 60
+    id_map = manager.get_id_map(index_id)
+    assert id_map.find([c["chunk_id"] for c in _chunks("d2", 60)]) == before
+    assert id_map.live_count() == 60
+    assert manager.get_metadata(index_id)["document_ids"] == ["d2"]
+
+    assert _top(manager, "d2 text 7") == ["d2-7"]
+    assert not any(c.startswith("d1-") for c in _top(manager, "d1 text 7", k=10))
+
+
+def test_append_after_remove_uses_new_vector_ids(manager):
+    index_id = manager.index_chunks(_chunks("d1", 10))["index_id"]
+    manager.remove_chunks(index_id, ["d1-3"])
+
+    manager.index_chunks(_chunks("d2", 5))
+
+    id_map = manager.get_id_map(index_id)
+    assert id_map.find(["d1-4"]) == [4]
+    assert id_map.find(["d2-0"]) == [10]
+    assert _top(manager, "d2 text 0") == ["d2-0"]
+
+
+def test_hnsw_tombstones_trigger_rebuild(manager, index_config):
+    index_config["type"] = "hnsw"
+    index_id = manager.index_chunks(_chunks("d1", 50) + _chunks("d2", 50))["index_id"]
+
+    manager.remove_chunks(index_id, [c["chunk_id"] for c in _chunks("d1", 50)], "d1")
+
+    meta = manager.get_metadata(index_id)
+    assert meta["tombstones"] == 0
+    assert meta["revision"] == 1
+    assert meta["ids_count"] == 50
+    assert _top(manager, "d2 text 9") == ["d2-9"]
+
+
+def test_undertrained_ivf_index_is_retrained_as_it_grows(manager, index_config):
+    index_config.update({"type": "ivf", "ivf": {"nlist": 1024, "nprobe": 16}})
+
+    for doc in range(8):
+        meta = manager.index_chunks(_chunks(f"d{doc}", 50))
+
+    assert len(manager.list_indexes()) == 1
+    assert meta["trained_ntotal"] == 400
+    assert meta["faiss_params"]["nlist"] == 400 // 39
+
+    # перезапуск бачить лише файли поточної ревізії
+    reopened = IndexManager(str(manager.indexes_path))
+    reopened._embed_chunks = manager._embed_chunks
+    assert _top(reopened, "d3 text 5") == ["d3-5"]
+
+
+# --------------------------------------------------
+# FILTERS
+# --------------------------------------------------
+
+def test_search_filter_selects_documents_and_time_range(manager):
+    manager.index_chunks(
+        _chunks("d1", 20, "2026-01-01T00:00:00Z")
+        + _chunks("d2", 20, "2026-02-01T00:00:00Z")
+    )
+
+    assert _top(manager, "d1 text 4", filters=SearchFilter(document_ids=["d1"])) == ["d1-4"]
+
+    only_d2 = _top(manager, "d1 text 4", k=5, filters=SearchFilter(document_ids=["d2"]))
+    assert len(only_d2) == 5
+    assert all(c.startswith("d2-") for c in only_d2)
+
+    recent = _top(manager, "d1 text 4", k=40, filters=SearchFilter(created_from="2026-01-15"))
+    assert sorted(recent) == sorted(c["chunk_id"] for c in _chunks("d2", 20))
+
+    assert _top(manager, "d1 text 4", filters=SearchFilter(document_ids=["missing"])) == []
+    assert _top(manager, "d1 text 4", filters=SearchFilter(index_roles=["other"])) == []
+
+
+def test_vector_postings_select_skips_removed_vectors():
+    postings = VectorPostings.from_lists(
+        ["a", "b", "a", "c"],
+        ["2026-01-01", "2026-01-02", "2026-01-03", None],
+    ).remove([2])
+
+    assert postings.select(SearchFilter(document_ids=["a", "c"])).tolist() == [0, 3]
+    assert postings.select(SearchFilter(created_to="2026-01-02")).tolist() == [0, 1]
+    # невідомий created_at не проходить часовий фільтр
+    assert postings.select(SearchFilter(created_from=0)).tolist() == [0, 1]
+
+
+# --------------------------------------------------
+# LEGACY METADATA
+# --------------------------------------------------
+
+def test_migrate_postings_for_legacy_metadata(manager, tmp_path):
+    chunk_store = ChunkStore(str(tmp_path / "chunks"), backend="files")
+    chunks = _chunks("d1", 5, "2026-01-01T00:00:00Z") + _chunks("d2", 5, "2026-03-01T00:00:00Z")
+    meta = manager.index_chunks(chunks)
+    chunk_store.save_many(chunks)
+
+    # індекс до появи sidecar-ів: chunk_ids у JSON, без *.ids / *.postings
+    legacy = dict(meta)
+    legacy["chunk_ids"] = [c["chunk_id"] for c in chunks]
+    del legacy["ids_count"]
+    os.remove(legacy.pop("ids_path"))
+    os.remove(legacy.pop("postings_path"))
+    with open(manager.indexes_path / f"{meta['index_id']}.index.json", "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+
+    reopened = IndexManager(str(manager.indexes_path))
+    reopened._embed_chunks = manager._embed_chunks
+
+    migrated_meta = reopened.get_metadata(meta["index_id"])
+    assert "chunk_ids" not in migrated_meta
+    assert reopened.get_id_map(meta["index_id"]).to_list() == legacy["chunk_ids"]
+
+    # без postings фільтр за часом не вирішується на рівні індексу
+    assert _top(reopened, "d2 text 1", filters=SearchFilter(created_from="2026-02-01")) == []
+
+    assert reopened.migrate_postings(chunk_store) == [meta["index_id"]]
+    assert reopened.migrate_postings(chunk_store) == []
+
+    recent = _top(reopened, "d1 text 1", k=10, filters=SearchFilter(created_from="2026-02-01"))
+    assert sorted(recent) == sorted(c["chunk_id"] for c in _chunks("d2", 5))
+
+
+# --------------------------------------------------
+# COMPACTION
+# --------------------------------------------------
+
+@pytest.fixture
+def chunk_store(tmp_path):
+    return ChunkStore(str(tmp_path / "chunks"), backend="files")
+
+
+def _ingest_per_document(manager, chunk_store, documents):
+    # build_index: окремий індекс на кожен документ
+    index_ids = []
+    for document_id, n in documents:
+        chunks = _chunks(document_id, n)
+        meta = manager.build_index(chunks)
+        for chunk in chunks:
+            chunk["metadata"]["index_ids"] = [meta["index_id"]]
+        chunk_store.save_many(chunks)
+        index_ids.append(meta["index_id"])
+    return index_ids
+
+
+def test_compactor_merges_role_into_one_shard(manager, chunk_store):
+    source_ids = _ingest_per_document(manager, chunk_store, [("d1", 10), ("d2", 10), ("d3", 10)])
+    manager.remove_chunks(source_ids[1], ["d2-0", "d2-1"])
+
+    shards = IndexCompactor(manager, chunk_store, shard_max_vectors=100).compact("general")
+
+    assert len(shards) == 1
+    shard_id = shards[0]["index_id"]
+    assert manager.list_indexes() == [shard_id]
+    assert shards[0]["compacted_from"] == source_ids
+    assert shards[0]["document_ids"] == ["d1", "d2", "d3"]
+    assert manager.get_id_map(shard_id).live_count() == 28
+
+    # видалені чанки не воскресають, решта знаходиться як раніше
+    assert _top(manager, "d2 text 5") == ["d2-5"]
+    assert "d2-0" not in _top(manager, "d2 text 0", k=30)
+    assert chunk_store.load("d3-4")["metadata"]["index_ids"] == [shard_id]
+    assert not any(
+        path.name.startswith(source_ids[0]) for path in manager.indexes_path.iterdir()
+    )
+
+    # перезапуск бачить лише шард
+    assert IndexManager(str(manager.indexes_path)).list_indexes() == [shard_id]
+
+
+def test_compactor_splits_large_role_into_shards(manager, chunk_store):
+    _ingest_per_document(manager, chunk_store, [("d1", 25), ("d2", 25)])
+
+    shards = IndexCompactor(manager, chunk_store, shard_max_vectors=30).compact("general")
+
+    assert [manager.get_id_map(s["index_id"]).live_count() for s in shards] == [30, 20]
+    assert sorted(manager.list_indexes()) == sorted(s["index_id"] for s in shards)
+    assert chunk_store.load("d1-0")["metadata"]["index_ids"] == [shards[0]["index_id"]]
+    assert chunk_store.load("d2-24")["metadata"]["index_ids"] == [shards[1]["index_id"]]
+
+    for document_id, i in (("d1", 3), ("d2", 4), ("d2", 24)):
+        assert _top(manager, f"{document_id} text {i}") == [f"{document_id}-{i}"]
+
+    # шарди не менші за shard_max_vectors — повторна компакція нічого не робить
+    assert IndexCompactor(manager, chunk_store, shard_max_vectors=30, min_indexes=2).compact() == []
+
+
+def test_compactor_skips_roles_below_min_indexes(manager, chunk_store):
+    source_ids = _ingest_per_document(manager, chunk_store, [("d1", 5), ("d2", 5)])
+
+    assert IndexCompactor(manager, chunk_store, min_indexes=3).compact("general") == []
+    assert sorted(manager.list_indexes()) == sorted(source_ids)
+
+
+# --------------------------------------------------
+# LOCKS
+# --------------------------------------------------
+
+def _start(target) -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_for_queued_writer(lock: ReadWriteLock, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not lock._waiting_writers:
+        assert time.monotonic() < deadline, "writer never queued"
+        time.sleep(0.001)
+
+
+def test_rw_lock_queued_writer_blocks_new_readers():
+    lock = ReadWriteLock()
+    order = []
+    reading = threading.Event()
+    release = threading.Event()
+
+    def first_reader():
+        with lock.read():
+            reading.set()
+            release.wait()
+            order.append("first_reader")
+
+    def writer():
+        with lock.write():
+            order.append("writer")
+
+    def late_reader():
+        with lock.read():
+            order.append("late_reader")
+
+    threads = [_start(first_reader)]
+    reading.wait()
+    threads.append(_start(writer))
+    _wait_for_queued_writer(lock)
+    threads.append(_start(late_reader))
+
+    time.sleep(0.05)
+    assert order == []
+
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["first_reader", "writer", "late_reader"]
+
+
+def test_rw_lock_nested_read_does_not_wait_for_queued_writer():
+    lock = ReadWriteLock()
+    reading = threading.Event()
+    proceed = threading.Event()
+    nested = []
+
+    def reader():
+        with lock.read():
+            reading.set()
+            proceed.wait()
+            with lock.read():
+                nested.append(True)
+
+    def writer():
+        with lock.write():
+            pass
+
+    reader_thread = _start(reader)
+    reading.wait()
+    writer_thread = _start(writer)
+    _wait_for_queued_writer(lock)
+
+    proceed.set()
+    reader_thread.join(2)
+    writer_thread.join(2)
+
+    assert nested == [True]
+    assert not reader_thread.is_alive() and not writer_thread.is_alive()
+
+
+def test_rw_lock_is_reentrant_for_writer():
+    lock = ReadWriteLock()
+
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+        # внутрішній write не відпустив зовнішній
+        assert lock._writer == threading.get_ident()
+
+    assert lock._writer is None
+
+    # після виходу інші потоки знову можуть писати
+    written = []
+
+    def other_writer():
+        with lock.write():
+            written.append(True)
+
+    _start(other_writer).join(2)
+    assert written == [True]
+
+
+def test_rw_lock_rejects_read_to_write_upgrade():
+    lock = ReadWriteLock()
+
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            with lock.write():
+                pass
+
+    # невдале підвищення не залишає писача в черзі
+    assert lock._waiting_writers == 0
+    with lock.write():
+        pass
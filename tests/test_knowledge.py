@@ -0,0 +1,181 @@
+import pytest
+
+from core.knowledge import segment_log
+from core.knowledge.chunk_cache import ChunkCache
+from core.knowledge.chunk_store import ChunkStore
+from core.knowledge.segment_log import SegmentLog
+
+
+def _record(record_id: str, text: str = "x" * 40):
+    return {"chunk_id": record_id, "content": text}
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / "_segments")
+
+
+# --------------------------------------------------
+# SEGMENT LOG
+# --------------------------------------------------
+
+def test_segment_log_replays_tail_on_open(log_path):
+    log = SegmentLog(log_path, key="chunk_id")
+    log.put_many([_record("a", "first"), _record("b")])
+    log.put_many([_record("a", "second")])
+    log.close()
+
+    reopened = SegmentLog(log_path, key="chunk_id")
+
+    assert reopened.get_many(["a", "b", "missing"]) == [
+        _record("a", "second"), _record("b"), None
+    ]
+    assert sorted(reopened.ids()) == ["a", "b"]
+    assert len(reopened) == 2
+
+
+def test_segment_log_replays_tail_after_merged_index(log_path, monkeypatch):
+    monkeypatch.setattr(segment_log, "MIN_MERGE_ENTRIES", 4)
+
+    log = SegmentLog(log_path, key="chunk_id")
+    log.put_many([_record(f"r{i}") for i in range(5)])
+    assert (log.path / segment_log.INDEX).exists()
+    # після злиття — хвіст, якого індекс ще не бачив
+    log.put_many([_record("r0", "updated"), _record("r9")])
+    log.close()
+
+    reopened = SegmentLog(log_path, key="chunk_id")
+
+    assert reopened.get_many(["r0", "r4", "r9"]) == [
+        _record("r0", "updated"), _record("r4"), _record("r9")
+    ]
+    assert len(reopened) == 6
+
+
+def test_segment_log_truncates_torn_tail(log_path):
+    log = SegmentLog(log_path, key="chunk_id")
+    log.put_many([_record("a")])
+    log.close()
+
+    segment = log.path / "seg-000001.jsonl"
+    size = segment.stat().st_size
+    with open(segment, "ab") as f:
+        f.write(b'{"chunk_id":"b","cont')
+
+    reopened = SegmentLog(log_path, key="chunk_id")
+    assert reopened.get_many(["a", "b"]) == [_record("a"), None]
+    assert segment.stat().st_size == size
+
+    # наступний запис не продовжує обірваний рядок
+    reopened.put_many([_record("c")])
+    reopened.close()
+    assert SegmentLog(log_path, key="chunk_id").get_many(["c"]) == [_record("c")]
+
+
+def test_segment_log_tombstones_survive_reopen(log_path, monkeypatch):
+    monkeypatch.setattr(segment_log, "MIN_MERGE_ENTRIES", 2)
+
+    log = SegmentLog(log_path, key="chunk_id")
+    log.put_many([_record("a"), _record("b"), _record("c")])
+
+    assert log.delete("b") is True
+    assert log.delete("b") is False
+    assert log.delete("missing") is False
+    log.delete("c")
+    log.close()
+
+    reopened = SegmentLog(log_path, key="chunk_id")
+    assert reopened.get_many(["a", "b", "c"]) == [_record("a"), None, None]
+    assert reopened.ids() == ["a"]
+    assert [r["chunk_id"] for r in reopened.iter_records()] == ["a"]
+
+
+def test_segment_log_compact_drops_garbage_segments(log_path):
+    log = SegmentLog(log_path, key="chunk_id", max_segment_bytes=200)
+
+    # перезапис і видалення роблять ранні сегменти «смітними»
+    for version in range(3):
+        log.put_many([_record(f"r{i}", f"v{version}" * 10) for i in range(4)])
+    log.delete("r3")
+
+    before = log.stats()
+    assert len(before["segments"]) > 1
+    closed = [s for s in before["segments"] if s["segment"] != before["active_segment"]]
+    garbage = [s["segment"] for s in closed if s["garbage_ratio"] >= 0.5]
+    assert garbage
+
+    removed = log.compact(min_garbage_ratio=0.5)
+
+    assert removed == garbage
+    assert not any((log.path / f"seg-{s:06d}.jsonl").exists() for s in removed)
+    assert log.compact(min_garbage_ratio=0.5) == []
+
+    expected = [_record(f"r{i}", "v2" * 10) for i in range(3)] + [None]
+    assert log.get_many(["r0", "r1", "r2", "r3"]) == expected
+    log.close()
+
+    assert SegmentLog(log_path, key="chunk_id").get_many(["r0", "r1", "r2", "r3"]) == expected
+
+
+# --------------------------------------------------
+# CHUNK CACHE
+# --------------------------------------------------
+
+def test_chunk_cache_ignores_reads_from_before_invalidation():
+    cache = ChunkCache(max_bytes=1024)
+    cache.put_many([_record("a", "old")])
+
+    # читання з диска почалося до конкурентного save
+    generation = cache.generation
+    cache.invalidate(["a"])
+    cache.put_many([_record("a", "old")], generation)
+
+    assert cache.get_many(["a"]) == {}
+
+    cache.put_many([_record("a", "new")], cache.generation)
+    assert cache.get_many(["a"]) == {"a": _record("a", "new")}
+
+    generation = cache.generation
+    cache.clear()
+    cache.put_many([_record("b")], generation)
+    assert cache.stats()["entries"] == 0
+
+
+def test_chunk_cache_evicts_least_recently_used_by_bytes():
+    cache = ChunkCache(max_bytes=10)
+    cache.put_many([_record("a", "aaaa"), _record("b", "bbbb")])
+    cache.get_many(["a"])
+
+    cache.put_many([_record("c", "cccc"), _record("huge", "x" * 11)])
+
+    assert sorted(cache.get_many(["a", "b", "c", "huge"])) == ["a", "c"]
+    stats = cache.stats()
+    assert stats["bytes"] == 8
+    assert stats["evictions"] == 1
+
+
+def test_chunk_cache_returns_copies():
+    cache = ChunkCache(max_bytes=1024)
+    chunk = {"chunk_id": "a", "content": "text", "metadata": {"index_ids": ["i1"]}}
+    cache.put_many([chunk])
+    chunk["metadata"]["index_ids"].append("mutated")
+
+    cached = cache.get_many(["a"])["a"]
+    cached["metadata"]["index_ids"].append("i2")
+
+    assert cache.get_many(["a"])["a"]["metadata"]["index_ids"] == ["i1"]
+
+
+def test_chunk_store_save_invalidates_cached_chunk(tmp_path):
+    store = ChunkStore(str(tmp_path / "chunks"), backend="files")
+    assert store.cache is not None
+
+    store.save(_record("a", "old"))
+    assert store.load("a")["content"] == "old"
+    assert store.cache.get_many(["a"])
+
+    store.save(_record("a", "new"))
+    assert store.load("a")["content"] == "new"
+
+    store.delete("a")
+    assert store.load("a") is None
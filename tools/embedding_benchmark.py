@@ -0,0 +1,97 @@
+"""
+Embedding Benchmark
+===================
+
+Пропускна здатність Embedder (tokens/sec) на корпусі змішаної довжини:
+- фіксовані батчі моделі (token_budget = 0)
+- батчі за довжиною з різними бюджетами токенів
+
+Корпус — реальні чанки (якщо є) або синтетичні тексти
+з довгим хвостом довжин (як після chunking реальних документів).
+
+Запуск (з кореня репозиторію):
+    python -m tools.embedding_benchmark --texts 2000 --budgets 4096 8192 16384
+
+НЕ:
+- не використовує і не заповнює EmbeddingCache (Embedder(use_cache=False):
+  міряється чистий encode через embed_batch_array)
+"""
+
+import argparse
+import os
+import time
+from typing import List
+
+import numpy as np
+
+from config.settings import settings
+from core.indexing.embedder import Embedder
+from core.knowledge.chunk_store import ChunkStore
+
+
+WORDS = (
+    "index vector query document chunk retrieval model embedding token "
+    "search answer context source memory policy latency score"
+).split()
+
+
+def _load_texts(limit: int, synthetic: bool) -> List[str]:
+    path = settings.paths["data"]["chunks"]
+    if not synthetic and os.path.isdir(path):
+        # read_only: бенчмарк не пише postings у живий каталог
+        store = ChunkStore(path, read_only=True)
+        texts = [
+            chunk["content"]
+            for chunk in store.load_many(store.list_chunk_ids()[:limit])
+            if chunk
+        ]
+
+        if texts:
+            return texts
+
+    # lognormal: багато коротких, мало дуже довгих
+    rng = np.random.default_rng(0)
+    lengths = np.clip(rng.lognormal(mean=4.0, sigma=1.0, size=limit), 3, 400).astype(int)
+    return [" ".join(rng.choice(WORDS, size=n)) for n in lengths]
+
+
+def _run(embedder: Embedder, texts: List[str], token_budget: int, tokens: int) -> float:
+    embedder.token_budget = token_budget
+
+    # прогрів (ліниві ініціалізації, алокатор)
+    embedder.embed_batch_array(texts[:32])
+
+    started = time.perf_counter()
+    embedder.embed_batch_array(texts)
+    return tokens / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=2000, help="corpus size")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[4096, 8192, 16384])
+    parser.add_argument("--synthetic", action="store_true", help="ignore stored chunks")
+    args = parser.parse_args()
+
+    embedder = Embedder(use_cache=False)
+
+    texts = _load_texts(args.texts, args.synthetic)
+    lengths = embedder.token_lengths(texts)
+    tokens = int(lengths.sum())
+
+    print(
+        f"backend={embedder.backend} model={embedder.model_name} texts={len(texts)} "
+        f"tokens={tokens} p50={int(np.median(lengths))} max={int(lengths.max())}"
+    )
+    print(f"{'token_budget':<16}{'tokens/sec':>14}{'speedup':>10}")
+
+    baseline = _run(embedder, texts, 0, tokens)
+    print(f"{'fixed':<16}{baseline:>14.0f}{1.0:>10.2f}")
+
+    for budget in args.budgets:
+        rate = _run(embedder, texts, budget, tokens)
+        print(f"{budget:<16}{rate:>14.0f}{rate / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
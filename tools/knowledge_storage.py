@@ -0,0 +1,124 @@
+"""
+Knowledge Storage
+=================
+
+Обслуговування формату Document / Chunk / Feedback / EvaluationStore
+(system.yaml → knowledge.backend).
+
+- migrate: перенесення всіх записів між files / segments / sqlite
+  пачками; після перевірки кількості — system.yaml → knowledge.backend
+- compact: переписування «смітних» сегментів (лише segments)
+- stats:   записи, сегменти, частка сміття
+
+Запуск (з кореня репозиторію, сервіс зупинено — один писач):
+    python -m tools.knowledge_storage migrate --to segments
+    python -m tools.knowledge_storage migrate --to segments --delete-source
+    python -m tools.knowledge_storage migrate --from segments --to sqlite
+    python -m tools.knowledge_storage compact --min-garbage 0.3
+    python -m tools.knowledge_storage stats
+"""
+
+import argparse
+import os
+from typing import Dict
+
+from config.settings import settings
+from core.knowledge.backends import BACKENDS, open_backend
+from core.knowledge.chunk_store import ChunkStore
+
+
+# (назва, шлях, поле-ключ); feedback / evaluations — як у RAGService
+# (<state_path>/feedback, <state_path>/evaluations)
+STORES = (
+    ("documents", settings.paths["data"]["documents"], "document_id"),
+    ("chunks", settings.paths["data"]["chunks"], "chunk_id"),
+    ("feedback", os.path.join(settings.paths["state"]["base"], "feedback"), "feedback_id"),
+    ("evaluations", os.path.join(settings.paths["state"]["base"], "evaluations"), "evaluation_id"),
+)
+BATCH = 1000
+
+
+def migrate(source: str, target: str, delete_source: bool) -> None:
+    if source == target:
+        raise SystemExit(f"source and target are both {target}")
+
+    for name, path, key in STORES:
+        src = open_backend(path, key, source)
+        dst = open_backend(path, key, target)
+
+        ids = src.ids()
+        for start in range(0, len(ids), BATCH):
+            batch = [r for r in src.get_many(ids[start:start + BATCH]) if r is not None]
+            dst.put_many(batch)
+
+        migrated = len(dst.ids())
+        if migrated < len(ids):
+            raise SystemExit(f"{name}: migrated {migrated} of {len(ids)} records")
+
+        if delete_source:
+            for record_id in ids:
+                src.delete(record_id)
+
+        # postings могли застаріти, поки chunks жили в sqlite
+        if key == "chunk_id" and target != "sqlite":
+            ChunkStore(path, target).rebuild_postings()
+
+        print(f"{name:<12} {source} → {target}: {len(ids)} records")
+
+    print(f"set system.yaml → knowledge.backend: {target}")
+
+
+def compact(min_garbage: float) -> None:
+    for name, path, key in _segmented_stores():
+        log = open_backend(path, key, "segments")
+        removed = log.compact(min_garbage)
+        print(f"{name:<12} removed segments: {removed or '-'}")
+
+
+def stats() -> None:
+    for name, path, key in _segmented_stores():
+        log = open_backend(path, key, "segments")
+        info: Dict = log.stats()
+
+        print(f"{name:<12} {info['records']} records, active segment {info['active_segment']}")
+        for seg in info["segments"]:
+            print(
+                f"  seg {seg['segment']:>6}  {seg['bytes'] / 2**20:8.1f} MB  "
+                f"garbage {seg['garbage_ratio']:.0%}"
+            )
+
+
+def _segmented_stores():
+    return [store for store in STORES if os.path.isdir(os.path.join(store[1], "_segments"))]
+
+
+def main() -> None:
+    cfg = settings.system.get("knowledge", {}).get("segments", {})
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_migrate = sub.add_parser("migrate")
+    p_migrate.add_argument("--from", dest="source", choices=BACKENDS, default="files")
+    p_migrate.add_argument("--to", choices=BACKENDS, default="segments")
+    p_migrate.add_argument("--delete-source", action="store_true")
+
+    p_compact = sub.add_parser("compact")
+    p_compact.add_argument(
+        "--min-garbage", type=float, default=float(cfg.get("compact_garbage_ratio", 0.5))
+    )
+
+    sub.add_parser("stats")
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate(args.source, args.to, args.delete_source)
+    elif args.command == "compact":
+        compact(args.min_garbage)
+    else:
+        stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+ONNX Parity Check
+=================
+
+Порівнює ONNX backend (fp32 і int8) з torch backend
+(sentence-transformers) на одних і тих самих текстах:
+- форма та норма векторів
+- cosine між векторами одного тексту (min / mean)
+- збіг top-k сусідів (чи не змінюється retrieval)
+
+Запуск (з кореня репозиторію):
+    python -m tools.onnx_parity --limit 500 --min-cosine 0.99
+
+Код виходу 1, якщо min cosine нижче порогу.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from config.settings import settings
+from core.indexing.onnx_encoder import OnnxEncoder
+from core.knowledge.chunk_store import ChunkStore
+
+
+SAMPLE_TEXTS = [
+    "What is retrieval-augmented generation?",
+    "FAISS builds an index over dense vectors.",
+    "The quick brown fox jumps over the lazy dog.",
+    "Документ розбивається на чанки перед індексацією.",
+    "a",
+]
+
+
+def _load_texts(limit: int) -> List[str]:
+    path = settings.paths["data"]["chunks"]
+    if not os.path.isdir(path):
+        return SAMPLE_TEXTS
+
+    # read_only: перевірка не пише postings у живий каталог
+    store = ChunkStore(path, read_only=True)
+    texts = [
+        chunk["content"]
+        for chunk in store.load_many(store.list_chunk_ids()[:limit])
+        if chunk
+    ]
+
+    return texts or SAMPLE_TEXTS
+
+
+def _timed_encode(model, texts: List[str], normalize: bool):
+    started = time.perf_counter()
+    vectors = np.asarray(
+        model.encode(texts, normalize_embeddings=normalize, convert_to_numpy=True),
+        dtype=np.float32
+    )
+    return vectors, time.perf_counter() - started
+
+
+def _top_k_overlap(reference: np.ndarray, candidate: np.ndarray, k: int) -> float:
+    k = min(k, len(reference))
+    ref = np.argsort(-(reference @ reference.T), axis=1)[:, :k]
+    cand = np.argsort(-(candidate @ candidate.T), axis=1)[:, :k]
+
+    return float(np.mean([
+        len(set(r) & set(c)) / k for r, c in zip(ref, cand)
+    ]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--limit", type=int, default=500, help="max chunks")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    cfg = settings.models["embeddings"]
+    normalize = cfg.get("normalize", True)
+    artifacts_path = settings.paths.get("models", {}).get("onnx", "data/models/onnx")
+
+    texts = _load_texts(args.limit)
+    reference, torch_seconds = _timed_encode(
+        SentenceTransformer(cfg["model"], device="cpu"), texts, normalize
+    )
+
+    print(f"texts={len(texts)} dim={reference.shape[1]} torch={torch_seconds:.2f}s")
+    print(f"{'backend':<12}{'min cos':>10}{'mean cos':>10}{'top-k':>8}{'seconds':>10}")
+
+    failed = False
+    for quantize in (False, True):
+        encoder = OnnxEncoder(cfg["model"], artifacts_path, quantize=quantize)
+        vectors, seconds = _timed_encode(encoder, texts, normalize)
+
+        if vectors.shape != reference.shape:
+            print(f"shape mismatch: {vectors.shape} != {reference.shape}")
+            sys.exit(1)
+
+        cosine = np.sum(
+            (reference / np.linalg.norm(reference, axis=1, keepdims=True))
+            * (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)),
+            axis=1
+        )
+        overlap = _top_k_overlap(reference, vectors, args.k)
+
+        label = "onnx-int8" if quantize else "onnx"
+        print(
+            f"{label:<12}{cosine.min():>10.4f}{cosine.mean():>10.4f}"
+            f"{overlap:>8.3f}{seconds:>10.2f}"
+        )
+        failed = failed or cosine.min() < args.min_cosine
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
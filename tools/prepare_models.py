@@ -0,0 +1,77 @@
+"""
+Prepare Models
+==============
+
+Зберігає моделі з models.yaml у локальний каталог артефактів
+(paths.yaml → models.artifacts) разом з tokenizer-ами та sha256.
+
+- embeddings.model → sentence-transformers артефакт
+- llm.<mode>.model з backend: hf → transformers pipeline артефакт
+  (ollama керує своїми моделями сам — пропускається)
+
+Запуск (з кореня репозиторію, з доступом до hub):
+    python -m tools.prepare_models
+    python -m tools.prepare_models --verify      # лише перевірка (sha256)
+    python -m tools.prepare_models --force       # перезберегти наявні
+
+Після цього на air-gapped вузлі: models.yaml → artifacts.enabled: true.
+"""
+
+import argparse
+from typing import List, Tuple
+
+from config.settings import settings
+from core.system.model_artifacts import MANIFEST, ModelArtifacts
+
+
+def _targets() -> List[Tuple[str, str, str]]:
+    """
+    (model_name, kind, task) з models.yaml, без дублікатів.
+    """
+    targets = [(settings.models["embeddings"]["model"], "sentence_transformers", None)]
+
+    for cfg in settings.models.get("llm", {}).values():
+        if isinstance(cfg, dict) and cfg.get("backend") == "hf":
+            targets.append((cfg["model"], "transformers", "text2text-generation"))
+
+    return list(dict.fromkeys(targets))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--verify", action="store_true", help="only verify checksums")
+    parser.add_argument("--force", action="store_true", help="re-download prepared models")
+    args = parser.parse_args()
+
+    artifacts = ModelArtifacts()
+    failed = 0
+
+    for model_name, kind, task in _targets():
+        prepared = (artifacts.path_for(model_name) / MANIFEST).exists()
+
+        if args.verify or (prepared and not args.force):
+            if not prepared:
+                print(f"MISSING  {model_name}")
+                failed += 1
+                continue
+            try:
+                artifacts.verify(model_name, "sha256")
+                print(f"OK       {model_name}")
+            except RuntimeError as e:
+                print(f"CORRUPT  {e}")
+                failed += 1
+            continue
+
+        manifest = artifacts.prepare(model_name, kind, task)
+        size = sum(f["size"] for f in manifest["files"].values())
+        print(
+            f"PREPARED {model_name} → {artifacts.path_for(model_name)} "
+            f"({len(manifest['files'])} files, {size / 2**20:.1f} MB)"
+        )
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
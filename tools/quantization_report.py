@@ -0,0 +1,157 @@
+"""
+Quantization Report
+===================
+
+Порівнює режими FAISS-індексу на реальних чанках:
+- памʼять (серіалізований індекс + *.vectors для re-scoring)
+- recall@k відносно точного flat-індексу (повна розмірність)
+- середня латентність запиту
+
+--projection pca|truncate --dimension D: усі режими будуються
+на векторах зменшеної розмірності (див. Projection).
+
+Запуск (з кореня репозиторію):
+    python -m tools.quantization_report --limit 20000 --queries 200 --k 10
+    python -m tools.quantization_report --projection pca --dimension 128
+
+НЕ:
+- не змінює збережені індекси (все будується в памʼяті)
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from config.settings import settings
+from core.indexing.embedder import Embedder
+from core.indexing.faiss_index import FaissIndex
+from core.indexing.projection import Projection
+from core.knowledge.chunk_store import ChunkStore
+
+
+MODES = ("flat", "fp16", "sq8", "pq", "ivf_pq")
+
+
+def _load_vectors(embedder: Embedder, limit: int) -> np.ndarray:
+    path = settings.paths["data"]["chunks"]
+    if not os.path.isdir(path):
+        raise SystemExit("No chunks found")
+
+    # read_only: звіт не пише postings у живий каталог
+    store = ChunkStore(path, read_only=True)
+    texts = [
+        chunk["content"]
+        for chunk in store.load_many(store.list_chunk_ids()[:limit])
+        if chunk
+    ]
+
+    if not texts:
+        raise SystemExit("No chunks found")
+
+    x = embedder.embed_batch_array(texts)
+    faiss.normalize_L2(x)
+    return x
+
+
+def _build(index_type: str, vectors: np.ndarray, rescore_factor: int) -> FaissIndex:
+    cfg = settings.models.get("indexing", {})
+    # як у IndexManager: PQ на малому корпусі → sq8
+    index_type = FaissIndex.fallback_type(index_type, len(vectors))
+
+    params = FaissIndex.effective_params(
+        index_type,
+        cfg.get(index_type, {}),
+        len(vectors),
+        dimension=vectors.shape[1],
+    )
+    params["rescore_factor"] = rescore_factor
+
+    index = FaissIndex(vectors.shape[1], index_type, params)
+    if index.requires_training():
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def _memory_bytes(index: FaissIndex) -> int:
+    size = int(faiss.serialize_index(index.index).nbytes)
+    if index.exact is not None:
+        size += len(index.exact) * index.dimension * index.exact.dtype.itemsize
+    return size
+
+
+def _evaluate(index: FaissIndex, queries: np.ndarray, truth: List[set], k: int) -> Dict:
+    recall = 0.0
+    started = time.perf_counter()
+
+    for q, expected in zip(queries, truth):
+        ids, _ = index.search(q, k)
+        recall += len(expected.intersection(ids)) / max(1, len(expected))
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        "recall": recall / len(queries),
+        "latency_ms": 1000.0 * elapsed / len(queries),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--limit", type=int, default=20000, help="max chunks")
+    parser.add_argument("--queries", type=int, default=200, help="query sample size")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--projection", choices=("none", "pca", "truncate"), default="none")
+    parser.add_argument("--dimension", type=int, default=128, help="projected dimension")
+    args = parser.parse_args()
+
+    vectors = _load_vectors(Embedder(), args.limit)
+
+    # запити — випадкові чанки корпусу
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = vectors[sample]
+
+    flat = _build("flat", vectors, 0)
+    truth = [set(flat.search(q, args.k)[0]) for q in queries]
+    flat_bytes = _memory_bytes(flat)
+
+    full_dim = vectors.shape[1]
+    projection = Projection.from_config(
+        {"type": args.projection, "dimension": args.dimension, "min_fit_vectors": 0},
+        vectors,
+    )
+    if projection is not None:
+        vectors = projection.apply(vectors)
+        queries = projection.apply(queries)
+
+    print(f"vectors={len(vectors)} dim={full_dim}→{vectors.shape[1]} k={args.k}")
+    print(f"{'mode':<16}{'MB':>10}{'vs flat':>10}{'recall':>10}{'ms/query':>10}")
+
+    for index_type in MODES:
+        factors = (0,) if index_type == "flat" else (0, args.rescore_factor)
+
+        for factor in factors:
+            index = _build(index_type, vectors, factor)
+            size = _memory_bytes(index)
+            stats = _evaluate(index, queries, truth, args.k)
+
+            label = index_type if index.index_type == index_type else f"{index_type}→{index.index_type}"
+            if factor:
+                label += f"+rescore{factor}"
+            print(
+                f"{label:<16}"
+                f"{size / 2**20:>10.1f}"
+                f"{size / flat_bytes:>10.2f}"
+                f"{stats['recall']:>10.3f}"
+                f"{stats['latency_ms']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
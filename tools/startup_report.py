@@ -0,0 +1,98 @@
+"""
+Startup Report
+==============
+
+Куди йде час холодного старту:
+1. імпорт services.rag_service (python -X importtime в окремому
+   процесі) — self-time, згрупований за top-level пакетом
+2. конструктор RAGService — по фазах (StartupProfiler)
+3. warm-up моделей (embedder, LLM) — синхронно, щоб виміряти
+
+Запуск (з кореня репозиторію):
+    python -m tools.startup_report --top 15
+    python -m tools.startup_report --no-warm-up
+
+НЕ:
+- не змінює дані (лише конструює сервіс над існуючими шляхами)
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from config.settings import settings
+
+
+def _import_breakdown(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    (сумарні секунди, [(package, секунди)] за спаданням).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip().splitlines()[-1])
+
+    by_package: Dict[str, float] = defaultdict(float)
+
+    # "import time:  self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+
+        package = fields[2].strip().split(".")[0]
+        by_package[package] += int(fields[0]) / 1e6
+
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    return sum(by_package.values()), ranked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=15, help="packages to show")
+    parser.add_argument("--no-warm-up", action="store_true", help="skip model loading")
+    args = parser.parse_args()
+
+    total, ranked = _import_breakdown("services.rag_service")
+
+    print(f"import services.rag_service: {total:.3f}s")
+    for package, seconds in ranked[:args.top]:
+        print(f"  {package:<32}{seconds:>10.3f}s")
+
+    # warm-up вимірюється окремо нижче, а не у фоні
+    settings.system.setdefault("startup", {})["warm_up"] = "none"
+
+    started = time.perf_counter()
+    from services.rag_service import RAGService
+
+    rag = RAGService(
+        documents_path=settings.paths["data"]["documents"],
+        chunks_path=settings.paths["data"]["chunks"],
+        indexes_path=settings.paths["data"]["indexes"],
+        state_path=settings.paths["state"]["base"],
+    )
+
+    if not args.no_warm_up:
+        rag.index_manager.embedder.warm_up()
+        rag.startup.checkpoint("warm_up.embedder")
+        rag.llm_client.warm_up()
+        rag.startup.checkpoint("warm_up.llm")
+
+    report = rag.startup_report()
+
+    print(f"RAGService (import + init{'' if args.no_warm_up else ' + warm-up'}): "
+          f"{time.perf_counter() - started:.3f}s")
+    for phase, seconds in report["phases"].items():
+        print(f"  {phase:<32}{seconds:>10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,26 @@
 import os
-import json
 import pandas as pd
 
+from core.learning.evaluation_store import EvaluationStore
+from core.learning.feedback_store import FeedbackStore
+
 
 def load_evaluations(path: str) -> pd.DataFrame:
     records = []
 
+    # дашборд лише читає: сховище (і каталог) не створюється
     if not os.path.exists(path):
         return pd.DataFrame()
 
-    for fname in os.listdir(path):
-        if fname.endswith(".json"):
-            with open(os.path.join(path, fname), "r", encoding="utf-8") as f:
-                data = json.load(f)
-                record = {
-                    "evaluation_id": data["evaluation_id"],
-                    "created_at": data["created_at"],
-                    "relevance": data["metrics"].get("relevance"),
-                    "groundedness": data["metrics"].get("groundedness"),
-                    "answerability": data["metrics"].get("answerability"),
-                }
-                records.append(record)
+    for data in EvaluationStore(path).iter_all():
+        record = {
+            "evaluation_id": data["evaluation_id"],
+            "created_at": data["created_at"],
+            "relevance": data["metrics"].get("relevance"),
+            "groundedness": data["metrics"].get("groundedness"),
+            "answerability": data["metrics"].get("answerability"),
+        }
+        records.append(record)
 
     df = pd.DataFrame(records)
     if "created_at" not in df.columns:
@@ -32,15 +32,7 @@ def load_evaluations(path: str) -> pd.DataFrame:
 
 
 def load_feedback(path: str) -> pd.DataFrame:
-    records = []
-
     if not os.path.exists(path):
         return pd.DataFrame()
 
-    for fname in os.listdir(path):
-        if fname.endswith(".json"):
-            with open(os.path.join(path, fname), "r", encoding="utf-8") as f:
-                data = json.load(f)
-                records.append(data)
-
-    return pd.DataFrame(records)
+    return pd.DataFrame(list(FeedbackStore(path).iter_all()))